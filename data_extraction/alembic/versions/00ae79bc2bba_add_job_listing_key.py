@@ -0,0 +1,82 @@
+"""add job listing key
+
+Revision ID: 00ae79bc2bba
+Revises: 05613cafc2cb
+Create Date: 2026-04-21 15:27:09.118356
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "00ae79bc2bba"
+down_revision: Union[str, Sequence[str], None] = "05613cafc2cb"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Listing ids per backfill statement, each chunk commits on its own
+BACKFILL_CHUNK_IDS = 50_000
+
+
+def __id_chunks(bind) -> list[tuple[int, int]]:
+    low, high = bind.execute(sa.text("SELECT min(id), max(id) FROM job_listing")).one()
+    if low is None:
+        return []
+    return [
+        (start, start + BACKFILL_CHUNK_IDS)
+        for start in range(low, high + 1, BACKFILL_CHUNK_IDS)
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "job_listing_key",
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("job_id", sa.String(), nullable=False),
+        sa.Column("job_created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("source", "job_id"),
+    )
+    op.create_index(
+        "ix_job_listing_key_job_created_at", "job_listing_key", ["job_created_at"]
+    )
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        chunks = __id_chunks(bind)
+        # A listing stored under several created dates keeps its earliest
+        for start, end in chunks:
+            bind.execute(
+                sa.text(
+                    "INSERT INTO job_listing_key (source, job_id, job_created_at) "
+                    "SELECT DISTINCT ON (source, job_id) source, job_id, job_created_at "
+                    "FROM job_listing WHERE id >= :start AND id < :end "
+                    "ORDER BY source, job_id, job_created_at "
+                    "ON CONFLICT (source, job_id) DO UPDATE SET job_created_at = "
+                    "least(job_listing_key.job_created_at, excluded.job_created_at)"
+                ),
+                {"start": start, "end": end},
+            )
+        # Only once every chunk is in is the earliest date known
+        for start, end in chunks:
+            bind.execute(
+                sa.text(
+                    "DELETE FROM job_listing USING job_listing_key AS pinned "
+                    "WHERE pinned.source = job_listing.source "
+                    "AND pinned.job_id = job_listing.job_id "
+                    "AND pinned.job_created_at <> job_listing.job_created_at "
+                    "AND job_listing.id >= :start AND job_listing.id < :end"
+                ),
+                {"start": start, "end": end},
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Duplicates removed by the upgrade are not restored
+    op.drop_index("ix_job_listing_key_job_created_at", table_name="job_listing_key")
+    op.drop_table("job_listing_key")
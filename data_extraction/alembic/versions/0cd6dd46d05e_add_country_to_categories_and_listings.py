@@ -0,0 +1,61 @@
+"""add country to categories and listings
+
+Revision ID: 0cd6dd46d05e
+Revises: b1ecd7b0f4af
+Create Date: 2026-03-23 09:52:14.118406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0cd6dd46d05e"
+down_revision: Union[str, Sequence[str], None] = "b1ecd7b0f4af"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Everything stored so far came from the gb endpoints. A constant default
+    # is recorded in the catalog instead of rewriting every partition, and it
+    # is dropped again so new rows always say where they came from.
+    op.add_column(
+        "job_category",
+        sa.Column("country", sa.String(), server_default="gb", nullable=False),
+    )
+    op.alter_column("job_category", "country", server_default=None)
+    op.add_column(
+        "job_listing",
+        sa.Column("country", sa.String(), server_default="gb", nullable=False),
+    )
+    op.alter_column("job_listing", "country", server_default=None)
+
+    op.drop_constraint(
+        "uq_job_category_source_source_category_id", "job_category", type_="unique"
+    )
+    op.create_unique_constraint(
+        "uq_job_category_source_country_tag_label",
+        "job_category",
+        ["source", "country", "tag", "label"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Categories of other countries would collide on the old key
+    op.execute("DELETE FROM job_category WHERE country <> 'gb'")
+    op.drop_constraint(
+        "uq_job_category_source_country_tag_label", "job_category", type_="unique"
+    )
+    op.create_unique_constraint(
+        "uq_job_category_source_source_category_id",
+        "job_category",
+        ["source", "tag", "label"],
+    )
+    op.drop_column("job_listing", "country")
+    op.drop_column("job_category", "country")
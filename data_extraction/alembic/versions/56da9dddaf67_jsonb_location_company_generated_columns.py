@@ -0,0 +1,91 @@
+"""jsonb location and company with generated lookup columns
+
+Revision ID: 56da9dddaf67
+Revises: 61e855a52d00
+Create Date: 2026-02-23 10:12:44.581203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "56da9dddaf67"
+down_revision: Union[str, Sequence[str], None] = "61e855a52d00"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Altering the partitioned parent rewrites every partition in one go
+    for column in ("location", "company"):
+        op.alter_column(
+            "job_listing",
+            column,
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            existing_nullable=True,
+            postgresql_using=f"{column}::jsonb",
+        )
+    op.add_column(
+        "job_listing",
+        sa.Column(
+            "company_name",
+            sa.Text(),
+            sa.Computed("company ->> 'display_name'", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.add_column(
+        "job_listing",
+        sa.Column(
+            "location_name",
+            sa.Text(),
+            sa.Computed("location ->> 'display_name'", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.add_column(
+        "job_listing",
+        sa.Column(
+            "location_area",
+            postgresql.JSONB(),
+            sa.Computed("location -> 'area'", persisted=True),
+            nullable=True,
+        ),
+    )
+    # Partitioned tables can't build indexes concurrently, the parent's
+    # index is created on every partition while holding a write lock.
+    op.create_index("ix_job_listing_company_name", "job_listing", ["company_name"])
+    op.create_index("ix_job_listing_location_name", "job_listing", ["location_name"])
+    op.create_index(
+        "ix_job_listing_location_area",
+        "job_listing",
+        ["location_area"],
+        postgresql_using="gin",
+        postgresql_ops={"location_area": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_job_listing_location_area", table_name="job_listing")
+    op.drop_index("ix_job_listing_location_name", table_name="job_listing")
+    op.drop_index("ix_job_listing_company_name", table_name="job_listing")
+    op.drop_column("job_listing", "location_area")
+    op.drop_column("job_listing", "location_name")
+    op.drop_column("job_listing", "company_name")
+    for column in ("location", "company"):
+        op.alter_column(
+            "job_listing",
+            column,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            existing_nullable=True,
+            postgresql_using=f"{column}::json",
+        )
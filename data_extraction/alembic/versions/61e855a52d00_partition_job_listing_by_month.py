@@ -0,0 +1,177 @@
+"""partition job listing by month
+
+Revision ID: 61e855a52d00
+Revises: af585ea9b9ad
+Create Date: 2026-02-16 11:41:07.290318
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "61e855a52d00"
+down_revision: Union[str, Sequence[str], None] = "af585ea9b9ad"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = (
+    "id, source, job_id, minimum_salary, maximum_salary, job_post_url, location, "
+    "job_title, job_created_at, job_description, company, category_id, created_at, "
+    "content_hash, updated_at"
+)
+# Partitions created ahead of the current month, db.maintenance keeps it so
+MONTHS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Index names are schema wide, move the old ones out of the way first
+    op.execute("ALTER TABLE job_listing RENAME TO job_listing_unpartitioned")
+    op.execute(
+        "ALTER TABLE job_listing_unpartitioned "
+        "RENAME CONSTRAINT uq_job_listing_source_job_id "
+        "TO uq_job_listing_unpartitioned_source_job_id"
+    )
+    op.execute("ALTER INDEX job_listing_pkey RENAME TO job_listing_unpartitioned_pkey")
+    op.execute(
+        "ALTER INDEX ix_job_listing_category_id "
+        "RENAME TO ix_job_listing_unpartitioned_category_id"
+    )
+    op.execute(
+        "ALTER INDEX ix_job_listing_created_at_id "
+        "RENAME TO ix_job_listing_unpartitioned_created_at_id"
+    )
+
+    op.execute(
+        """
+        CREATE TABLE job_listing (
+            id INTEGER NOT NULL DEFAULT nextval('job_listing_id_seq'),
+            source VARCHAR NOT NULL,
+            job_id VARCHAR NOT NULL,
+            minimum_salary FLOAT,
+            maximum_salary FLOAT,
+            job_post_url VARCHAR NOT NULL,
+            location JSON,
+            job_title TEXT NOT NULL,
+            job_created_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            job_description TEXT,
+            company JSON,
+            category_id INTEGER
+                REFERENCES job_category (id) ON DELETE SET NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            content_hash VARCHAR(64),
+            updated_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT job_listing_pkey PRIMARY KEY (id, job_created_at),
+            CONSTRAINT uq_job_listing_source_job_id_job_created_at
+                UNIQUE (source, job_id, job_created_at)
+        ) PARTITION BY RANGE (job_created_at)
+        """
+    )
+    # The sequence would otherwise be dropped together with the old table
+    op.execute("ALTER SEQUENCE job_listing_id_seq OWNED BY job_listing.id")
+    op.create_index("ix_job_listing_category_id", "job_listing", ["category_id"])
+    op.create_index("ix_job_listing_created_at_id", "job_listing", ["created_at", "id"])
+
+    # Catches rows outside every monthly partition, e.g. very old postings
+    op.execute("CREATE TABLE job_listing_default PARTITION OF job_listing DEFAULT")
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month_start DATE;
+        BEGIN
+            FOR month_start IN
+                SELECT generate_series(
+                    date_trunc('month', COALESCE(
+                        (SELECT min(COALESCE(job_created_at, created_at))
+                         FROM job_listing_unpartitioned),
+                        now()
+                    )),
+                    date_trunc('month', now()) + interval '{MONTHS_AHEAD} months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF job_listing FOR VALUES FROM (%L) TO (%L)',
+                    'job_listing_' || to_char(month_start, '"y"YYYY"m"MM'),
+                    month_start,
+                    month_start + interval '1 month'
+                );
+            END LOOP;
+        END
+        $$
+        """
+    )
+
+    op.execute(
+        f"""
+        INSERT INTO job_listing ({COLUMNS})
+        SELECT id, source, job_id, minimum_salary, maximum_salary, job_post_url,
+               location, job_title, COALESCE(job_created_at, created_at),
+               job_description, company, category_id, created_at, content_hash,
+               updated_at
+        FROM job_listing_unpartitioned
+        """
+    )
+    op.execute("DROP TABLE job_listing_unpartitioned")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE job_listing RENAME TO job_listing_partitioned")
+    op.execute(
+        "ALTER TABLE job_listing_partitioned "
+        "RENAME CONSTRAINT uq_job_listing_source_job_id_job_created_at "
+        "TO uq_job_listing_partitioned_source_job_id_job_created_at"
+    )
+    op.execute("ALTER INDEX job_listing_pkey RENAME TO job_listing_partitioned_pkey")
+    op.execute(
+        "ALTER INDEX ix_job_listing_category_id "
+        "RENAME TO ix_job_listing_partitioned_category_id"
+    )
+    op.execute(
+        "ALTER INDEX ix_job_listing_created_at_id "
+        "RENAME TO ix_job_listing_partitioned_created_at_id"
+    )
+
+    op.execute(
+        """
+        CREATE TABLE job_listing (
+            id INTEGER NOT NULL DEFAULT nextval('job_listing_id_seq'),
+            source VARCHAR NOT NULL,
+            job_id VARCHAR NOT NULL,
+            minimum_salary FLOAT,
+            maximum_salary FLOAT,
+            job_post_url VARCHAR NOT NULL,
+            location JSON,
+            job_title TEXT NOT NULL,
+            job_created_at TIMESTAMP WITH TIME ZONE,
+            job_description TEXT,
+            company JSON,
+            category_id INTEGER
+                REFERENCES job_category (id) ON DELETE SET NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            content_hash VARCHAR(64),
+            updated_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT job_listing_pkey PRIMARY KEY (id),
+            CONSTRAINT uq_job_listing_source_job_id UNIQUE (source, job_id)
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE job_listing_id_seq OWNED BY job_listing.id")
+    op.create_index("ix_job_listing_category_id", "job_listing", ["category_id"])
+    op.create_index("ix_job_listing_created_at_id", "job_listing", ["created_at", "id"])
+    # The same job under two created dates collapses back to its newest row
+    op.execute(
+        f"""
+        INSERT INTO job_listing ({COLUMNS})
+        SELECT DISTINCT ON (source, job_id) {COLUMNS}
+        FROM job_listing_partitioned
+        ORDER BY source, job_id, job_created_at DESC
+        """
+    )
+    # Dropping the parent drops every attached partition with it
+    op.execute("DROP TABLE job_listing_partitioned")
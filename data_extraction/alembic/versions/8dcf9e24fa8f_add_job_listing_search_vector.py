@@ -0,0 +1,50 @@
+"""add job listing search vector
+
+Revision ID: 8dcf9e24fa8f
+Revises: 56da9dddaf67
+Create Date: 2026-03-02 09:27:51.903644
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8dcf9e24fa8f"
+down_revision: Union[str, Sequence[str], None] = "56da9dddaf67"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(job_title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(job_description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "job_listing",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_job_listing_search_vector",
+        "job_listing",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_job_listing_search_vector", table_name="job_listing")
+    op.drop_column("job_listing", "search_vector")
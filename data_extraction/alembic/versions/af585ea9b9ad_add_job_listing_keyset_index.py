@@ -0,0 +1,41 @@
+"""add job listing keyset index
+
+Revision ID: af585ea9b9ad
+Revises: ce496677b8f1
+Create Date: 2026-02-09 14:03:18.772410
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "af585ea9b9ad"
+down_revision: Union[str, Sequence[str], None] = "ce496677b8f1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so ingestion can keep writing to job_listing
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_job_listing_created_at_id",
+            "job_listing",
+            ["created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_job_listing_created_at_id",
+            table_name="job_listing",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,168 @@
+"""store job descriptions by hash
+
+Revision ID: f62e8c3533dc
+Revises: 6c8cbcfdca6f
+Create Date: 2026-04-13 14:05:37.690122
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f62e8c3533dc"
+down_revision: Union[str, Sequence[str], None] = "6c8cbcfdca6f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Listing ids per backfill statement. Each chunk commits on its own, so no
+# single transaction holds every row lock or the whole WAL volume.
+BACKFILL_CHUNK_IDS = 50_000
+
+# Same as repository.jobs.description_hash
+DESCRIPTION_HASH = "encode(sha256(convert_to(job_description, 'UTF8')), 'hex')"
+TITLE_SEARCH_VECTOR = "setweight(to_tsvector('english', coalesce(job_title, '')), 'A')"
+SEARCH_VECTOR = (
+    f"{TITLE_SEARCH_VECTOR} || "
+    "setweight(to_tsvector('english', coalesce(job_description, '')), 'B')"
+)
+
+
+def __id_chunks(bind) -> list[tuple[int, int]]:
+    low, high = bind.execute(sa.text("SELECT min(id), max(id) FROM job_listing")).one()
+    if low is None:
+        return []
+    return [
+        (start, start + BACKFILL_CHUNK_IDS)
+        for start in range(low, high + 1, BACKFILL_CHUNK_IDS)
+    ]
+
+
+def __drop_search_vector() -> None:
+    op.drop_index("ix_job_listing_search_vector", table_name="job_listing")
+    op.drop_column("job_listing", "search_vector")
+
+
+def __add_search_vector(expression: str) -> None:
+    # A stored generated column rewrites the table, which also gives back
+    # the space of columns dropped before it
+    op.add_column(
+        "job_listing",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(expression, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_job_listing_search_vector",
+        "job_listing",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "job_description",
+        sa.Column("hash", sa.String(length=64), nullable=False),
+        sa.Column("description", sa.Text(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', description), 'B')", persisted=True
+            ),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    op.create_index("ix_job_description_created_at", "job_description", ["created_at"])
+    op.create_index(
+        "ix_job_description_search_vector",
+        "job_description",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+    op.add_column(
+        "job_listing",
+        sa.Column("description_hash", sa.String(length=64), nullable=True),
+    )
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        for start, end in __id_chunks(bind):
+            chunk = {"start": start, "end": end}
+            bind.execute(
+                sa.text(
+                    f"INSERT INTO job_description (hash, description) "
+                    f"SELECT DISTINCT ON (1) {DESCRIPTION_HASH}, job_description "
+                    f"FROM job_listing "
+                    f"WHERE id >= :start AND id < :end AND job_description IS NOT NULL "
+                    f"ON CONFLICT (hash) DO NOTHING"
+                ),
+                chunk,
+            )
+            bind.execute(
+                sa.text(
+                    f"UPDATE job_listing SET description_hash = {DESCRIPTION_HASH} "
+                    f"WHERE id >= :start AND id < :end AND job_description IS NOT NULL"
+                ),
+                chunk,
+            )
+
+    op.create_index(
+        "ix_job_listing_description_hash", "job_listing", ["description_hash"]
+    )
+    op.create_foreign_key(
+        "job_listing_description_hash_fkey",
+        "job_listing",
+        "job_description",
+        ["description_hash"],
+        ["hash"],
+    )
+    # The search vector reads job_description, so it goes first
+    __drop_search_vector()
+    op.drop_column("job_listing", "job_description")
+    __add_search_vector(TITLE_SEARCH_VECTOR)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column("job_listing", sa.Column("job_description", sa.Text(), nullable=True))
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        for start, end in __id_chunks(bind):
+            bind.execute(
+                sa.text(
+                    "UPDATE job_listing SET job_description = stored.description "
+                    "FROM job_description AS stored "
+                    "WHERE stored.hash = job_listing.description_hash "
+                    "AND job_listing.id >= :start AND job_listing.id < :end"
+                ),
+                {"start": start, "end": end},
+            )
+
+    __drop_search_vector()
+    __add_search_vector(SEARCH_VECTOR)
+    op.drop_constraint(
+        "job_listing_description_hash_fkey", "job_listing", type_="foreignkey"
+    )
+    op.drop_index("ix_job_listing_description_hash", table_name="job_listing")
+    op.drop_column("job_listing", "description_hash")
+    op.drop_index("ix_job_description_search_vector", table_name="job_description")
+    op.drop_index("ix_job_description_created_at", table_name="job_description")
+    op.drop_table("job_description")
@@ -0,0 +1,237 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+
+from config import config, logger
+from db.engine import get_db_session
+from repository.checkpoints import ShardProgress, save_checkpoints
+from repository.jobs import (
+    WriteResult,
+    copy_job_listings,
+    insert_job_listings,
+    job_listing_key,
+    resolve_listing_keys,
+    store_job_descriptions,
+    upsert_job_listings,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from telemetry.metrics import inc, timed
+
+# Multi-row INSERTs bind every column of every row and asyncpg allows 32767
+# parameters per statement, COPY has no such limit
+MAX_STATEMENT_ROWS = 2000
+# Text columns dominate a listing, the rest is roughly constant
+ROW_OVERHEAD_BYTES = 200
+
+
+@dataclass
+class PageCheckpoint:
+    """Where a shard stands once this page is committed."""
+
+    progress: ShardProgress
+    page: int
+    newest_job_created_at: datetime | None
+    stopped: bool
+
+
+@dataclass
+class PendingPage:
+    jobs: list[dict]
+    size: int
+    inserted: asyncio.Future
+    checkpoint: PageCheckpoint | None = None
+
+
+def estimated_size(jobs: list[dict]) -> int:
+    return sum(
+        ROW_OVERHEAD_BYTES
+        + len(job.get("job_description") or "")
+        + len(job.get("job_title") or "")
+        for job in jobs
+    )
+
+
+async def __write_rows(db: AsyncSession, rows: list[dict], method: str) -> WriteResult:
+    if method == "copy":
+        return await copy_job_listings(db, rows)
+    write_result = WriteResult()
+    write = upsert_job_listings if method == "upsert" else insert_job_listings
+    for start in range(0, len(rows), MAX_STATEMENT_ROWS):
+        chunk_result = await write(db, rows[start : start + MAX_STATEMENT_ROWS])
+        write_result.inserted_keys |= chunk_result.inserted_keys
+        write_result.updated += chunk_result.updated
+    return write_result
+
+
+def __inserted_per_page(
+    pages: list[PendingPage], inserted_keys: set[tuple]
+) -> list[int]:
+    # The same listing can come from two categories in one group, it
+    # counts as new for the first page only
+    unclaimed = set(inserted_keys)
+    counts = []
+    for page in pages:
+        inserted = 0
+        for job in page.jobs:
+            key = job_listing_key(job)
+            if key in unclaimed:
+                unclaimed.discard(key)
+                inserted += 1
+        counts.append(inserted)
+    return counts
+
+
+async def write_job_batch(db: AsyncSession, pages: list[PendingPage]) -> list[int]:
+    """Writes a group of pages and their checkpoints in one transaction.
+
+    Returns how many listings of each page were new.
+    """
+    jobs = [job for page in pages for job in page.jobs]
+    method = config.JOB_LISTING_LOAD_METHOD
+    with timed("job_listing_write_seconds", method=method):
+        write_result = WriteResult()
+        # A group of pages that only carry checkpoints has nothing else to write
+        if jobs:
+            await resolve_listing_keys(db, jobs)
+            # Once for the whole group, not per statement chunk, see
+            # store_job_descriptions
+            rows = await store_job_descriptions(db, jobs)
+            write_result = await __write_rows(db, rows, method)
+        inserted = __inserted_per_page(pages, write_result.inserted_keys)
+        # Pages of one shard arrive in order, so each advances its totals
+        await save_checkpoints(
+            db,
+            [
+                page.checkpoint.progress.advance(
+                    page.checkpoint.page,
+                    count,
+                    page.checkpoint.newest_job_created_at,
+                    page.checkpoint.stopped,
+                )
+                for page, count in zip(pages, inserted)
+                if page.checkpoint is not None
+            ],
+        )
+        with timed("db_group_commit_seconds"):
+            await db.commit()
+    inc("job_rows_written_total", len(jobs), method=method)
+    inc("job_rows_inserted_total", len(write_result.inserted_keys), method=method)
+    inc("job_rows_updated_total", write_result.updated, method=method)
+    logger.info(
+        f"Wrote {len(jobs)} job listings from {len(pages)} pages in one commit, "
+        f"{len(write_result.inserted_keys)} new."
+    )
+    return inserted
+
+
+class BatchWriter:
+    """Single consumer that writes the pages every fetcher of a task produces.
+
+    Fetchers `submit` a page and get a future for how many of its listings
+    were new, so they can keep downloading while it is written. Pages are
+    coalesced until JOB_WRITER_BATCH_ROWS or JOB_WRITER_BATCH_MB is reached
+    or JOB_WRITER_FLUSH_MS passes, then written and committed together with
+    their checkpoints. The queue is bounded, a writer that falls behind makes
+    `submit` wait.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue[PendingPage | None] = asyncio.Queue(
+            maxsize=max(1, config.JOB_WRITER_QUEUE_PAGES)
+        )
+        self._task: asyncio.Task | None = None
+        self._error: Exception | None = None
+
+    async def __aenter__(self) -> "BatchWriter":
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            return
+        await self._queue.put(None)
+        await self._task
+
+    async def submit(
+        self, jobs: list[dict], checkpoint: PageCheckpoint | None = None
+    ) -> asyncio.Future:
+        inserted = asyncio.get_running_loop().create_future()
+        if not jobs and checkpoint is None:
+            # Nothing to write, and no round-trip to find that out. Pagination
+            # stops on it unless the shard is catching up.
+            inserted.set_result(0)
+            return inserted
+        if self._error is not None:
+            raise self._error
+        with timed("job_writer_queue_wait_seconds"):
+            await self._queue.put(
+                PendingPage(jobs, estimated_size(jobs), inserted, checkpoint)
+            )
+        if self._error is not None:
+            # The writer failed while this page was waiting for room
+            self._fail_queued()
+        return inserted
+
+    def _fail_queued(self) -> None:
+        while not self._queue.empty():
+            page = self._queue.get_nowait()
+            if page is not None and not page.inserted.done():
+                page.inserted.set_exception(self._error)
+
+    async def _next_group(self, first: PendingPage) -> tuple[list[PendingPage], bool]:
+        group = [first]
+        rows = len(first.jobs)
+        size = first.size
+        max_rows = config.JOB_WRITER_BATCH_ROWS
+        max_size = config.JOB_WRITER_BATCH_MB * 2**20
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + config.JOB_WRITER_FLUSH_MS / 1000
+        while rows < max_rows and size < max_size:
+            try:
+                page = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    page = await asyncio.wait_for(self._queue.get(), timeout)
+                except TimeoutError:
+                    break
+            if page is None:
+                return group, True
+            group.append(page)
+            rows += len(page.jobs)
+            size += page.size
+        return group, False
+
+    async def _run(self) -> None:
+        try:
+            async with get_db_session() as db:
+                closing = False
+                while not closing:
+                    first = await self._queue.get()
+                    if first is None:
+                        break
+                    group, closing = await self._next_group(first)
+                    await self._write_group(db, group)
+        except Exception as e:
+            # Pages still queued would otherwise wait forever
+            self._error = e
+            self._fail_queued()
+            raise e
+
+    async def _write_group(self, db: AsyncSession, group: list[PendingPage]) -> None:
+        try:
+            inserted = await write_job_batch(db, group)
+        except Exception as e:
+            logger.error(f"Error writing {len(group)} pages of job listings: {e}")
+            for page in group:
+                page.inserted.set_exception(e)
+            await db.rollback()
+            raise e
+        inc("job_writer_commits_total")
+        inc("job_writer_pages_total", len(group))
+        for page, count in zip(group, inserted):
+            page.inserted.set_result(count)
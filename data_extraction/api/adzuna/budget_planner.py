@@ -0,0 +1,141 @@
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+from api.adzuna.shards import Shard, get_countries, parse_shard
+from config import config, logger
+from db.engine import get_db_session
+from repository.ingestion_state import get_incomplete_walks
+from repository.request_ledger import get_page_yields
+
+
+@dataclass
+class ShardHistory:
+    # page -> (calls, new_rows) over the lookback window
+    pages: dict[int, tuple[int, int]] = field(default_factory=dict)
+    last_called_on: date | None = None
+    # The last walk stopped short of the watermark, see IngestionState
+    catching_up: bool = False
+
+
+def __depth_priors(histories: dict[str, ShardHistory]) -> dict[int, float]:
+    calls = defaultdict(int)
+    new_rows = defaultdict(int)
+    for history in histories.values():
+        for page, (page_calls, page_rows) in history.pages.items():
+            calls[page] += page_calls
+            new_rows[page] += page_rows
+    return {page: new_rows[page] / calls[page] for page in calls if calls[page]}
+
+
+def expected_yields(
+    history: ShardHistory, priors: dict[int, float], max_pages: int
+) -> list[float]:
+    """New listings the next call at each depth is expected to bring.
+
+    A shard's own history is blended with the all-shard average at the same
+    depth, so a shard seen once is not written off after one quiet page.
+    Depths nobody has reached yet start optimistic, at a full page, so they
+    get explored. Results are sorted newest first, so a deeper page never
+    yields more than the one before it.
+    """
+    weight = config.ADZUNA_PLANNER_PRIOR_CALLS
+    yields = []
+    previous = float(config.ADZUNA_RESULTS_PER_PAGE)
+    for page in range(1, max_pages + 1):
+        prior = priors.get(page, previous)
+        calls, new_rows = history.pages.get(page, (0, 0))
+        expected = (new_rows + weight * prior) / (calls + weight)
+        previous = min(previous, expected)
+        yields.append(previous)
+    return yields
+
+
+def allocate_pages(
+    shards: list[Shard], histories: dict[str, ShardHistory], budget: int
+) -> dict[str, int]:
+    """Splits `budget` calls into a page limit per shard.
+
+    Every shard is first probed with ADZUNA_PLANNER_MIN_PAGES, those not
+    called for the longest going first when the budget can't cover all of
+    them. Shards catching up on a walk that stopped short come next, up to
+    ADZUNA_PLANNER_MAX_PAGES: they re-read the listings they already have
+    before they get to the missing ones, which their yields can't tell. The
+    rest goes one page at a time to whichever shard's next page is expected
+    to bring the most new listings, until it runs out or no page is worth
+    ADZUNA_PLANNER_MIN_YIELD.
+    """
+    max_pages = max(1, config.ADZUNA_PLANNER_MAX_PAGES)
+    min_pages = min(max(0, config.ADZUNA_PLANNER_MIN_PAGES), max_pages)
+    priors = __depth_priors(histories)
+    yields = {
+        shard.key: expected_yields(
+            histories.get(shard.key, ShardHistory()), priors, max_pages
+        )
+        for shard in shards
+    }
+
+    plan = {shard.key: 0 for shard in shards}
+    probe_order = sorted(
+        shards,
+        key=lambda shard: (
+            histories.get(shard.key, ShardHistory()).last_called_on or date.min
+        ),
+    )
+    for shard in probe_order:
+        pages = min(min_pages, budget)
+        plan[shard.key] = pages
+        budget -= pages
+    for shard in probe_order:
+        if histories.get(shard.key, ShardHistory()).catching_up:
+            pages = min(max_pages - plan[shard.key], budget)
+            plan[shard.key] += pages
+            budget -= pages
+
+    heap = [
+        (-yields[key][pages], key)
+        for key, pages in plan.items()
+        if 0 < pages < max_pages or (pages == 0 and min_pages == 0)
+    ]
+    heapq.heapify(heap)
+    while budget > 0 and heap:
+        negative_yield, key = heapq.heappop(heap)
+        if -negative_yield < config.ADZUNA_PLANNER_MIN_YIELD:
+            break
+        plan[key] += 1
+        budget -= 1
+        if plan[key] < max_pages:
+            heapq.heappush(heap, (-yields[key][plan[key]], key))
+    return plan
+
+
+async def plan_request_budget(shard_keys: list[str]) -> dict[str, int]:
+    """Page limit per shard for this run, shards left at 0 are skipped."""
+    shards = [parse_shard(key) for key in shard_keys]
+    # The categories calls made earlier in the run come out of the budget
+    budget = max(0, config.ADZUNA_RUN_REQUEST_BUDGET - len(get_countries()))
+    since = datetime.now(timezone.utc).date() - timedelta(
+        days=config.ADZUNA_PLANNER_LOOKBACK_DAYS
+    )
+    async with get_db_session() as db:
+        rows = await get_page_yields(db, config.ADZUNA_SOURCE_PLACEHOLDER, since)
+        incomplete = await get_incomplete_walks(db, config.ADZUNA_SOURCE_PLACEHOLDER)
+
+    histories: dict[str, ShardHistory] = defaultdict(ShardHistory)
+    for country, category, page, calls, new_rows, last_day in rows:
+        history = histories[Shard(country, category).key]
+        history.pages[page] = (calls, new_rows)
+        if history.last_called_on is None or last_day > history.last_called_on:
+            history.last_called_on = last_day
+    for country, category in incomplete:
+        histories[Shard(country, category).key].catching_up = True
+
+    plan = allocate_pages(shards, histories, budget)
+    planned = sum(plan.values())
+    skipped = sum(1 for pages in plan.values() if pages == 0)
+    logger.info(
+        f"Planned {planned} of {budget} calls across {len(plan) - skipped} shards, "
+        f"{skipped} skipped this run."
+    )
+    return plan
@@ -0,0 +1,66 @@
+from datetime import datetime
+
+import msgspec
+
+
+class AdzunaJob(msgspec.Struct, gc=False):
+    """One search result, only the fields we store are decoded.
+
+    Structs are slotted and `gc=False` keeps the cyclic GC from walking
+    every decoded job. `created` is parsed by msgspec while decoding, so
+    timestamps never exist as intermediate strings.
+    """
+
+    id: str
+    title: str | None = None
+    description: str | None = None
+    redirect_url: str | None = None
+    created: datetime | None = None
+    # Kept as sent, a whole number salary stays an int so stored values and
+    # content hashes match those of listings written from plain JSON
+    salary_min: int | float | None = None
+    salary_max: int | float | None = None
+    location: dict | None = None
+    company: dict | None = None
+
+
+class AdzunaJobPage(msgspec.Struct, gc=False):
+    # Jobs are decoded one at a time, so one malformed job is skipped
+    # instead of failing the whole page
+    results: list[msgspec.Raw] = []
+    count: int | None = None
+
+
+__page_decoder = msgspec.json.Decoder(AdzunaJobPage)
+# strict=False accepts salaries sent as strings
+__job_decoder = msgspec.json.Decoder(AdzunaJob, strict=False)
+
+
+def decode_job_page(raw_page: bytes) -> AdzunaJobPage:
+    return __page_decoder.decode(raw_page)
+
+
+def decode_job(raw_job: msgspec.Raw) -> AdzunaJob:
+    return __job_decoder.decode(raw_job)
+
+
+def job_listing_row(
+    job: AdzunaJob,
+    source: str,
+    country: str,
+    category_id: int,
+) -> dict:
+    return {
+        "source": source,
+        "job_id": job.id,
+        "country": country,
+        "minimum_salary": job.salary_min,
+        "maximum_salary": job.salary_max,
+        "job_post_url": job.redirect_url,
+        "location": job.location,
+        "job_title": job.title,
+        "job_created_at": job.created,
+        "job_description": job.description,
+        "company": job.company,
+        "category_id": category_id,
+    }
@@ -1,4 +1,8 @@
-import httpx
+import asyncio
+
+from api.adzuna.shards import country_endpoint, get_countries
+from api.http_cache import is_unchanged
+from api.http_client import get_with_retry
 from config import config, logger, read_mock_data
 
 
@@ -7,29 +11,38 @@ def mock_categories_response() -> dict:
     return read_mock_data("categories.json")
 
 
-async def fetch_categories() -> dict:
-    logger.info("Fetching categories from Adzuna API...")
+async def fetch_categories(country: str) -> dict:
+    """{"categories": <API response>, "unchanged": <same as last fetch>}"""
+    logger.info(f"Fetching categories for country {country} from Adzuna API...")
     params = {
         "app_id": config.APP_ID,
         "app_key": config.APP_KEY,
     }
-    category_url = config.ADZUNA_BASE_URL + config.ADZUNA_GB_CATEGORIES_ENDPOIN
-    async with httpx.AsyncClient(trust_env=False, timeout=30) as client:
-        if config.ENVIRONMENT in ["local", "dev"]:
-            return mock_categories_response()
-        response = await client.get(
-            category_url,
-            params=params,
-            headers={"accept": "application/json"},
+    category_url = country_endpoint(config.ADZUNA_CATEGORIES_ENDPOINT, country)
+    if config.ENVIRONMENT in ["local", "dev"]:
+        return {"categories": mock_categories_response(), "unchanged": False}
+    # Categories almost never change, a cached copy is revalidated instead
+    # of downloaded again
+    response = await get_with_retry(
+        category_url, params, cache_ttl=config.HTTP_CACHE_CATEGORIES_TTL_SECONDS
+    )
+    if response.status_code != 200:
+        raise Exception(
+            f"Failed to fetch categories for country {country} from Adzuna API. Status code: {response.status_code}, message: {response.text}"
         )
-        if response.status_code == 429:
-            raise Exception(
-                f"Rate limit exceeded when fetching categories from Adzuna API. message: {response.text}"
-            )
-        if response.status_code != 200:
-            raise Exception(
-                f"Failed to fetch categories from Adzuna API. Status code: {response.status_code}, message: {response.text}"
-            )
     data = response.json()
-    logger.info("Categories fetched successfully.")
-    return data
+    unchanged = is_unchanged(response)
+    logger.info(
+        f"Categories for country {country} fetched successfully"
+        f"{', unchanged since the last fetch' if unchanged else ''}."
+    )
+    return {"categories": data, "unchanged": unchanged}
+
+
+async def fetch_categories_by_country() -> dict[str, dict]:
+    countries = get_countries()
+    # Requests share the process rate limiter, so this stays within quota
+    responses = await asyncio.gather(
+        *(fetch_categories(country) for country in countries)
+    )
+    return dict(zip(countries, responses))
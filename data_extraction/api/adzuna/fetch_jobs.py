@@ -1,133 +1,613 @@
-from datetime import datetime, timezone
+import asyncio
+import math
+from datetime import date, datetime, timedelta, timezone
 
-import httpx
-from config import config, logger, read_mock_data
+import msgspec
+
+from api.adzuna.batch_writer import BatchWriter, PageCheckpoint
+from api.adzuna.decode import (
+    AdzunaJobPage,
+    decode_job,
+    decode_job_page,
+    job_listing_row,
+)
+from api.adzuna.known_ids import KnownJobIds, load_known_job_ids
+from api.adzuna.landing import iter_landed_pages, land_page, new_run_id
+from api.adzuna.shards import Shard, country_endpoint, parse_shard
+from api.http_client import get_with_retry
+from config import config, logger, read_mock_bytes
 from db.engine import get_db_session
-from repository.category import get_category_id_by_tag
-from repository.jobs import insert_job_listings_batch
+from repository.category import get_category_id_by_country_and_tag
+from repository.checkpoints import (
+    ShardProgress,
+    delete_checkpoints_before,
+    finish_checkpoint,
+    get_latest_checkpoint,
+)
+from repository.ingestion_state import get_ingestion_state, update_watermark
+from repository.request_ledger import record_page_requests
+from repository.jobs import (
+    bulk_load_job_listings,
+    job_content_hash,
+    upsert_job_listings_batch,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from telemetry.metrics import inc, timed, timed_coroutine
 
 
-async def __form_iso_format(date_str: str) -> datetime | None:
-    if date_str:
-        res = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-    else:
-        res = datetime.now(timezone.utc)
-        logger.warning("Job has no created_at, using current UTC time")
-    return res
-
-
-async def __extract_new_job_data(db: AsyncSession, data: dict, category_id: int) -> int:
-    results = data.get("results", [])
-    if not results:
-        return 0
-
+def __extract_new_job_data(
+    page: AdzunaJobPage,
+    country: str,
+    category_id: int,
+    known_ids: KnownJobIds | None = None,
+) -> list[dict]:
     jobs_batch = []
+    skipped_known = 0
+    skipped_unchanged = 0
+    skipped_invalid = 0
+    skipped_no_created = 0
 
-    for job in results:
-        try:
-            job_created_at = await __form_iso_format(job.get("created"))
-            jobs_batch.append(
-                {
-                    "source": config.ADZUNA_SOURCE_PLACEHOLDER,
-                    "job_id": job.get("id"),
-                    "minimum_salary": job.get("salary_min"),
-                    "maximum_salary": job.get("salary_max"),
-                    "job_post_url": job.get("redirect_url"),
-                    "location": job.get("location"),
-                    "job_title": job.get("title"),
-                    "job_created_at": job_created_at,
-                    "job_description": job.get("description"),
-                    "company": job.get("company"),
-                    "category_id": category_id,
-                }
+    with timed("job_transform_seconds"):
+        for raw_job in page.results:
+            try:
+                job = decode_job(raw_job)
+            except msgspec.ValidationError as e:
+                skipped_invalid += 1
+                logger.warning(f"Error processing job listing: {e}")
+                continue
+            if (
+                known_ids is not None
+                and not known_ids.compare_hashes
+                and job.id in known_ids
+            ):
+                skipped_known += 1
+                continue
+            if job.created is None:
+                # The partition key, a stand-in date would change on every
+                # fetch and store the job again each time
+                skipped_no_created += 1
+                logger.warning(f"Job {job.id} has no created date. Skipping.")
+                continue
+            job_data = job_listing_row(
+                job,
+                config.ADZUNA_SOURCE_PLACEHOLDER,
+                country,
+                category_id,
             )
+            job_data["content_hash"] = job_content_hash(job_data)
+            if known_ids is not None and known_ids.is_unchanged(
+                job_data["job_id"], job_data["content_hash"]
+            ):
+                skipped_unchanged += 1
+                continue
+            jobs_batch.append(job_data)
 
-        except Exception as e:
-            logger.warning(f"Error processing job listing: {e}")
-
-    inserted_jobs = await insert_job_listings_batch(db, jobs_batch)
-    return inserted_jobs
+    inc("job_rows_received_total", len(page.results))
+    inc("job_rows_skipped_total", skipped_known, reason="known")
+    inc("job_rows_skipped_total", skipped_unchanged, reason="unchanged")
+    inc("job_rows_skipped_total", skipped_invalid, reason="invalid")
+    inc("job_rows_skipped_total", skipped_no_created, reason="no_created")
+    if skipped_known or skipped_unchanged:
+        logger.info(
+            f"Skipped {skipped_known + skipped_unchanged} already stored job listings."
+        )
+    return jobs_batch
 
 
-def mock_job_response(category_tag: str) -> dict:
-    return read_mock_data(f"{category_tag}.json")
+def mock_job_response(category_tag: str) -> bytes:
+    return read_mock_bytes(f"{category_tag}.json")
 
 
+@timed_coroutine("adzuna_http_request_seconds")
 async def fetch_data_from_api(
     current_page_url: str,
     params: dict,
-    category: str,
+    shard_key: str,
     page: int,
-    client: httpx.AsyncClient,
-):
-    response = await client.get(
-        current_page_url,
-        params=params,
-        headers={"accept": "application/json"},
+) -> bytes | None:
+    response = await get_with_retry(
+        current_page_url, params, cache_ttl=config.HTTP_CACHE_SEARCH_TTL_SECONDS
     )
-    if response.status_code == 429:
-        raise Exception(
-            f"Rate limit exceeded when fetching jobs for category {category} on page {page}. message: {response.text}"
-        )
+    inc("adzuna_response_bytes_total", len(response.content))
     if response.status_code != 200:
         logger.warning(
-            f"Failed to fetch jobs for category {category} on page {page}. Status code: {response.status_code}"
+            f"Failed to fetch jobs for shard {shard_key} on page {page}. Status code: {response.status_code}"
         )
         return None
-    data = response.json()
-    return data
+    return response.content
+
+
+async def __fetch_page(
+    shard: Shard,
+    search_endpoint: str,
+    params: dict,
+    page: int,
+    run_id: str,
+) -> AdzunaJobPage | None:
+    logger.info(f"Fetching page {page} for shard {shard.key}...")
+    if config.ENVIRONMENT in ["local", "dev"]:
+        raw_page = mock_job_response(shard.category)
+    else:
+        current_page_url = f"{search_endpoint}/{str(page)}"
+        raw_page = await fetch_data_from_api(current_page_url, params, shard.key, page)
+        if raw_page is None:
+            return None
+    inc("adzuna_pages_total")
+    if config.LANDING_ZONE_ENABLED:
+        with timed("landing_write_seconds"):
+            await land_page(shard.country, shard.category, page, run_id, raw_page)
+    with timed("adzuna_decode_seconds"):
+        return decode_job_page(raw_page)
+
+
+def __created_range(page: AdzunaJobPage) -> tuple[datetime | None, datetime | None]:
+    """Oldest and newest created date on a page, known listings included."""
+    created = []
+    for raw_job in page.results:
+        try:
+            job = decode_job(raw_job)
+        except msgspec.ValidationError:
+            continue
+        if job.created is not None:
+            created.append(job.created)
+    return min(created, default=None), max(created, default=None)
+
+
+def __resolved(data: AdzunaJobPage | None) -> asyncio.Future:
+    future = asyncio.get_running_loop().create_future()
+    future.set_result(data)
+    return future
 
 
-async def __handle_pagination_by_category(
-    db: AsyncSession, search_endpoint: str, params: dict, category_id: int
+def __incremental_params(params: dict, cutoff: datetime | None) -> dict:
+    # Newest first, so pagination can stop as soon as it reaches the watermark
+    incremental_params = {**params, "sort_by": "date"}
+    if cutoff is not None:
+        days_old = (datetime.now(timezone.utc) - cutoff).total_seconds() / 86400
+        incremental_params["max_days_old"] = max(1, math.ceil(days_old))
+    elif config.ADZUNA_INITIAL_MAX_DAYS_OLD > 0:
+        incremental_params["max_days_old"] = config.ADZUNA_INITIAL_MAX_DAYS_OLD
+    return incremental_params
+
+
+async def __handle_pagination_by_shard(
+    db: AsyncSession,
+    writer: BatchWriter,
+    shard: Shard,
+    search_endpoint: str,
+    params: dict,
+    category_id: int,
+    page_limit: int | None = None,
+    dag_run_id: str | None = None,
 ):
-    category = params["category"]
-    i = 1
-    async with httpx.AsyncClient(timeout=30) as client:
-        while True:
-            logger.info(f"Fetching page {i} for category {category}...")
-            current_page_url = f"{search_endpoint}/{str(i)}"
-            if config.ENVIRONMENT in ["local", "dev"]:
-                data = mock_job_response(category)
-            else:
-                data = await fetch_data_from_api(
-                    current_page_url, params, category, i, client
+    run_started_at = datetime.now(timezone.utc)
+    run_id = new_run_id()
+    newest_created_at = None
+    first_page = 1
+    # Pagination already ended in an earlier attempt of this DAG run
+    paginate = True
+    # The walk got back to the watermark, to listings stored before, or to
+    # the end of the results. Only then is everything newer than it stored.
+    walk_complete = False
+    # An earlier walk stopped short of the watermark. Listings already stored
+    # sit above the ones it never got to, so they don't end this walk.
+    catching_up = False
+    cutoff = None
+    # Where the last catch-up stopped, see IngestionState.resume_page
+    resume_page = None
+    resume_before = None
+    if config.ADZUNA_INCREMENTAL:
+        state = await get_ingestion_state(
+            db, config.ADZUNA_SOURCE_PLACEHOLDER, shard.country, shard.category
+        )
+        if state is not None:
+            catching_up = state.walk_incomplete
+            if catching_up:
+                resume_page = state.resume_page
+                resume_before = state.resume_before
+            if state.latest_job_created_at is not None:
+                # Re-read a small overlap to catch postings indexed late by the API
+                cutoff = state.latest_job_created_at - timedelta(
+                    hours=config.ADZUNA_WATERMARK_OVERLAP_HOURS
+                )
+                logger.info(f"Fetching jobs for shard {shard.key} newer than {cutoff}")
+        if catching_up:
+            logger.info(
+                f"Shard {shard.key} stopped short of its watermark before, catching up."
+            )
+        params = __incremental_params(params, cutoff)
+
+    # A catch-up continues below the pages earlier runs walked. Restarting at
+    # page 1 would spend the page limit on them again and a backlog deeper
+    # than the limit would never be walked to the end.
+    walk_start = 1
+    if resume_page is not None:
+        walk_start = max(1, resume_page + 1 - config.ADZUNA_RESUME_OVERLAP_PAGES)
+        first_page = walk_start
+        logger.info(f"Resuming the catch-up of shard {shard.key} at page {walk_start}.")
+
+    progress = None
+    if dag_run_id is not None:
+        progress = ShardProgress(
+            dag_run_id,
+            config.ADZUNA_SOURCE_PLACEHOLDER,
+            shard.country,
+            shard.category,
+        )
+        checkpoint = await get_latest_checkpoint(
+            db, dag_run_id, progress.source, shard.country, shard.category
+        )
+        if checkpoint is not None:
+            if checkpoint.finished:
+                logger.info(
+                    f"Shard {shard.key} already finished in run {dag_run_id}. Skipping."
+                )
+                return
+            logger.info(
+                f"Resuming shard {shard.key} after page {checkpoint.page}, "
+                f"{checkpoint.total_new_rows} new jobs were committed before."
+            )
+            progress.page = checkpoint.page
+            progress.total_new_rows = checkpoint.total_new_rows
+            newest_created_at = checkpoint.newest_job_created_at
+            first_page = checkpoint.page + 1
+            if checkpoint.page < walk_start:
+                # The earlier attempt missed the resume point and went back
+                # to page 1
+                walk_start = 1
+            # Cleared once pages are walked below it
+            resume_page = checkpoint.page
+            resume_before = None
+            walk_complete = checkpoint.stopped or (
+                checkpoint.new_rows == 0 and not catching_up
+            )
+            paginate = not walk_complete
+    # The page limit is a number of calls, counted from where the walk starts
+    last_page = None if page_limit is None else walk_start + page_limit - 1
+    if last_page is not None and first_page > last_page:
+        paginate = False
+
+    known_ids = None
+    if config.KNOWN_JOB_ID_FILTER and paginate:
+        known_ids = await load_known_job_ids(db, category_id, cutoff)
+
+    # page -> (calls, new rows) for the request ledger
+    ledger_pages: dict[int, tuple[int, int]] = {}
+    window = max(1, config.ADZUNA_PAGE_WINDOW)
+    in_flight: dict[int, asyncio.Future] = {}
+    missed_page = None
+    if paginate and first_page == walk_start > 1 and resume_before is not None:
+        # Listings above the resume point that expired move the rest up. If
+        # more moved than the overlap covers, the first page starts below
+        # where the last run stopped and the ones in between would be skipped.
+        data = await __fetch_page(shard, search_endpoint, params, first_page, run_id)
+        newest_on_page = None if data is None else __created_range(data)[1]
+        if newest_on_page is not None and newest_on_page < resume_before:
+            logger.info(
+                f"Listings of shard {shard.key} moved past its resume point. Restarting at page 1."
+            )
+            missed_page = first_page
+            walk_start = first_page = 1
+            last_page = None if page_limit is None else page_limit - 1
+            paginate = last_page is None or last_page >= 1
+        else:
+            in_flight[first_page] = __resolved(data)
+    next_page = first_page + len(in_flight)
+    i = first_page
+    # The last page handed to the writer, the next catch-up resumes below it
+    walked_page = None
+    walked_data = None
+    # The previous page's write, it runs while the next page downloads. Only
+    # brand new listings keep pagination going, changed ones don't.
+    pending_write: asyncio.Future | None = None
+    pending_rows = 0
+    try:
+        while paginate:
+            if pending_write is not None and (
+                pending_write.done() or (not pending_rows and not catching_up)
+            ):
+                # Settled before another page is requested. A page of only
+                # known jobs brought nothing and ends the walk without one,
+                # its write only saves the checkpoint.
+                inserted_data = await pending_write
+                pending_write = None
+                ledger_pages[i - 1] = (1, inserted_data)
+                if inserted_data == 0 and not catching_up:
+                    walk_complete = True
+                    logger.info(
+                        f"No new jobs found for shard {shard.key} on page {i - 1}. Stopping pagination."
+                    )
+                    break
+            # Keep up to `window` pages requested ahead, writes stay in page order
+            while len(in_flight) < window and (
+                last_page is None or next_page <= last_page
+            ):
+                in_flight[next_page] = asyncio.create_task(
+                    __fetch_page(shard, search_endpoint, params, next_page, run_id)
                 )
-                if data is None:
+                next_page += 1
+            data = await in_flight.pop(i)
+            if pending_write is not None:
+                inserted_data = await pending_write
+                pending_write = None
+                ledger_pages[i - 1] = (1, inserted_data)
+                if inserted_data == 0 and not catching_up:
+                    # Page i was read ahead and spent a call, it counts as one
+                    # that brought nothing
+                    ledger_pages[i] = (1, 0)
+                    walk_complete = True
+                    logger.info(
+                        f"No new jobs found for shard {shard.key} on page {i - 1}. Stopping pagination."
+                    )
                     break
-            inserted_data = await __extract_new_job_data(db, data, category_id)
-            if inserted_data == 0:
+            if data is None:
+                ledger_pages[i] = (1, 0)
+                logger.warning(
+                    f"Page {i} of shard {shard.key} failed. Stopping pagination, the watermark stays."
+                )
+                break
+            if not data.results:
+                ledger_pages[i] = (1, 0)
+                walk_complete = True
+                logger.info(
+                    f"Reached the end of the results for shard {shard.key} on page {i}. Stopping pagination."
+                )
+                break
+            jobs_batch = __extract_new_job_data(
+                data, shard.country, category_id, known_ids
+            )
+            crossed_watermark = False
+            if cutoff is not None:
+                new_jobs = [
+                    job for job in jobs_batch if job["job_created_at"] >= cutoff
+                ]
+                crossed_watermark = len(new_jobs) < len(jobs_batch)
+                jobs_batch = new_jobs
+            newest_created_at = max(
+                (
+                    created_at
+                    for created_at in (
+                        newest_created_at,
+                        *(job["job_created_at"] for job in jobs_batch),
+                    )
+                    if created_at is not None
+                ),
+                default=None,
+            )
+            last_planned_page = last_page is not None and i >= last_page
+            page_checkpoint = None
+            if progress is not None:
+                page_checkpoint = PageCheckpoint(
+                    progress,
+                    i,
+                    newest_created_at,
+                    crossed_watermark,
+                )
+            # A page of only known jobs ends up empty and resolves to 0,
+            # without a round-trip to the database unless its checkpoint is
+            # saved.
+            pending_write = await writer.submit(jobs_batch, page_checkpoint)
+            pending_rows = len(jobs_batch)
+            walked_page = i
+            walked_data = data
+            if known_ids is not None:
+                known_ids.add(jobs_batch)
+            if crossed_watermark:
+                walk_complete = True
+                logger.info(
+                    f"Reached the watermark for shard {shard.key} on page {i}. Stopping pagination."
+                )
+                break
+            if last_planned_page:
                 logger.info(
-                    f"No new jobs found for category {category} on page {i}. Stopping pagination."
+                    f"Spent the {page_limit} planned pages for shard {shard.key} on page {i}. Stopping pagination."
                 )
                 break
             i += 1
+    finally:
+        for page, task in in_flight.items():
+            # Read ahead and no longer needed, the request was likely sent
+            ledger_pages[page] = (1, 0)
+            task.cancel()
+        await asyncio.gather(*in_flight.values(), return_exceptions=True)
+
+    if pending_write is not None:
+        inserted_data = await pending_write
+        ledger_pages[i] = (1, inserted_data)
+        if inserted_data == 0 and not catching_up:
+            walk_complete = True
+    if missed_page is not None:
+        calls, inserted_data = ledger_pages.get(missed_page, (0, 0))
+        ledger_pages[missed_page] = (calls + 1, inserted_data)
+    await record_page_requests(
+        db,
+        config.ADZUNA_SOURCE_PLACEHOLDER,
+        shard.country,
+        shard.category,
+        ledger_pages,
+    )
+    if config.ADZUNA_INCREMENTAL:
+        if newest_created_at is not None:
+            # A created date ahead of the clock would move the watermark past
+            # postings that are still to come
+            newest_created_at = min(newest_created_at, run_started_at)
+        if walk_complete:
+            resume_page = resume_before = None
+        elif walked_page is not None:
+            resume_page = walked_page
+            resume_before = __created_range(walked_data)[0]
+        # Listings between where the walk stopped, on a failed page or the
+        # page limit, and the old watermark were never fetched. Moving the
+        # watermark past them would skip them for good, so it stays and the
+        # next run catches up from the resume point. A catch-up that resumed
+        # below the top only moves it up to what it saw, the next walk from
+        # page 1 stops at the listings the catch-up stored first.
+        await update_watermark(
+            db,
+            config.ADZUNA_SOURCE_PLACEHOLDER,
+            shard.country,
+            shard.category,
+            newest_created_at if walk_complete else None,
+            walk_incomplete=not walk_complete,
+            resume_page=resume_page,
+            resume_before=resume_before,
+        )
+    if progress is not None:
+        # Last, a retry that lands before this only repeats the bookkeeping
+        await finish_checkpoint(db, progress, newest_created_at)
+
+
+async def __fetch_shard(
+    shard: Shard,
+    params: dict,
+    category_id: int,
+    page_limit: int | None,
+    dag_run_id: str | None,
+    writer: BatchWriter,
+    semaphore: asyncio.Semaphore,
+):
+    search_endpoint = country_endpoint(config.ADZUNA_JOBS_ENDPOINT, shard.country)
+    # Each shard gets its own session, an AsyncSession can't be shared
+    # between concurrently running tasks.
+    async with semaphore, get_db_session() as db:
+        await __handle_pagination_by_shard(
+            db,
+            writer,
+            shard,
+            search_endpoint,
+            {**params, "category": shard.category},
+            category_id,
+            page_limit,
+            dag_run_id,
+        )
 
 
-async def fetch_jobs_by_category(categories: list[str]) -> None:
+async def __replay_batch(db: AsyncSession, jobs_batch: list[dict]) -> int:
+    if not jobs_batch:
+        return 0
+    if config.JOB_LISTING_LOAD_METHOD == "upsert":
+        upsert_result = await upsert_job_listings_batch(db, jobs_batch)
+        return upsert_result.inserted
+    # COPY has no bind parameter limit, which matters at replay batch sizes
+    return await bulk_load_job_listings(db, jobs_batch)
+
+
+async def __replay_shard(
+    shard: Shard,
+    category_id: int,
+    since: date | None,
+    until: date | None,
+    semaphore: asyncio.Semaphore,
+):
+    async with semaphore, get_db_session() as db:
+        jobs_batch = []
+        inserted_jobs = 0
+        async for data in iter_landed_pages(
+            shard.country, shard.category, since, until
+        ):
+            jobs_batch.extend(__extract_new_job_data(data, shard.country, category_id))
+            if len(jobs_batch) >= config.LANDING_REPLAY_BATCH_SIZE:
+                inserted_jobs += await __replay_batch(db, jobs_batch)
+                jobs_batch = []
+        inserted_jobs += await __replay_batch(db, jobs_batch)
+        logger.info(
+            f"Replayed shard {shard.key} from the landing zone, {inserted_jobs} new jobs."
+        )
+
+
+def __resolve_category_id(
+    category_id_map: dict[tuple[str, str], int], shard: Shard
+) -> int:
+    category_id = category_id_map.get((shard.country, shard.category))
+    if category_id is None:
+        logger.warning(
+            f"Category ID not found for shard {shard.key}. Using UNKNOWN_JOB_CATEGORY_ID_VALUE."
+        )
+        category_id = config.UNKNOWN_JOB_CATEGORY_ID_VALUE
+    return category_id
+
+
+async def replay_jobs_by_shard(
+    shard_keys: list[str],
+    since: date | None = None,
+    until: date | None = None,
+) -> None:
+    logger.info("Replaying jobs from the landing zone...")
+    try:
+        shards = [parse_shard(key) for key in shard_keys]
+        async with get_db_session() as db:
+            category_id_map = await get_category_id_by_country_and_tag(db)
+
+        semaphore = asyncio.Semaphore(max(1, config.ADZUNA_CATEGORY_CONCURRENCY))
+        async with asyncio.TaskGroup() as task_group:
+            for shard in shards:
+                task_group.create_task(
+                    __replay_shard(
+                        shard,
+                        __resolve_category_id(category_id_map, shard),
+                        since,
+                        until,
+                        semaphore,
+                    )
+                )
+        logger.info("Jobs replayed successfully.")
+    except Exception as e:
+        logger.error(f"Error replaying jobs from the landing zone: {e}")
+        raise e
+
+
+async def fetch_jobs_by_shard(
+    shard_keys: list[str],
+    replay: bool = False,
+    since: date | None = None,
+    until: date | None = None,
+    page_limits: dict[str, int | None] | None = None,
+    dag_run_id: str | None = None,
+) -> None:
+    if replay:
+        # Rebuild job_listing from landed raw pages, without touching the API
+        return await replay_jobs_by_shard(shard_keys, since, until)
+
     logger.info("Fetching jobs from Adzuna API...")
-    async with get_db_session() as db:
-        try:
-            search_endpoint = config.ADZUNA_BASE_URL + config.ADZUNA_GB_JOBS_ENDPOIN
-            params = {
-                "app_id": config.APP_ID,
-                "app_key": config.APP_KEY,
-                "results_per_page": 100,
-            }
-            category_id_map = await get_category_id_by_tag(db)
-            for category in categories:
-                params["category"] = category
-                category_id = category_id_map.get(category)
-                if category_id is None:
-                    logger.warning(
-                        f"Category ID not found for tag {category}. Using UNKNOWN_JOB_CATEGORY_ID_VALUE."
+    try:
+        shards = [parse_shard(key) for key in shard_keys]
+        params = {
+            "app_id": config.APP_ID,
+            "app_key": config.APP_KEY,
+            "results_per_page": config.ADZUNA_RESULTS_PER_PAGE,
+        }
+        if not config.INGESTION_CHECKPOINTS_ENABLED:
+            dag_run_id = None
+        async with get_db_session() as db:
+            category_id_map = await get_category_id_by_country_and_tag(db)
+            if dag_run_id is not None:
+                await delete_checkpoints_before(
+                    db,
+                    datetime.now(timezone.utc)
+                    - timedelta(days=config.INGESTION_CHECKPOINT_RETENTION_DAYS),
+                )
+
+        # Shards of every country draw from the one process rate limiter
+        semaphore = asyncio.Semaphore(max(1, config.ADZUNA_CATEGORY_CONCURRENCY))
+        # One writer for every shard of the task, their pages share commits
+        async with BatchWriter() as writer, asyncio.TaskGroup() as task_group:
+            for shard in shards:
+                # Pages from the budget planner, None pages until no new jobs
+                page_limit = (page_limits or {}).get(shard.key)
+                if page_limit == 0:
+                    continue
+                task_group.create_task(
+                    __fetch_shard(
+                        shard,
+                        params,
+                        __resolve_category_id(category_id_map, shard),
+                        page_limit,
+                        dag_run_id,
+                        writer,
+                        semaphore,
                     )
-                    category_id = config.UNKNOWN_JOB_CATEGORY_ID_VALUE
-                await __handle_pagination_by_category(
-                    db, search_endpoint, params, category_id
                 )
-            logger.info("Jobs fetched successfully.")
-        except Exception as e:
-            logger.error(f"Error fetching jobs from Adzuna API: {e}")
-            raise e
+        logger.info("Jobs fetched successfully.")
+    except Exception as e:
+        logger.error(f"Error fetching jobs from Adzuna API: {e}")
+        raise e
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from config import config
+from repository.jobs import get_job_content_hashes
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class KnownJobIds:
+    """Job IDs of one category that are already stored, mapped to their hash.
+
+    Lets pagination drop duplicates before they are transformed or sent to
+    Postgres. When `compare_hashes` is set (upsert mode) a known job is only
+    dropped if its content hash is unchanged.
+    """
+
+    def __init__(self, content_hashes: dict[str, str | None], compare_hashes: bool):
+        self._content_hashes = content_hashes
+        self.compare_hashes = compare_hashes
+
+    def __len__(self) -> int:
+        return len(self._content_hashes)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._content_hashes
+
+    def is_unchanged(self, job_id: str, content_hash: str) -> bool:
+        return (
+            job_id in self._content_hashes
+            and self._content_hashes[job_id] == content_hash
+        )
+
+    def add(self, jobs: list[dict]) -> None:
+        for job in jobs:
+            self._content_hashes[job["job_id"]] = job.get("content_hash")
+
+
+async def load_known_job_ids(
+    db: AsyncSession,
+    category_id: int,
+    created_since: datetime | None = None,
+) -> KnownJobIds:
+    # With a watermark only the overlap window can repeat, so only that part
+    # of the category has to be held in memory.
+    content_hashes = await get_job_content_hashes(
+        db, config.ADZUNA_SOURCE_PLACEHOLDER, category_id, created_since
+    )
+    return KnownJobIds(
+        content_hashes, compare_hashes=config.JOB_LISTING_LOAD_METHOD == "upsert"
+    )
@@ -0,0 +1,122 @@
+import asyncio
+import gzip
+import json
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator
+
+from api.adzuna.decode import AdzunaJobPage, decode_job_page
+from config import config, logger
+
+MANIFEST_FILE_NAME = "_manifest.ndjson"
+
+
+def __country_dir(country: str) -> Path:
+    return (
+        Path(config.LANDING_ZONE_PATH)
+        / config.ADZUNA_SOURCE_PLACEHOLDER.lower()
+        / country
+    )
+
+
+def __partition_dir(country: str, category: str, day: date) -> Path:
+    return __country_dir(country) / f"dt={day.isoformat()}" / f"category={category}"
+
+
+def new_run_id() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+
+
+def __write_page(
+    country: str, category: str, page: int, run_id: str, raw_page: bytes
+) -> None:
+    fetched_at = datetime.now(timezone.utc)
+    partition_dir = __partition_dir(country, category, fetched_at.date())
+    partition_dir.mkdir(parents=True, exist_ok=True)
+    file_name = f"{run_id}-p{page:05d}.ndjson.gz"
+
+    # Whitespace newlines are the only newlines valid JSON can contain, so
+    # folding them keeps the whole page on one NDJSON line.
+    line = raw_page.replace(b"\r", b" ").replace(b"\n", b" ") + b"\n"
+    tmp_path = partition_dir / f".{file_name}.tmp"
+    with gzip.open(
+        tmp_path, "wb", compresslevel=config.LANDING_ZONE_COMPRESS_LEVEL
+    ) as f:
+        f.write(line)
+    os.replace(tmp_path, partition_dir / file_name)
+
+    entry = {
+        "file": file_name,
+        "source": config.ADZUNA_SOURCE_PLACEHOLDER,
+        "country": country,
+        "category": category,
+        "run_id": run_id,
+        "page": page,
+        "bytes": len(raw_page),
+        "fetched_at": fetched_at.isoformat(),
+    }
+    with (partition_dir / MANIFEST_FILE_NAME).open("a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+async def land_page(
+    country: str, category: str, page: int, run_id: str, raw_page: bytes
+) -> None:
+    await asyncio.to_thread(__write_page, country, category, page, run_id, raw_page)
+
+
+def __landed_files(
+    country: str, category: str, since: date | None, until: date | None
+) -> list[Path]:
+    country_dir = __country_dir(country)
+    entries = []
+    for manifest in country_dir.glob(f"dt=*/category={category}/{MANIFEST_FILE_NAME}"):
+        day = date.fromisoformat(manifest.parent.parent.name.removeprefix("dt="))
+        if (since and day < since) or (until and day > until):
+            continue
+        with manifest.open("r", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                entries.append((day, entry["run_id"], entry["page"], entry["file"]))
+    # Oldest first, so a later snapshot of a listing wins in upsert mode
+    entries.sort()
+    return [
+        country_dir / f"dt={day.isoformat()}" / f"category={category}" / file_name
+        for day, _, _, file_name in entries
+    ]
+
+
+def __read_page(path: Path) -> AdzunaJobPage:
+    # Decoding in the reader thread keeps it off the event loop
+    with gzip.open(path, "rb") as f:
+        return decode_job_page(f.read())
+
+
+async def iter_landed_pages(
+    country: str,
+    category: str,
+    since: date | None = None,
+    until: date | None = None,
+) -> AsyncIterator[AdzunaJobPage]:
+    files = await asyncio.to_thread(__landed_files, country, category, since, until)
+    logger.info(f"Replaying {len(files)} landed pages for {country}/{category}...")
+    workers = max(1, config.LANDING_REPLAY_WORKERS)
+    loop = asyncio.get_running_loop()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Bounded read-ahead keeps every reader busy without holding the
+        # whole date range in memory, and pages still come out in order.
+        pending = deque()
+        files_iter = iter(files)
+        for path in files_iter:
+            pending.append(loop.run_in_executor(executor, __read_page, path))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            data = await pending.popleft()
+            next_path = next(files_iter, None)
+            if next_path is not None:
+                pending.append(loop.run_in_executor(executor, __read_page, next_path))
+            yield data
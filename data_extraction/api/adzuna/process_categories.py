@@ -1,9 +1,13 @@
+from api.adzuna.shards import Shard
 from config import config, logger
-from repository.category import insert_categories_batch
+from repository.category import (
+    get_category_id_by_country_and_tag,
+    insert_categories_batch,
+)
 from db.engine import get_db_session
 
 
-async def __extract_category_data(category: dict) -> dict | None:
+async def __extract_category_data(category: dict, country: str) -> dict | None:
     tag = category.get("tag")
     label = category.get("label")
     if not tag or not label:
@@ -11,27 +15,40 @@ async def __extract_category_data(category: dict) -> dict | None:
 
     return {
         "source": config.ADZUNA_SOURCE_PLACEHOLDER,
+        "country": country,
         "tag": tag,
         "label": label,
     }
 
 
-async def process_categories(categories: dict) -> list[str]:
+async def process_categories(fetched_by_country: dict[str, dict]) -> list[str]:
     logger.info("Processing and storing categories...")
     async with get_db_session() as db:
-        results = categories.get("results")
-        if not results:
-            raise Exception("No categories found")
+        stored = None
+        if any(fetched["unchanged"] for fetched in fetched_by_country.values()):
+            stored = await get_category_id_by_country_and_tag(db)
         payload = []
-        tags = []
-        # Limit the first 5 categories not to over flood api requests for jobs
-        for category in results[:5]:
-            category_data = await __extract_category_data(category)
-            if category_data is None:
-                logger.warning(f"Invalid category data: {category}")
-                continue
-            payload.append(category_data)
-            tags.append(category_data.get("tag"))
-        await insert_categories_batch(db, payload)
-        logger.info("Categories processed and stored successfully.")
-        return tags
+        shards = []
+        for country, fetched in fetched_by_country.items():
+            results = fetched["categories"].get("results")
+            if not results:
+                raise Exception(f"No categories found for country {country}")
+            # Every category is kept, the budget planner decides how many
+            # requests each one gets
+            for category in results:
+                category_data = await __extract_category_data(category, country)
+                if category_data is None:
+                    logger.warning(f"Invalid category data: {category}")
+                    continue
+                shards.append(Shard(country, category_data.get("tag")).key)
+                # An unchanged response only needs writing if the rows are
+                # missing, e.g. in a freshly created database
+                if fetched["unchanged"] and (country, category_data["tag"]) in stored:
+                    continue
+                payload.append(category_data)
+        if payload:
+            await insert_categories_batch(db, payload)
+            logger.info("Categories processed and stored successfully.")
+        else:
+            logger.info("Categories unchanged, nothing to store.")
+        return shards
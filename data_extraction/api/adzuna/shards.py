@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+
+from config import config
+
+
+@dataclass(frozen=True)
+class Shard:
+    """One (country, category) pair, the unit jobs are fetched and tracked by.
+
+    Passed between Airflow tasks as its "country/category" key, which also
+    names the mapped task instances.
+    """
+
+    country: str
+    category: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.country}/{self.category}"
+
+
+def parse_shard(key: str) -> Shard:
+    country, _, category = key.partition("/")
+    if not country or not category:
+        raise ValueError(f"Invalid shard key: {key}")
+    return Shard(country, category)
+
+
+def get_countries() -> list[str]:
+    countries = [
+        country.strip().lower()
+        for country in config.ADZUNA_COUNTRIES.split(",")
+        if country.strip()
+    ]
+    if not countries:
+        raise Exception("ADZUNA_COUNTRIES is empty")
+    # Preserves order, a country listed twice is fetched once
+    return list(dict.fromkeys(countries))
+
+
+def country_endpoint(template: str, country: str) -> str:
+    return config.ADZUNA_BASE_URL + template.format(country=country)
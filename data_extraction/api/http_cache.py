@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import urlencode
+
+import httpx
+from config import config, logger
+
+# Left out of cache keys, so rotating credentials keeps the cache and keys
+# never end up on disk
+CREDENTIAL_PARAMS = frozenset({"app_id", "app_key"})
+# Response headers kept with a cached body
+STORED_HEADERS = ("content-type", "etag", "last-modified")
+# Set on every response that went through the cache
+CACHE_STATUS = "cache_status"
+
+# Evicting down to a bit below the limit keeps it from running on every store
+EVICT_TO_FRACTION = 0.9
+
+__size_lock = threading.Lock()
+__cache_bytes: int | None = None
+
+
+@dataclass
+class CacheEntry:
+    path: Path
+    url: str
+    headers: dict[str, str]
+    content_hash: str
+    stored_at: float
+    content: bytes
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def validators(self) -> dict[str, str]:
+        validators = {}
+        if etag := self.headers.get("etag"):
+            validators["if-none-match"] = etag
+        if last_modified := self.headers.get("last-modified"):
+            validators["if-modified-since"] = last_modified
+        return validators
+
+    def to_response(self, request: httpx.Request, status: str) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers=self.headers,
+            content=self.content,
+            request=request,
+            extensions={CACHE_STATUS: status},
+        )
+
+
+def cache_key(url: str, params: dict | None) -> str:
+    query = sorted(
+        (name, str(value))
+        for name, value in (params or {}).items()
+        if name not in CREDENTIAL_PARAMS
+    )
+    return hashlib.sha256(f"GET {url}?{urlencode(query)}".encode("utf-8")).hexdigest()
+
+
+def __entry_path(key: str) -> Path:
+    return Path(config.HTTP_CACHE_PATH) / key[:2] / f"{key}.entry"
+
+
+def __read_entry(key: str) -> CacheEntry | None:
+    # One file per entry: a JSON header line, then the raw body
+    path = __entry_path(key)
+    try:
+        with path.open("rb") as f:
+            header = json.loads(f.readline())
+            content = f.read()
+        # Recently used entries are evicted last
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable HTTP cache entry {path}: {e}")
+        return None
+    return CacheEntry(
+        path=path,
+        url=header["url"],
+        headers=header["headers"],
+        content_hash=header["content_hash"],
+        stored_at=header["stored_at"],
+        content=content,
+    )
+
+
+def __touch_entry(entry: CacheEntry) -> None:
+    # A 304 confirms the body, it is fresh for another TTL
+    entry.stored_at = time.time()
+    __write_entry(entry.path, entry.url, entry.headers, entry.content)
+
+
+def __write_entry(path: Path, url: str, headers: dict[str, str], content: bytes) -> str:
+    content_hash = hashlib.sha256(content).hexdigest()
+    header = {
+        "url": url,
+        "headers": headers,
+        "content_hash": content_hash,
+        "stored_at": time.time(),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    previous_size = path.stat().st_size if path.exists() else 0
+    tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+    with tmp_path.open("wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        f.write(content)
+    os.replace(tmp_path, path)
+    __account(path.stat().st_size - previous_size)
+    return content_hash
+
+
+def __scan() -> list[tuple[float, int, Path]]:
+    entries = []
+    for path in Path(config.HTTP_CACHE_PATH).glob("*/*.entry"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+
+def __account(delta: int) -> None:
+    global __cache_bytes
+    max_bytes = config.HTTP_CACHE_MAX_MB * 2**20
+    with __size_lock:
+        if __cache_bytes is None:
+            # Other processes share the directory, so this is an estimate
+            # that gets corrected whenever eviction rescans it
+            __cache_bytes = sum(size for _, size, _ in __scan())
+        else:
+            __cache_bytes += delta
+        if __cache_bytes <= max_bytes:
+            return
+        entries = sorted(__scan())
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= max_bytes * EVICT_TO_FRACTION:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        __cache_bytes = total
+    logger.info(f"Evicted {evicted} HTTP cache entries, {total / 2**20:.1f} MiB left.")
+
+
+async def lookup(url: str, params: dict | None) -> CacheEntry | None:
+    return await asyncio.to_thread(__read_entry, cache_key(url, params))
+
+
+async def revalidated(entry: CacheEntry) -> None:
+    await asyncio.to_thread(__touch_entry, entry)
+
+
+async def store(
+    url: str, params: dict | None, response: httpx.Response, previous: CacheEntry | None
+) -> str:
+    """Caches a 200 response, returns its cache status.
+
+    "unchanged" when the body is identical to the one cached before, which
+    catches servers that send no validators.
+    """
+    headers = {
+        name: response.headers[name]
+        for name in STORED_HEADERS
+        if name in response.headers
+    }
+    content_hash = await asyncio.to_thread(
+        __write_entry,
+        __entry_path(cache_key(url, params)),
+        url,
+        headers,
+        response.content,
+    )
+    if previous is not None and previous.content_hash == content_hash:
+        return "unchanged"
+    return "stored"
+
+
+def is_unchanged(response: httpx.Response) -> bool:
+    """True when the body is the same as the last time it was fetched."""
+    return response.extensions.get(CACHE_STATUS) in (
+        "fresh",
+        "revalidated",
+        "unchanged",
+    )
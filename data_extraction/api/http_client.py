@@ -0,0 +1,201 @@
+import asyncio
+import importlib.util
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+from api import http_cache
+from api.rate_limiter import TokenBucket, per_minute_bucket
+from config import config, logger
+from telemetry.metrics import inc, timed
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# One client and limiter per event loop. Airflow tasks call `asyncio.run`
+# which closes its loop on exit, so anything bound to an old loop is dropped.
+__loop: asyncio.AbstractEventLoop | None = None
+__client: httpx.AsyncClient | None = None
+__limiter: TokenBucket | None = None
+
+
+class RateLimitError(Exception):
+    pass
+
+
+def __http2_available() -> bool:
+    if not config.HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but h2 is not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+def __bind_to_running_loop() -> None:
+    global __loop, __client, __limiter
+    loop = asyncio.get_running_loop()
+    if __loop is loop:
+        return
+    __loop = loop
+    __client = None
+    __limiter = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global __client
+    __bind_to_running_loop()
+    if __client is None or __client.is_closed:
+        __client = httpx.AsyncClient(
+            timeout=config.HTTP_TIMEOUT_SECONDS,
+            http2=__http2_available(),
+            limits=httpx.Limits(
+                max_connections=config.HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            headers={"accept": "application/json"},
+        )
+    return __client
+
+
+def __quota_shares() -> int:
+    # fetch_jobs tasks run in separate processes, at most
+    # ADZUNA_MAX_ACTIVE_FETCH_TASKS at a time. Splitting the quota evenly
+    # keeps them within one global budget without coordinating.
+    shares = max(1, config.ADZUNA_MAX_ACTIVE_FETCH_TASKS)
+    if config.ADZUNA_FETCH_JOBS_CHUNKS > 0:
+        shares = min(shares, config.ADZUNA_FETCH_JOBS_CHUNKS)
+    return shares
+
+
+def get_rate_limiter() -> TokenBucket:
+    global __limiter
+    __bind_to_running_loop()
+    if __limiter is None:
+        shares = __quota_shares()
+        __limiter = per_minute_bucket(
+            config.ADZUNA_REQUESTS_PER_MINUTE / shares,
+            max(1.0, config.ADZUNA_REQUEST_BURST / shares),
+            config.ADZUNA_MIN_REQUESTS_PER_MINUTE / shares,
+        )
+    return __limiter
+
+
+async def close_http_client() -> None:
+    global __client
+    if __client is not None and not __client.is_closed:
+        await __client.aclose()
+    __client = None
+
+
+def __retry_after_seconds(response: httpx.Response) -> float | None:
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def __backoff_seconds(attempt: int) -> float:
+    # Full jitter keeps concurrent retries from lining up on the same instant
+    ceiling = min(
+        config.HTTP_BACKOFF_MAX_SECONDS,
+        config.HTTP_BACKOFF_BASE_SECONDS * 2**attempt,
+    )
+    return random.uniform(0, ceiling)
+
+
+async def get_with_retry(
+    url: str, params: dict | None = None, cache_ttl: float | None = None
+) -> httpx.Response:
+    """GET with rate limiting and retries.
+
+    With a `cache_ttl` the response is cached on disk, served without a
+    request while younger than the TTL and revalidated with its ETag or
+    Last-Modified after that. http_cache.is_unchanged tells whether the body
+    differs from the previous fetch.
+    """
+    if cache_ttl is None or not config.HTTP_CACHE_ENABLED:
+        return await __get_with_retry(url, params)
+
+    entry = await http_cache.lookup(url, params)
+    if entry is not None and entry.is_fresh(cache_ttl):
+        inc("http_cache_requests_total", result="fresh")
+        return entry.to_response(httpx.Request("GET", url, params=params), "fresh")
+
+    response = await __get_with_retry(
+        url, params, entry.validators() if entry is not None else None
+    )
+    if response.status_code == 304 and entry is not None:
+        inc("http_cache_requests_total", result="revalidated")
+        await http_cache.revalidated(entry)
+        return entry.to_response(response.request, "revalidated")
+    if response.status_code == 200:
+        status = await http_cache.store(url, params, response, entry)
+        inc("http_cache_requests_total", result=status)
+        response.extensions = {**response.extensions, http_cache.CACHE_STATUS: status}
+    return response
+
+
+async def __get_with_retry(
+    url: str, params: dict | None = None, headers: dict[str, str] | None = None
+) -> httpx.Response:
+    client = get_http_client()
+    limiter = get_rate_limiter()
+    attempt = 0
+    while True:
+        with timed("http_rate_limit_wait_seconds"):
+            await limiter.acquire()
+        try:
+            response = await client.get(url, params=params, headers=headers)
+        except httpx.TransportError as e:
+            inc("http_transport_errors_total")
+            if attempt >= config.HTTP_MAX_RETRIES:
+                raise
+            delay = __backoff_seconds(attempt)
+            logger.warning(f"Request to {url} failed ({e!r}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            attempt += 1
+            inc("http_retries_total", reason="transport")
+            continue
+
+        inc("http_responses_total", status=str(response.status_code))
+        if response.status_code not in RETRYABLE_STATUS_CODES:
+            limiter.increase()
+            return response
+
+        retry_after = None
+        if response.status_code == 429:
+            limiter.decrease()
+            retry_after = __retry_after_seconds(response)
+
+        if attempt >= config.HTTP_MAX_RETRIES:
+            if response.status_code == 429:
+                raise RateLimitError(
+                    f"Rate limit still exceeded after {attempt} retries for {url}. message: {response.text}"
+                )
+            return response
+
+        if retry_after is not None:
+            # Pausing the shared limiter holds back this retry and every
+            # other request in flight, not just the one that was throttled.
+            delay = min(retry_after, config.HTTP_BACKOFF_MAX_SECONDS)
+            limiter.pause(delay)
+        else:
+            delay = __backoff_seconds(attempt)
+        logger.warning(
+            f"Got {response.status_code} from {url}, retrying in {delay:.1f}s "
+            f"(attempt {attempt + 1}/{config.HTTP_MAX_RETRIES}, rate now {limiter.rate * 60:.1f}/min)"
+        )
+        if retry_after is None:
+            await asyncio.sleep(delay)
+        attempt += 1
+        inc("http_retries_total", reason=str(response.status_code))
@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """Async token bucket shared by every request made against one API quota.
+
+    `rate` is the number of tokens refilled per second and `capacity` is the
+    largest burst that can be spent at once. The rate adapts AIMD-style:
+    `decrease` cuts it multiplicatively when the API throttles us and
+    `increase` grows it back additively, never above the starting rate.
+    """
+
+    def __init__(self, rate: float, capacity: float, min_rate: float | None = None):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("Token bucket rate and capacity must be positive")
+        self.rate = rate
+        self.max_rate = rate
+        self.min_rate = min(min_rate or rate / 10, rate)
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        # Waiters queue on the lock, so tokens are handed out in FIFO order.
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+
+    def decrease(self, factor: float = 0.5) -> None:
+        self._refill()
+        self.rate = max(self.min_rate, self.rate * factor)
+
+    def increase(self, step: float | None = None) -> None:
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + (step or self.max_rate / 20))
+
+    def pause(self, seconds: float) -> None:
+        # Drive the balance negative so every waiter sits out `seconds`.
+        self._refill()
+        self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+
+def per_minute_bucket(
+    requests_per_minute: float,
+    burst: float,
+    min_requests_per_minute: float | None = None,
+) -> TokenBucket:
+    min_rate = min_requests_per_minute / 60 if min_requests_per_minute else None
+    return TokenBucket(rate=requests_per_minute / 60, capacity=burst, min_rate=min_rate)
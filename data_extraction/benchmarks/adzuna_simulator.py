@@ -0,0 +1,293 @@
+"""Local stand-in for the Adzuna categories and search endpoints.
+
+Data is generated deterministically from a seed, so two runs with the same
+settings serve byte-identical pages. Latency and 429 throttling can be
+injected to exercise pagination, retries and concurrency.
+
+Run standalone from data_extraction/:
+
+    uv run python -m benchmarks.adzuna_simulator --port 8099 --jobs-per-category 5000
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CATEGORIES_PATH = re.compile(r"^/v1/api/jobs/(?P<country>\w+)/categories$")
+SEARCH_PATH = re.compile(r"^/v1/api/jobs/(?P<country>\w+)/search/(?P<page>\d+)$")
+
+TITLE_WORDS = (
+    "Senior Junior Lead Principal Data Software Sales Account Support Field "
+    "Engineer Analyst Manager Developer Consultant Executive Technician"
+).split()
+DESCRIPTION_WORDS = (
+    "we are looking for an experienced professional to join our growing team "
+    "working with clients across the region you will be responsible for "
+    "delivering projects supporting customers and driving growth competitive "
+    "salary hybrid working pension and benefits apply today"
+).split()
+AREAS = (
+    ("UK", "London", "Central London", "City of London"),
+    ("UK", "North West England", "Manchester", "Salford"),
+    ("UK", "Scotland", "Edinburgh", "Leith"),
+    ("UK", "South West England", "Bristol", "Clifton"),
+    ("UK", "West Midlands", "Birmingham", "Digbeth"),
+)
+COMPANIES = [f"Company {i:03d}" for i in range(200)]
+
+
+@dataclass
+class SimulatorSettings:
+    seed: int = 42
+    categories: int = 5
+    jobs_per_category: int = 2000
+    days: int = 60
+    latency_ms: float = 80.0
+    latency_jitter_ms: float = 40.0
+    throttle_rate: float = 0.0
+    retry_after_seconds: float = 1.0
+
+
+@dataclass
+class SimulatorStats:
+    requests: int = 0
+    throttled: int = 0
+    bytes_sent: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class AdzunaSimulator:
+    def __init__(self, settings: SimulatorSettings):
+        self.settings = settings
+        self.stats = SimulatorStats()
+        self.now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        self.category_tags = [f"sim-{i:02d}-jobs" for i in range(settings.categories)]
+
+    def categories_response(self) -> dict:
+        return {
+            "__CLASS__": "Adzuna::API::Response::Categories",
+            "results": [
+                {
+                    "__CLASS__": "Adzuna::API::Response::Category",
+                    "tag": tag,
+                    "label": tag.replace("-", " ").title(),
+                }
+                for tag in self.category_tags
+            ],
+        }
+
+    def __job(self, country: str, category: str, index: int) -> dict:
+        rng = random.Random(f"{self.settings.seed}:{country}:{category}:{index}")
+        # Index 0 is the newest posting, matching sort_by=date
+        age = (
+            timedelta(days=self.settings.days) * index / self.settings.jobs_per_category
+        )
+        area = rng.choice(AREAS)
+        salary = round(rng.uniform(20_000, 120_000), 2)
+        # crc32 rather than hash(), which is salted per process
+        prefix = (
+            zlib.crc32(f"{self.settings.seed}:{country}:{category}".encode()) % 10**4
+        )
+        job_id = f"{prefix:04d}{index:07d}"
+        return {
+            "__CLASS__": "Adzuna::API::Response::Job",
+            "id": job_id,
+            "title": " ".join(rng.choices(TITLE_WORDS, k=3)),
+            "description": " ".join(
+                rng.choices(DESCRIPTION_WORDS, k=rng.randint(40, 90))
+            ),
+            "redirect_url": f"https://www.adzuna.co.uk/jobs/land/ad/{job_id}",
+            "created": (self.now - age).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "salary_min": salary,
+            "salary_max": round(salary * rng.uniform(1.0, 1.3), 2),
+            "location": {
+                "__CLASS__": "Adzuna::API::Response::Location",
+                "area": list(area),
+                "display_name": f"{area[-1]}, {area[-2]}",
+            },
+            "company": {
+                "__CLASS__": "Adzuna::API::Response::Company",
+                "display_name": rng.choice(COMPANIES),
+            },
+            "category": {"tag": category},
+        }
+
+    def search_response(
+        self, country: str, page: int, query: dict[str, list[str]]
+    ) -> dict:
+        category = query.get("category", [""])[0]
+        if category not in self.category_tags:
+            return {"results": [], "count": 0}
+        results_per_page = int(query.get("results_per_page", ["10"])[0])
+        total = self.settings.jobs_per_category
+        if "max_days_old" in query:
+            max_days_old = int(query["max_days_old"][0])
+            total = min(total, total * max_days_old // self.settings.days)
+        start = (page - 1) * results_per_page
+        end = min(start + results_per_page, total)
+        return {
+            "__CLASS__": "Adzuna::API::Response::JobSearchResults",
+            "count": total,
+            "results": [self.__job(country, category, i) for i in range(start, end)],
+        }
+
+    def handler_class(self) -> type[BaseHTTPRequestHandler]:
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                simulator.handle(self)
+
+        return Handler
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        url = urlparse(request.path)
+        query = parse_qs(url.query)
+        settings = self.settings
+        with self.stats.lock:
+            self.stats.requests += 1
+            request_number = self.stats.requests
+        rng = random.Random(f"{settings.seed}:request:{request_number}")
+        time.sleep(
+            max(
+                0.0,
+                settings.latency_ms + rng.uniform(-1, 1) * settings.latency_jitter_ms,
+            )
+            / 1000
+        )
+
+        if rng.random() < settings.throttle_rate:
+            with self.stats.lock:
+                self.stats.throttled += 1
+            self.__send(
+                request,
+                429,
+                b'{"error": "rate limited"}',
+                {"Retry-After": f"{settings.retry_after_seconds:g}"},
+            )
+            return
+
+        if match := CATEGORIES_PATH.match(url.path):
+            body = self.categories_response()
+        elif match := SEARCH_PATH.match(url.path):
+            body = self.search_response(match["country"], int(match["page"]), query)
+        else:
+            self.__send(request, 404, b'{"error": "not found"}')
+            return
+        self.__send(request, 200, json.dumps(body).encode("utf-8"))
+
+    def __send(
+        self,
+        request: BaseHTTPRequestHandler,
+        status: int,
+        body: bytes,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        request.send_response(status)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(body)
+        with self.stats.lock:
+            self.stats.bytes_sent += len(body)
+
+
+class QuietThreadingHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Pagination cancels in-flight pages past its stop point, which
+        # closes connections mid-response. That is expected, not an error.
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+class SimulatorServer:
+    """Runs an AdzunaSimulator on a background thread, as a context manager."""
+
+    def __init__(
+        self, settings: SimulatorSettings, host: str = "127.0.0.1", port: int = 0
+    ):
+        self.simulator = AdzunaSimulator(settings)
+        self.server = QuietThreadingHTTPServer(
+            (host, port), self.simulator.handler_class()
+        )
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1/api"
+
+    def __enter__(self) -> "SimulatorServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def settings_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = SimulatorSettings()
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--categories", type=int, default=defaults.categories)
+    parser.add_argument(
+        "--jobs-per-category", type=int, default=defaults.jobs_per_category
+    )
+    parser.add_argument("--days", type=int, default=defaults.days)
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms)
+    parser.add_argument(
+        "--latency-jitter-ms", type=float, default=defaults.latency_jitter_ms
+    )
+    parser.add_argument("--throttle-rate", type=float, default=defaults.throttle_rate)
+    parser.add_argument(
+        "--retry-after-seconds", type=float, default=defaults.retry_after_seconds
+    )
+
+
+def settings_from_arguments(args: argparse.Namespace) -> SimulatorSettings:
+    return SimulatorSettings(
+        seed=args.seed,
+        categories=args.categories,
+        jobs_per_category=args.jobs_per_category,
+        days=args.days,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        throttle_rate=args.throttle_rate,
+        retry_after_seconds=args.retry_after_seconds,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    settings_arguments(parser)
+    args = parser.parse_args()
+    with SimulatorServer(settings_from_arguments(args), args.host, args.port) as server:
+        print(f"Adzuna simulator listening on {server.base_url}")
+        try:
+            server.thread.join()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
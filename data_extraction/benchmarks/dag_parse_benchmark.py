@@ -0,0 +1,124 @@
+"""DAG parse-time benchmark, fails when importing the DAG file regresses.
+
+The scheduler re-imports every DAG file in a loop, in a process that has
+Airflow's DAG machinery loaded already. Each measurement starts a fresh
+interpreter, defines a trivial DAG to load that machinery, and measures
+only what importing the DAG files costs on top. Run from data_extraction/:
+
+    uv run python -m benchmarks.dag_parse_benchmark --repeat 7
+
+Exits with status 1 when the median import time or the memory the import
+allocates exceeds its limit, or when a task-time dependency is imported
+while parsing.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+DAG_MODULES = ["dags.api_extraction"]
+# Only task code may load these. httpx and SQLAlchemy are missing on purpose,
+# airflow.sdk imports them itself.
+TASK_ONLY_MODULES = [
+    "boto3",
+    "asyncpg",
+    "pyarrow",
+    "api.adzuna.fetch_jobs",
+    "api.http_client",
+    "db.engine",
+    "repository.jobs",
+    "cdc.parquet_export",
+]
+
+__CHILD = """
+import importlib, json, sys, time, tracemalloc
+from airflow.sdk import dag, task
+
+# Warm up the @dag/@task machinery the DAG processor already has loaded
+@dag(dag_id="warm_up", schedule=None)
+def warm_up():
+    @task
+    def noop(value=None):
+        return value
+
+    noop() >> noop.expand(value=noop())
+
+warm_up()
+baseline = set(sys.modules)
+trace = {trace}
+if trace:
+    tracemalloc.start()
+started_at = time.perf_counter()
+for module in {modules}:
+    importlib.import_module(module)
+elapsed = time.perf_counter() - started_at
+allocated = tracemalloc.get_traced_memory()[0] if trace else 0
+print(json.dumps({{
+    "seconds": elapsed,
+    "allocated_bytes": allocated,
+    "new_modules": len(set(sys.modules) - baseline),
+    "task_only_loaded": [m for m in {task_only} if m in sys.modules],
+}}))
+"""
+
+
+def __run_child(trace: bool) -> dict:
+    code = __CHILD.format(trace=trace, modules=DAG_MODULES, task_only=TASK_ONLY_MODULES)
+    env = {**os.environ, "PYTHONPATH": str(PROJECT_DIR)}
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise Exception(f"Importing the DAG files failed:\n{completed.stderr}")
+    # Airflow may log to stdout, the result is the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, default=120.0)
+    parser.add_argument("--max-allocated-mib", type=float, default=5.0)
+    args = parser.parse_args()
+
+    # Import time is measured without tracemalloc, which slows imports down
+    timings = [__run_child(trace=False) for _ in range(args.repeat)]
+    traced = __run_child(trace=True)
+
+    import_ms = statistics.median(run["seconds"] for run in timings) * 1000
+    allocated_mib = traced["allocated_bytes"] / 2**20
+    result = {
+        "dag_modules": DAG_MODULES,
+        "median_import_ms": round(import_ms, 1),
+        "min_import_ms": round(min(run["seconds"] for run in timings) * 1000, 1),
+        "allocated_mib": round(allocated_mib, 2),
+        "new_modules": traced["new_modules"],
+        "task_only_loaded": traced["task_only_loaded"],
+    }
+    print(json.dumps(result, indent=2))
+
+    failures = []
+    if import_ms > args.max_import_ms:
+        failures.append(f"import took {import_ms:.1f}ms > {args.max_import_ms}ms")
+    if allocated_mib > args.max_allocated_mib:
+        failures.append(
+            f"import allocated {allocated_mib:.2f}MiB > {args.max_allocated_mib}MiB"
+        )
+    if traced["task_only_loaded"]:
+        failures.append(f"task-only modules imported: {traced['task_only_loaded']}")
+    if failures:
+        print("DAG parse regression: " + "; ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Micro-benchmark of Adzuna page decoding, dict path vs msgspec records.
+
+Run from data_extraction/:
+
+    uv run python -m benchmarks.decode_benchmark --pages 2000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+from api.adzuna.decode import decode_job, decode_job_page, job_listing_row
+
+MOCK_PAGE = Path(__file__).resolve().parent.parent / "mock_data" / "it-jobs.json"
+
+
+async def __legacy_form_iso_format(date_str: str) -> datetime | None:
+    if date_str:
+        return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+    return datetime.now(timezone.utc)
+
+
+async def __legacy_decode(raw_page: bytes) -> list[dict]:
+    # The path fetch_jobs used before: response.json() and a copied dict per job
+    data = json.loads(raw_page)
+    jobs_batch = []
+    for job in data.get("results", []):
+        jobs_batch.append(
+            {
+                "source": "ADZUNA",
+                "job_id": job.get("id"),
+                "minimum_salary": job.get("salary_min"),
+                "maximum_salary": job.get("salary_max"),
+                "job_post_url": job.get("redirect_url"),
+                "location": job.get("location"),
+                "job_title": job.get("title"),
+                "job_created_at": await __legacy_form_iso_format(job.get("created")),
+                "job_description": job.get("description"),
+                "company": job.get("company"),
+                "category_id": 1,
+            }
+        )
+    return jobs_batch
+
+
+async def __msgspec_decode(raw_page: bytes) -> list[dict]:
+    return [
+        job_listing_row(decode_job(raw_job), "ADZUNA", "gb", 1)
+        for raw_job in decode_job_page(raw_page).results
+    ]
+
+
+def __measure(name: str, decode, raw_pages: list[bytes]) -> dict:
+    async def run() -> int:
+        records = 0
+        for raw_page in raw_pages:
+            records += len(await decode(raw_page))
+        return records
+
+    started_at = time.perf_counter()
+    records = asyncio.run(run())
+    elapsed = time.perf_counter() - started_at
+
+    # Peak memory of holding one decoded page, measured separately so
+    # tracemalloc's overhead doesn't distort the throughput numbers.
+    tracemalloc.start()
+    asyncio.run(decode(raw_pages[0]))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "path": name,
+        "records": records,
+        "seconds": round(elapsed, 3),
+        "records_per_second": round(records / elapsed),
+        "peak_page_memory_kib": round(peak / 1024, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    args = parser.parse_args()
+
+    raw_page = MOCK_PAGE.read_bytes()
+    raw_pages = [raw_page] * args.pages
+    results = [
+        __measure("json + dict copy", __legacy_decode, raw_pages),
+        __measure("msgspec records", __msgspec_decode, raw_pages),
+    ]
+    for result in results:
+        print(json.dumps(result))
+    speedup = results[1]["records_per_second"] / results[0]["records_per_second"]
+    print(f"msgspec speedup: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
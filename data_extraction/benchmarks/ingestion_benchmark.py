@@ -0,0 +1,187 @@
+"""End-to-end ingestion benchmark against the local Adzuna simulator.
+
+Runs fetch_categories, process_categories and fetch_jobs_by_shard against
+benchmarks.adzuna_simulator and the Postgres in ASYNC_DATABASE_URL. That
+database has to be migrated (`alembic upgrade head`) and must not be
+production, `--reset` truncates the job tables before the run.
+
+    uv run python -m benchmarks.ingestion_benchmark --reset --jobs-per-category 5000
+
+Prints one JSON object with pages/s, rows/s, cumulative network and DB time
+and peak RSS. Network and DB time are summed over concurrent tasks, so with
+concurrency enabled they can add up to more than the wall time.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import tempfile
+import time
+from functools import wraps
+
+from benchmarks.adzuna_simulator import (
+    SimulatorServer,
+    settings_arguments,
+    settings_from_arguments,
+)
+from config import config
+
+
+class StageTimer:
+    def __init__(self):
+        self.seconds: dict[str, float] = {}
+        self.calls: dict[str, int] = {}
+
+    def wrap(self, stage: str, func):
+        @wraps(func)
+        async def timed(*args, **kwargs):
+            started_at = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.seconds[stage] = (
+                    self.seconds.get(stage, 0.0) + time.perf_counter() - started_at
+                )
+                self.calls[stage] = self.calls.get(stage, 0) + 1
+
+        return timed
+
+
+def __peak_rss_mib() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def __reset_tables() -> None:
+    from sqlalchemy import text
+
+    from db.engine import get_db_session
+
+    # Everything a run writes, leftover keys or ledger rows would make the
+    # next run skip listings or plan its pages from a stale history
+    async with get_db_session() as db:
+        await db.execute(
+            text(
+                "TRUNCATE job_listing, job_listing_key, job_description, "
+                "ingestion_state, ingestion_checkpoint, api_request_ledger "
+                "RESTART IDENTITY"
+            )
+        )
+
+
+async def __count_listings() -> int:
+    from sqlalchemy import func, select
+
+    from db.engine import get_db_session
+    from model.adzuna import JobListing
+
+    async with get_db_session() as db:
+        return (await db.execute(select(func.count(JobListing.id)))).scalar_one()
+
+
+async def __run(args: argparse.Namespace, timer: StageTimer) -> dict:
+    # Imported after config is pointed at the simulator
+    from api.adzuna import batch_writer, fetch_jobs
+    from api.adzuna.fetch_categories import fetch_categories_by_country
+    from api.adzuna.process_categories import process_categories
+    from api.http_client import close_http_client
+
+    fetch_jobs.fetch_data_from_api = timer.wrap(
+        "network", fetch_jobs.fetch_data_from_api
+    )
+    batch_writer.write_job_batch = timer.wrap("db", batch_writer.write_job_batch)
+
+    if args.reset:
+        await __reset_tables()
+    rows_before = await __count_listings()
+    try:
+        shards = await process_categories(await fetch_categories_by_country())
+        started_at = time.perf_counter()
+        await fetch_jobs.fetch_jobs_by_shard(shards)
+        elapsed = time.perf_counter() - started_at
+    finally:
+        await close_http_client()
+    rows = await __count_listings() - rows_before
+
+    pages = timer.calls.get("network", 0)
+    return {
+        "shards": len(shards),
+        "pages": pages,
+        "rows_inserted": rows,
+        "seconds": round(elapsed, 3),
+        "pages_per_second": round(pages / elapsed, 2),
+        "rows_per_second": round(rows / elapsed, 1),
+        "network_seconds": round(timer.seconds.get("network", 0.0), 3),
+        "db_seconds": round(timer.seconds.get("db", 0.0), 3),
+        "db_commits": timer.calls.get("db", 0),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    settings_arguments(parser)
+    parser.add_argument("--reset", action="store_true")
+    parser.add_argument("--countries", default=config.ADZUNA_COUNTRIES)
+    parser.add_argument("--page-window", type=int, default=config.ADZUNA_PAGE_WINDOW)
+    parser.add_argument(
+        "--category-concurrency", type=int, default=config.ADZUNA_CATEGORY_CONCURRENCY
+    )
+    parser.add_argument(
+        "--requests-per-minute", type=float, default=6000, help="client-side quota"
+    )
+    parser.add_argument("--load-method", default=config.JOB_LISTING_LOAD_METHOD)
+    parser.add_argument(
+        "--writer-batch-rows", type=int, default=config.JOB_WRITER_BATCH_ROWS
+    )
+    parser.add_argument(
+        "--writer-flush-ms", type=int, default=config.JOB_WRITER_FLUSH_MS
+    )
+    args = parser.parse_args()
+
+    settings = settings_from_arguments(args)
+    with (
+        SimulatorServer(settings) as server,
+        tempfile.TemporaryDirectory() as landing_path,
+    ):
+        config.ENVIRONMENT = "benchmark"
+        config.ADZUNA_BASE_URL = server.base_url
+        config.ADZUNA_COUNTRIES = args.countries
+        config.ADZUNA_PAGE_WINDOW = args.page_window
+        config.ADZUNA_CATEGORY_CONCURRENCY = args.category_concurrency
+        config.ADZUNA_REQUESTS_PER_MINUTE = args.requests_per_minute
+        # The whole quota belongs to this one process
+        config.ADZUNA_MAX_ACTIVE_FETCH_TASKS = 1
+        config.ADZUNA_REQUEST_BURST = max(1.0, args.requests_per_minute / 60)
+        config.JOB_LISTING_LOAD_METHOD = args.load_method
+        config.JOB_WRITER_BATCH_ROWS = args.writer_batch_rows
+        config.JOB_WRITER_FLUSH_MS = args.writer_flush_ms
+        config.LANDING_ZONE_PATH = landing_path
+        # Starts cold, a cache left by an earlier run would skip the API
+        config.HTTP_CACHE_PATH = f"{landing_path}/http_cache"
+
+        result = asyncio.run(__run(args, StageTimer()))
+        result.update(
+            {
+                "simulator_requests": server.simulator.stats.requests,
+                "simulator_throttled": server.simulator.stats.throttled,
+                "simulator_mib_sent": round(
+                    server.simulator.stats.bytes_sent / 2**20, 2
+                ),
+                "peak_rss_mib": __peak_rss_mib(),
+                "settings": vars(settings),
+                "countries": args.countries,
+                "page_window": args.page_window,
+                "category_concurrency": args.category_concurrency,
+                "load_method": args.load_method,
+                "writer_batch_rows": args.writer_batch_rows,
+                "writer_flush_ms": args.writer_flush_ms,
+            }
+        )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
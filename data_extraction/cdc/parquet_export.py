@@ -0,0 +1,293 @@
+"""Incremental export of job_listing and job_category changes to Parquet.
+
+A local stand-in for the Debezium and Kafka CDC path. Each run exports the
+rows created or updated since the watermark in export_state:
+
+    EXPORT_PATH/job_listing/dt=YYYY-MM-DD/category_id=N/part-<run>-NNNNN.parquet
+    EXPORT_PATH/job_category/dt=YYYY-MM-DD/part-<run>-NNNNN.parquet
+    EXPORT_PATH/job_description/dt=YYYY-MM-DD/part-<run>-NNNNN.parquet
+    EXPORT_PATH/<table>/_manifest.json
+
+`dt` is the UTC day of the change. The manifest lists the live files,
+compaction replaces small files, so loaders read the manifest rather than
+listing directories. Every row carries `_op` ("c" insert, "u" update) and
+`_changed_at`. A run that fails after writing its manifest is exported
+again, so loaders should keep the latest `_changed_at` per key.
+
+Listings carry `description_hash`, each distinct description is exported
+once under job_description, keyed by `hash`.
+"""
+
+import asyncio
+import json
+import os
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from config import config, logger
+from db.engine import get_db_session
+from repository.exports import (
+    get_database_now,
+    get_export_watermark,
+    stream_changed_job_categories,
+    stream_changed_job_descriptions,
+    stream_changed_job_listings,
+    update_export_watermark,
+)
+
+EXPORT_NAME = "parquet"
+MANIFEST_FILE_NAME = "_manifest.json"
+# Hive's name for a NULL partition value, understood by Spark and Snowflake
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+CHANGE_FIELDS = [("_op", pa.string()), ("_changed_at", TIMESTAMP)]
+
+
+@dataclass(frozen=True)
+class ExportTable:
+    name: str
+    # Partition columns live in the path only, not in the files
+    schema: pa.Schema
+    partition_columns: tuple[str, ...]
+    json_columns: frozenset[str]
+    stream: Callable[..., AsyncIterator[list]]
+
+
+EXPORT_TABLES = (
+    ExportTable(
+        name="job_listing",
+        schema=pa.schema(
+            [
+                ("id", pa.int64()),
+                ("source", pa.string()),
+                ("job_id", pa.string()),
+                ("country", pa.string()),
+                ("minimum_salary", pa.float64()),
+                ("maximum_salary", pa.float64()),
+                ("job_post_url", pa.string()),
+                ("location", pa.string()),
+                ("job_title", pa.string()),
+                ("job_created_at", TIMESTAMP),
+                ("description_hash", pa.string()),
+                ("company", pa.string()),
+                ("created_at", TIMESTAMP),
+                ("content_hash", pa.string()),
+                ("updated_at", TIMESTAMP),
+                *CHANGE_FIELDS,
+            ]
+        ),
+        partition_columns=("category_id",),
+        json_columns=frozenset({"location", "company"}),
+        stream=stream_changed_job_listings,
+    ),
+    ExportTable(
+        name="job_category",
+        schema=pa.schema(
+            [
+                ("id", pa.int64()),
+                ("source", pa.string()),
+                ("country", pa.string()),
+                ("tag", pa.string()),
+                ("label", pa.string()),
+                ("created_at", TIMESTAMP),
+                *CHANGE_FIELDS,
+            ]
+        ),
+        partition_columns=(),
+        json_columns=frozenset(),
+        stream=stream_changed_job_categories,
+    ),
+    ExportTable(
+        name="job_description",
+        schema=pa.schema(
+            [
+                ("hash", pa.string()),
+                ("description", pa.string()),
+                ("created_at", TIMESTAMP),
+                *CHANGE_FIELDS,
+            ]
+        ),
+        partition_columns=(),
+        json_columns=frozenset(),
+        stream=stream_changed_job_descriptions,
+    ),
+)
+
+
+def __partition_path(table: ExportTable, row) -> str:
+    parts = [f"dt={row['changed_at'].astimezone(timezone.utc).date().isoformat()}"]
+    for column in table.partition_columns:
+        value = row[column]
+        parts.append(f"{column}={NULL_PARTITION if value is None else value}")
+    return "/".join(parts)
+
+
+def __export_record(table: ExportTable, row) -> dict:
+    record = {field: row.get(field) for field in table.schema.names}
+    for column in table.json_columns:
+        if record[column] is not None:
+            record[column] = json.dumps(record[column])
+    updated_at = row.get("updated_at")
+    record["_op"] = "u" if updated_at is not None else "c"
+    record["_changed_at"] = row["changed_at"]
+    return record
+
+
+def __write_parquet(path: Path, arrow_table: pa.Table) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.parent / f".{path.name}.tmp"
+    pq.write_table(arrow_table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def __write_file(
+    table_dir: Path, table: ExportTable, partition: str, file_name: str, rows: list
+) -> dict:
+    arrow_table = pa.Table.from_pylist(rows, schema=table.schema)
+    path = table_dir / partition / file_name
+    __write_parquet(path, arrow_table)
+    changed_at = arrow_table.column("_changed_at")
+    return {
+        "path": f"{partition}/{file_name}",
+        "partition": partition,
+        "rows": arrow_table.num_rows,
+        "bytes": path.stat().st_size,
+        "min_changed_at": pc.min(changed_at).as_py().isoformat(),
+        "max_changed_at": pc.max(changed_at).as_py().isoformat(),
+    }
+
+
+def __read_manifest(table_dir: Path, table: ExportTable) -> dict:
+    path = table_dir / MANIFEST_FILE_NAME
+    if not path.exists():
+        return {"table": table.name, "files": []}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def __write_manifest(table_dir: Path, manifest: dict) -> None:
+    manifest["updated_at"] = datetime.now(timezone.utc).isoformat()
+    tmp_path = table_dir / f".{MANIFEST_FILE_NAME}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp_path, table_dir / MANIFEST_FILE_NAME)
+
+
+def __compact_partition(
+    table_dir: Path, table: ExportTable, partition: str, files: list[dict], run_id: str
+) -> dict:
+    logger.info(f"Compacting {len(files)} files in {table.name}/{partition}...")
+    # ParquetFile reads one file, read_table would add dt=... from the path
+    # Files written before a column was added get it filled with nulls
+    merged = pa.concat_tables(
+        (pq.ParquetFile(table_dir / entry["path"]).read() for entry in files),
+        promote_options="default",
+    ).sort_by("_changed_at")
+    file_name = f"part-{run_id}-compacted.parquet"
+    __write_parquet(table_dir / partition / file_name, merged)
+    return {
+        "path": f"{partition}/{file_name}",
+        "partition": partition,
+        "rows": merged.num_rows,
+        "bytes": (table_dir / partition / file_name).stat().st_size,
+        "min_changed_at": min(entry["min_changed_at"] for entry in files),
+        "max_changed_at": max(entry["max_changed_at"] for entry in files),
+    }
+
+
+def __publish(
+    table_dir: Path, table: ExportTable, written: list[dict], run_id: str
+) -> None:
+    manifest = __read_manifest(table_dir, table)
+    manifest["files"].extend(written)
+
+    replaced = []
+    target_bytes = config.EXPORT_COMPACT_TARGET_MB * 2**20
+    for partition in sorted({entry["partition"] for entry in written}):
+        small_files = [
+            entry
+            for entry in manifest["files"]
+            if entry["partition"] == partition and entry["bytes"] < target_bytes
+        ]
+        if len(small_files) < config.EXPORT_COMPACT_MIN_FILES:
+            continue
+        compacted = __compact_partition(
+            table_dir, table, partition, small_files, run_id
+        )
+        manifest["files"] = [
+            entry for entry in manifest["files"] if entry not in small_files
+        ] + [compacted]
+        replaced.extend(small_files)
+
+    # Replaced files go only once the manifest no longer points at them
+    __write_manifest(table_dir, manifest)
+    for entry in replaced:
+        (table_dir / entry["path"]).unlink(missing_ok=True)
+
+
+async def __export_table(
+    db, table: ExportTable, since: datetime | None, until: datetime, run_id: str
+) -> int:
+    table_dir = Path(config.EXPORT_PATH) / table.name
+    buffers: dict[str, list[dict]] = {}
+    buffered = 0
+    written = []
+    exported = 0
+
+    async def flush() -> None:
+        nonlocal buffered
+        for partition, rows in buffers.items():
+            file_name = f"part-{run_id}-{len(written):05d}.parquet"
+            written.append(
+                await asyncio.to_thread(
+                    __write_file, table_dir, table, partition, file_name, rows
+                )
+            )
+        buffers.clear()
+        buffered = 0
+
+    async for batch in table.stream(db, since, until, config.EXPORT_BATCH_SIZE):
+        for row in batch:
+            buffers.setdefault(__partition_path(table, row), []).append(
+                __export_record(table, row)
+            )
+        buffered += len(batch)
+        exported += len(batch)
+        if buffered >= config.EXPORT_FILE_ROWS:
+            await flush()
+    await flush()
+
+    if written:
+        await asyncio.to_thread(__publish, table_dir, table, written, run_id)
+    logger.info(f"Exported {exported} {table.name} changes in {len(written)} files.")
+    return exported
+
+
+def new_run_id() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+
+
+async def export_changes() -> dict[str, int]:
+    """Exports every change since the last run, returns rows per table."""
+    run_id = new_run_id()
+    async with get_db_session() as db:
+        since = await get_export_watermark(db, EXPORT_NAME)
+        until = await get_database_now(db) - timedelta(
+            seconds=config.EXPORT_SAFETY_LAG_SECONDS
+        )
+        if since is not None and until <= since:
+            logger.info("No changes old enough to export yet.")
+            return {}
+        logger.info(f"Exporting changes from {since} through {until}...")
+        exported = {
+            table.name: await __export_table(db, table, since, until, run_id)
+            for table in EXPORT_TABLES
+        }
+        await update_export_watermark(db, EXPORT_NAME, until)
+    logger.info(f"Change export {run_id} finished successfully.")
+    return exported
@@ -1,10 +1,10 @@
+import functools
 import json
 from pathlib import Path
 from pydantic_settings import BaseSettings
 import os
 from airflow.utils.log.logging_mixin import LoggingMixin
 from dotenv import load_dotenv
-import boto3
 
 load_dotenv()
 
@@ -12,12 +12,15 @@ load_dotenv()
 class Config(BaseSettings):
     ADZUNA_SOURCE_PLACEHOLDER: str = os.getenv("ADZUNA_SOURCE_PLACEHOLDER", "ADZUNA")
     ADZUNA_BASE_URL: str = os.getenv("ADZUNA_BASE_URL", "https://api.adzuna.com/v1/api")
-    ADZUNA_GB_CATEGORIES_ENDPOIN: str = os.getenv(
-        "ADZUNA_CATEGORIES_ENDPOIN", "/jobs/gb/categories"
+    ADZUNA_CATEGORIES_ENDPOINT: str = os.getenv(
+        "ADZUNA_CATEGORIES_ENDPOINT", "/jobs/{country}/categories"
     )
-    ADZUNA_GB_JOBS_ENDPOIN: str = os.getenv(
-        "ADZUNA_CATEGORIES_ENDPOIN", "/jobs/gb/search"
+    ADZUNA_JOBS_ENDPOINT: str = os.getenv(
+        "ADZUNA_JOBS_ENDPOINT", "/jobs/{country}/search"
     )
+    # Comma separated Adzuna country codes, every (country, category) pair is
+    # fetched as its own shard
+    ADZUNA_COUNTRIES: str = os.getenv("ADZUNA_COUNTRIES", "gb")
     UNKNOWN_JOB_CATEGORY_ID_VALUE: int = 30
     APP_ID: str = os.getenv("APP_ID", "")
     APP_KEY: str = os.getenv("APP_KEY", "")
@@ -27,6 +30,182 @@ class Config(BaseSettings):
     )
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "local")
 
+    # Database engine, see db/engine.py for the profiles
+    DB_ENGINE_PROFILE: str = os.getenv("DB_ENGINE_PROFILE", "task")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+    DB_POOL_RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    # asyncpg's per connection cache and SQLAlchemy's own, 0 disables them
+    DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "100"))
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = int(
+        os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100")
+    )
+
+    # Fetching
+    ADZUNA_RESULTS_PER_PAGE: int = int(os.getenv("ADZUNA_RESULTS_PER_PAGE", "100"))
+    ADZUNA_REQUESTS_PER_MINUTE: float = float(
+        os.getenv("ADZUNA_REQUESTS_PER_MINUTE", "25")
+    )
+    ADZUNA_REQUEST_BURST: float = float(os.getenv("ADZUNA_REQUEST_BURST", "5"))
+    # Pages requested ahead of the one being inserted, 1 keeps fetching serial
+    ADZUNA_PAGE_WINDOW: int = int(os.getenv("ADZUNA_PAGE_WINDOW", "1"))
+    # Shards fetched at once within one fetch_jobs task
+    ADZUNA_CATEGORY_CONCURRENCY: int = int(
+        os.getenv("ADZUNA_CATEGORY_CONCURRENCY", "4")
+    )
+    # Split shards into this many fetch_jobs tasks, each running its chunk
+    # in one event loop. 0 maps one task per shard.
+    ADZUNA_FETCH_JOBS_CHUNKS: int = int(os.getenv("ADZUNA_FETCH_JOBS_CHUNKS", "0"))
+    # fetch_jobs tasks running at once. ADZUNA_REQUESTS_PER_MINUTE is the
+    # budget of all of them together, each task gets an equal share.
+    ADZUNA_MAX_ACTIVE_FETCH_TASKS: int = int(
+        os.getenv("ADZUNA_MAX_ACTIVE_FETCH_TASKS", "4")
+    )
+    ADZUNA_MIN_REQUESTS_PER_MINUTE: float = float(
+        os.getenv("ADZUNA_MIN_REQUESTS_PER_MINUTE", "2")
+    )
+
+    # Request budget planner, splits each run's calls across shards by the
+    # new listings their pages yielded before. 0 disables it, every shard
+    # pages until it stops finding new jobs.
+    ADZUNA_RUN_REQUEST_BUDGET: int = int(os.getenv("ADZUNA_RUN_REQUEST_BUDGET", "1000"))
+    ADZUNA_PLANNER_LOOKBACK_DAYS: int = int(
+        os.getenv("ADZUNA_PLANNER_LOOKBACK_DAYS", "56")
+    )
+    # Pages every shard gets before the rest goes to the best yielding ones
+    ADZUNA_PLANNER_MIN_PAGES: int = int(os.getenv("ADZUNA_PLANNER_MIN_PAGES", "1"))
+    ADZUNA_PLANNER_MAX_PAGES: int = int(os.getenv("ADZUNA_PLANNER_MAX_PAGES", "50"))
+    # Pages expected to bring fewer new listings per call are not fetched
+    ADZUNA_PLANNER_MIN_YIELD: float = float(os.getenv("ADZUNA_PLANNER_MIN_YIELD", "1"))
+    # Calls worth of the all-shard average a shard's own history is blended with
+    ADZUNA_PLANNER_PRIOR_CALLS: float = float(
+        os.getenv("ADZUNA_PLANNER_PRIOR_CALLS", "2")
+    )
+
+    # Incremental ingestion
+    ADZUNA_INCREMENTAL: bool = os.getenv("ADZUNA_INCREMENTAL", "true").lower() == "true"
+    ADZUNA_WATERMARK_OVERLAP_HOURS: float = float(
+        os.getenv("ADZUNA_WATERMARK_OVERLAP_HOURS", "24")
+    )
+    # Pages before the saved cursor a catch-up re-reads, in case listings
+    # above it expired and the rest moved up
+    ADZUNA_RESUME_OVERLAP_PAGES: int = int(
+        os.getenv("ADZUNA_RESUME_OVERLAP_PAGES", "1")
+    )
+    # Bounds the first run of a category with no watermark yet, 0 is unbounded
+    ADZUNA_INITIAL_MAX_DAYS_OLD: int = int(
+        os.getenv("ADZUNA_INITIAL_MAX_DAYS_OLD", "0")
+    )
+    # Drop already stored job IDs before transforming and inserting a page
+    KNOWN_JOB_ID_FILTER: bool = (
+        os.getenv("KNOWN_JOB_ID_FILTER", "true").lower() == "true"
+    )
+
+    # Writing job listings: "insert" (multi-row INSERT), "copy" (COPY into a
+    # staging table, then one INSERT ... SELECT) or "upsert" (update listings
+    # whose content hash changed)
+    JOB_LISTING_LOAD_METHOD: str = os.getenv("JOB_LISTING_LOAD_METHOD", "insert")
+    # Fetchers hand pages to one writer per task, which commits them in
+    # groups. A full queue makes fetchers wait.
+    JOB_WRITER_QUEUE_PAGES: int = int(os.getenv("JOB_WRITER_QUEUE_PAGES", "32"))
+    JOB_WRITER_BATCH_ROWS: int = int(os.getenv("JOB_WRITER_BATCH_ROWS", "1000"))
+    JOB_WRITER_BATCH_MB: float = float(os.getenv("JOB_WRITER_BATCH_MB", "8"))
+    # Longest a page waits for more pages to share its commit
+    JOB_WRITER_FLUSH_MS: float = float(os.getenv("JOB_WRITER_FLUSH_MS", "100"))
+    # Page checkpoints per DAG run, committed with each group of pages. A
+    # retried fetch task resumes after the last committed page of a shard.
+    INGESTION_CHECKPOINTS_ENABLED: bool = (
+        os.getenv("INGESTION_CHECKPOINTS_ENABLED", "true").lower() == "true"
+    )
+    INGESTION_CHECKPOINT_RETENTION_DAYS: int = int(
+        os.getenv("INGESTION_CHECKPOINT_RETENTION_DAYS", "14")
+    )
+
+    # Raw response landing zone (bronze)
+    LANDING_ZONE_ENABLED: bool = (
+        os.getenv("LANDING_ZONE_ENABLED", "true").lower() == "true"
+    )
+    LANDING_ZONE_PATH: str = os.getenv("LANDING_ZONE_PATH", "landing")
+    LANDING_ZONE_COMPRESS_LEVEL: int = int(
+        os.getenv("LANDING_ZONE_COMPRESS_LEVEL", "6")
+    )
+    LANDING_REPLAY_WORKERS: int = int(os.getenv("LANDING_REPLAY_WORKERS", "8"))
+    LANDING_REPLAY_BATCH_SIZE: int = int(os.getenv("LANDING_REPLAY_BATCH_SIZE", "2000"))
+
+    # job_listing monthly partitions
+    JOB_LISTING_PARTITION_MONTHS_AHEAD: int = int(
+        os.getenv("JOB_LISTING_PARTITION_MONTHS_AHEAD", "3")
+    )
+    # Months of partitions kept attached, 0 keeps everything
+    JOB_LISTING_RETENTION_MONTHS: int = int(
+        os.getenv("JOB_LISTING_RETENTION_MONTHS", "0")
+    )
+    # "archive" detaches and renames old partitions, "drop" deletes them
+    JOB_LISTING_RETENTION_ACTION: str = os.getenv(
+        "JOB_LISTING_RETENTION_ACTION", "archive"
+    )
+
+    # Weekly salary and demand rollups
+    ROLLUP_REFRESH_OVERLAP_MINUTES: int = int(
+        os.getenv("ROLLUP_REFRESH_OVERLAP_MINUTES", "60")
+    )
+
+    # Parquet change export
+    EXPORT_ENABLED: bool = os.getenv("EXPORT_ENABLED", "false").lower() == "true"
+    EXPORT_PATH: str = os.getenv("EXPORT_PATH", "export")
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+    # Buffered rows across partitions before they are written out
+    EXPORT_FILE_ROWS: int = int(os.getenv("EXPORT_FILE_ROWS", "50000"))
+    # Changes younger than this are left to the next run, so transactions
+    # still in flight when the export starts are not skipped
+    EXPORT_SAFETY_LAG_SECONDS: int = int(os.getenv("EXPORT_SAFETY_LAG_SECONDS", "300"))
+    # Partitions with this many files under the target size are compacted
+    EXPORT_COMPACT_MIN_FILES: int = int(os.getenv("EXPORT_COMPACT_MIN_FILES", "8"))
+    EXPORT_COMPACT_TARGET_MB: int = int(os.getenv("EXPORT_COMPACT_TARGET_MB", "128"))
+
+    # Metrics, see telemetry/
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    # Per run JSON summaries, empty disables them
+    METRICS_SUMMARY_DIR: str = os.getenv("METRICS_SUMMARY_DIR", "metrics")
+    # node_exporter textfile collector directory, empty disables it
+    METRICS_TEXTFILE_DIR: str = os.getenv("METRICS_TEXTFILE_DIR", "")
+    # StatsD over UDP, empty host disables it
+    METRICS_STATSD_HOST: str = os.getenv("METRICS_STATSD_HOST", "")
+    METRICS_STATSD_PORT: int = int(os.getenv("METRICS_STATSD_PORT", "8125"))
+    METRICS_STATSD_PREFIX: str = os.getenv("METRICS_STATSD_PREFIX", "data_extraction")
+
+    # HTTP client
+    HTTP_TIMEOUT_SECONDS: float = float(os.getenv("HTTP_TIMEOUT_SECONDS", "30"))
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(
+        os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10")
+    )
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = float(
+        os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "30")
+    )
+    HTTP_MAX_RETRIES: int = int(os.getenv("HTTP_MAX_RETRIES", "6"))
+    HTTP_BACKOFF_BASE_SECONDS: float = float(
+        os.getenv("HTTP_BACKOFF_BASE_SECONDS", "1")
+    )
+    HTTP_BACKOFF_MAX_SECONDS: float = float(
+        os.getenv("HTTP_BACKOFF_MAX_SECONDS", "120")
+    )
+    # On-disk response cache with ETag/Last-Modified revalidation, used by
+    # requests that pass a TTL to get_with_retry
+    HTTP_CACHE_ENABLED: bool = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+    HTTP_CACHE_PATH: str = os.getenv("HTTP_CACHE_PATH", "http_cache")
+    # Least recently used responses are evicted past this size
+    HTTP_CACHE_MAX_MB: float = float(os.getenv("HTTP_CACHE_MAX_MB", "256"))
+    # Served without asking the API for this long, revalidated after
+    HTTP_CACHE_CATEGORIES_TTL_SECONDS: float = float(
+        os.getenv("HTTP_CACHE_CATEGORIES_TTL_SECONDS", "86400")
+    )
+    # Lets a retried task re-read the pages it already fetched for free
+    HTTP_CACHE_SEARCH_TTL_SECONDS: float = float(
+        os.getenv("HTTP_CACHE_SEARCH_TTL_SECONDS", "900")
+    )
+
     # S3
     S3_BUCKET: str = os.getenv("S3_BUCKET", "")
     S3_MOCK_DATA_PREFIX: str = os.getenv("S3_PREFIX", "mock_data")
@@ -37,34 +216,54 @@ config = Config()
 logger = LoggingMixin().log
 
 
-def __read_mock_data_from_s3(file_name: str):
+@functools.cache
+def __s3_client():
+    # boto3 takes longer to import than the rest of config, and only dev
+    # mock runs need it. One client per process, they are thread safe.
+    import boto3
+
+    return boto3.client("s3", region_name=config.AWS_REGION)
+
+
+def __read_mock_data_from_s3(file_name: str) -> bytes:
     bucket = config.S3_BUCKET
     key = f"{config.S3_MOCK_DATA_PREFIX}/{file_name}"
     logger.info(f"Reading mock data from s3://{bucket}/{key} ...")
 
-    s3 = boto3.client("s3", region_name=config.AWS_REGION)
     try:
-        obj = s3.get_object(Bucket=bucket, Key=key)
-        body = obj["Body"].read().decode("utf-8")
-        return json.loads(body)
+        obj = __s3_client().get_object(Bucket=bucket, Key=key)
+        return obj["Body"].read()
     except Exception as e:
         logger.exception(f"Failed to read s3://{bucket}/{key}: {e}")
         raise e
 
 
-def __local_mock(file_name: str) -> dict:
-    logger.info("Reading mock data from local filesystem...")
+def __local_mock(file_name: str) -> bytes:
     path = Path(f"mock_data/{file_name}")
     logger.info(f"Reading mock data from path: {path}...")
-    with path.open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data
+    return path.read_bytes()
 
 
-def read_mock_data(file_name: str) -> dict:
-    if config.ENVIRONMENT == "local":
+# Fixtures are read once per process, not once per page
+@functools.lru_cache(maxsize=64)
+def __cached_mock_bytes(environment: str, file_name: str) -> bytes:
+    if environment == "local":
         return __local_mock(file_name)
-    elif config.ENVIRONMENT == "dev":
+    elif environment == "dev":
         return __read_mock_data_from_s3(file_name)
     else:
-        raise ValueError(f"Unsupported environment: {config.ENVIRONMENT}")
+        raise ValueError(f"Unsupported environment: {environment}")
+
+
+@functools.lru_cache(maxsize=64)
+def __cached_mock_data(environment: str, file_name: str) -> dict:
+    return json.loads(__cached_mock_bytes(environment, file_name))
+
+
+def read_mock_bytes(file_name: str) -> bytes:
+    return __cached_mock_bytes(config.ENVIRONMENT, file_name)
+
+
+def read_mock_data(file_name: str) -> dict:
+    # Shared between callers, treat it as read-only
+    return __cached_mock_data(config.ENVIRONMENT, file_name)
@@ -3,9 +3,48 @@ import asyncio
 
 from airflow.sdk import dag, task
 
-from api.adzuna.fetch_categories import fetch_categories
-from api.adzuna.fetch_jobs import fetch_jobs_by_category
-from api.adzuna.process_categories import process_categories
+from config import config, logger
+
+# The scheduler re-imports this file on every parse loop. Task logic pulls in
+# httpx, SQLAlchemy, asyncpg and msgspec, so it is imported inside the tasks
+# and only loaded by the worker that runs them.
+# benchmarks.dag_parse_benchmark guards this.
+
+
+def __task_label() -> str:
+    from airflow.sdk import get_current_context
+
+    task_instance = get_current_context()["ti"]
+    if task_instance.map_index >= 0:
+        return f"{task_instance.task_id}-{task_instance.map_index}"
+    return task_instance.task_id
+
+
+def __dag_run_id() -> str:
+    from airflow.sdk import get_current_context
+
+    # Same for every try of a task, so a retry finds its checkpoints
+    return get_current_context()["run_id"]
+
+
+async def run_and_close_connections(coro):
+    from api.http_client import close_http_client
+    from db.engine import dispose_engine
+    from telemetry.exporters import configure_statsd, export_metrics
+
+    configure_statsd()
+    # Clients and pooled connections are bound to this task's event loop
+    try:
+        return await coro
+    finally:
+        await close_http_client()
+        await dispose_engine()
+        # Metrics are best effort, a full disk or a bad path must not fail
+        # the task or hide the exception it raised
+        try:
+            export_metrics(__task_label())
+        except Exception as e:
+            logger.warning(f"Error exporting metrics: {e!r}")
 
 
 @dag(
@@ -18,20 +57,105 @@ from api.adzuna.process_categories import process_categories
 def adzuna_dag():
     @task
     def fetch_categories_task():
-        return asyncio.run(fetch_categories())
+        from api.adzuna.fetch_categories import fetch_categories_by_country
+
+        return asyncio.run(run_and_close_connections(fetch_categories_by_country()))
+
+    @task
+    def process_categories_task(categories_by_country):
+        from api.adzuna.process_categories import process_categories
+
+        return asyncio.run(
+            run_and_close_connections(process_categories(categories_by_country))
+        )
 
     @task
-    def process_categories_task(categories):
-        return asyncio.run(process_categories(categories))
+    def maintain_partitions_task():
+        from db.maintenance import maintain_job_listing_partitions
+
+        asyncio.run(run_and_close_connections(maintain_job_listing_partitions()))
+
+    @task
+    def refresh_rollups_task():
+        from db.maintenance import refresh_job_listing_rollups
+
+        asyncio.run(run_and_close_connections(refresh_job_listing_rollups()))
+
+    @task
+    def export_changes_task():
+        from cdc.parquet_export import export_changes
+
+        return asyncio.run(run_and_close_connections(export_changes()))
 
     @task
-    def fetch_jobs_task(category: str):
-        asyncio.run(fetch_jobs_by_category([category]))
+    def plan_budget_task(shards: list[str]) -> list[dict]:
+        if config.ADZUNA_RUN_REQUEST_BUDGET <= 0:
+            return [{"shard": shard, "page_limit": None} for shard in shards]
+        from api.adzuna.budget_planner import plan_request_budget
+
+        page_limits = asyncio.run(
+            run_and_close_connections(plan_request_budget(shards))
+        )
+        # Shards the planner gave no pages are not fetched this run
+        return [
+            {"shard": shard, "page_limit": page_limits[shard]}
+            for shard in shards
+            if page_limits.get(shard)
+        ]
+
+    # Each running fetch task gets an equal share of the request quota, see
+    # api.http_client, so their number is capped to match.
+    @task(max_active_tis_per_dag=config.ADZUNA_MAX_ACTIVE_FETCH_TASKS)
+    def fetch_jobs_task(shard: str, page_limit: int | None):
+        from api.adzuna.fetch_jobs import fetch_jobs_by_shard
+
+        asyncio.run(
+            run_and_close_connections(
+                fetch_jobs_by_shard(
+                    [shard],
+                    page_limits={shard: page_limit},
+                    dag_run_id=__dag_run_id(),
+                )
+            )
+        )
+
+    @task
+    def chunk_shards_task(plan: list[dict]) -> list[dict[str, int | None]]:
+        chunks = min(config.ADZUNA_FETCH_JOBS_CHUNKS, len(plan))
+        # Round robin, so one country's shards are spread across chunks
+        return [
+            {item["shard"]: item["page_limit"] for item in plan[i::chunks]}
+            for i in range(chunks)
+        ]
+
+    @task(max_active_tis_per_dag=config.ADZUNA_MAX_ACTIVE_FETCH_TASKS)
+    def fetch_jobs_batch_task(page_limits: dict[str, int | None]):
+        # One event loop per chunk, sharing the HTTP client, the rate limiter,
+        # the DB pool and the category map across its shards.
+        from api.adzuna.fetch_jobs import fetch_jobs_by_shard
+
+        asyncio.run(
+            run_and_close_connections(
+                fetch_jobs_by_shard(
+                    list(page_limits),
+                    page_limits=page_limits,
+                    dag_run_id=__dag_run_id(),
+                )
+            )
+        )
 
-    categories = fetch_categories_task()
-    category_tags = process_categories_task(categories)
+    categories_by_country = fetch_categories_task()
+    plan = plan_budget_task(process_categories_task(categories_by_country))
+    partitions = maintain_partitions_task()
 
-    fetch_jobs_task.expand(category=category_tags)
+    if config.ADZUNA_FETCH_JOBS_CHUNKS > 0:
+        fetched_jobs = fetch_jobs_batch_task.expand(page_limits=chunk_shards_task(plan))
+    else:
+        fetched_jobs = fetch_jobs_task.expand_kwargs(plan)
+    # Next months' partitions exist before any listing is written
+    partitions >> fetched_jobs >> refresh_rollups_task()
+    if config.EXPORT_ENABLED:
+        fetched_jobs >> export_changes_task()
 
 
 adzuna_dag()
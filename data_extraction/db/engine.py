@@ -1,17 +1,104 @@
+import asyncio
+import time
 from contextlib import asynccontextmanager
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
-from config import config
+from uuid import uuid4
 
-async_db_engine = create_async_engine(
-    config.ASYNC_DATABASE_URL, pool_pre_ping=True, pool_size=10, max_overflow=20
-)
-async_session_factory = async_sessionmaker(async_db_engine, expire_on_commit=False)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from config import config, logger
+from telemetry.metrics import observe, timed
+
+ENGINE_PROFILES = ("task", "pooled", "pgbouncer")
+
+# Created on first use, so importing this module (Airflow parses DAG files
+# in every worker) opens no connections and reserves no pool.
+__engine: AsyncEngine | None = None
+__session_factory: async_sessionmaker | None = None
+__loop: asyncio.AbstractEventLoop | None = None
+
+
+def __engine_options(profile: str) -> dict:
+    statement_cache = {
+        "statement_cache_size": config.DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": config.DB_PREPARED_STATEMENT_CACHE_SIZE,
+    }
+    if profile == "task":
+        # A connection per session, closed with it. Short tasks hold only as
+        # many connections as they have sessions open.
+        return {"poolclass": NullPool, "connect_args": statement_cache}
+    if profile == "pooled":
+        # Long running batch workers reuse connections across many sessions
+        return {
+            "pool_size": config.DB_POOL_SIZE,
+            "max_overflow": config.DB_MAX_OVERFLOW,
+            "pool_pre_ping": True,
+            "pool_recycle": config.DB_POOL_RECYCLE_SECONDS,
+            "connect_args": statement_cache,
+        }
+    if profile == "pgbouncer":
+        # PgBouncer pools server connections itself. In transaction mode a
+        # prepared statement may be run on another server connection, so
+        # nothing is cached and every statement gets a unique name.
+        return {
+            "poolclass": NullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+        }
+    raise Exception(
+        f"Unknown DB_ENGINE_PROFILE {profile!r}, expected one of {ENGINE_PROFILES}"
+    )
+
+
+def __commit_started(session: Session) -> None:
+    session.info["commit_started_at"] = time.perf_counter()
+
+
+def __commit_finished(session: Session) -> None:
+    started_at = session.info.pop("commit_started_at", None)
+    if started_at is not None:
+        # Includes the flush that runs as part of the commit
+        observe("db_commit_seconds", time.perf_counter() - started_at)
+
+
+def get_engine() -> AsyncEngine:
+    global __engine, __session_factory, __loop
+    loop = asyncio.get_running_loop()
+    if __engine is None:
+        profile = config.DB_ENGINE_PROFILE
+        logger.info(f"Creating database engine with the {profile} profile...")
+        __engine = create_async_engine(
+            config.ASYNC_DATABASE_URL, **__engine_options(profile)
+        )
+        __session_factory = async_sessionmaker(__engine, expire_on_commit=False)
+        event.listen(Session, "before_commit", __commit_started)
+        event.listen(Session, "after_commit", __commit_finished)
+    elif __loop is not loop:
+        # asyncpg connections belong to the loop that opened them. A later
+        # `asyncio.run` keeps the engine but starts from an empty pool.
+        __engine.sync_engine.dispose(close=False)
+    __loop = loop
+    return __engine
+
+
+async def dispose_engine() -> None:
+    """Closes pooled connections, call before the event loop ends."""
+    if __engine is not None and __loop is asyncio.get_running_loop():
+        await __engine.dispose()
 
 
 @asynccontextmanager
 async def get_db_session():
-    async with async_session_factory() as session:
+    get_engine()
+    async with __session_factory() as session:
         try:
+            # Connecting up front makes pool waits and connects measurable
+            with timed("db_connection_acquire_seconds"):
+                await session.connection()
             yield session
             await session.commit()
         except:
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+from config import config, logger
+from db.engine import get_db_session
+from repository.partitions import (
+    add_months,
+    create_job_listing_partition,
+    get_job_listing_partitions,
+    retire_job_listing_partition,
+)
+from repository.rollups import (
+    get_rollup_refreshed_at,
+    refresh_job_listing_weekly_stats,
+)
+
+
+async def maintain_job_listing_partitions() -> None:
+    logger.info("Maintaining job_listing partitions...")
+    today = datetime.now(timezone.utc).date()
+    current_month = today.replace(day=1)
+    async with get_db_session() as db:
+        partitions = await get_job_listing_partitions(db)
+
+        for months in range(config.JOB_LISTING_PARTITION_MONTHS_AHEAD + 1):
+            month = add_months(current_month, months)
+            if month not in partitions:
+                await create_job_listing_partition(db, month)
+
+        if config.JOB_LISTING_RETENTION_MONTHS > 0:
+            oldest_kept = add_months(
+                current_month, -config.JOB_LISTING_RETENTION_MONTHS
+            )
+            for month, name in sorted(partitions.items()):
+                if month < oldest_kept:
+                    await retire_job_listing_partition(
+                        db,
+                        month,
+                        name,
+                        drop=config.JOB_LISTING_RETENTION_ACTION == "drop",
+                    )
+    logger.info("job_listing partitions maintained successfully.")
+
+
+async def refresh_job_listing_rollups() -> None:
+    logger.info("Refreshing job_listing rollups...")
+    async with get_db_session() as db:
+        refreshed_at = await get_rollup_refreshed_at(db)
+        # Overlap catches listings committed after the last refresh started
+        # with an earlier created_at, recomputing a group twice is harmless.
+        since = (
+            refreshed_at - timedelta(minutes=config.ROLLUP_REFRESH_OVERLAP_MINUTES)
+            if refreshed_at
+            else None
+        )
+        groups = await refresh_job_listing_weekly_stats(db, since)
+    logger.info(f"Refreshed {groups} job_listing rollup groups successfully.")
@@ -1,25 +1,33 @@
 from sqlalchemy import (
+    Boolean,
     Column,
+    Computed,
+    Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     Float,
     String,
     Text,
     UniqueConstraint,
-    JSON,
     func,
 )
-from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import declarative_base, deferred, relationship
 
 Base = declarative_base()
 
+# Text search configuration used for job_listing.search_vector and queries
+SEARCH_CONFIG = "english"
+
 
 class JobCategory(Base):
     __tablename__ = "job_category"
 
     id = Column(Integer, primary_key=True)
     source = Column(String, nullable=False)
+    country = Column(String, nullable=False)
     tag = Column(String, nullable=False)
     label = Column(String, nullable=False)
     created_at = Column(
@@ -28,18 +36,59 @@ class JobCategory(Base):
         server_default=func.now(),
     )
 
+    # Never loaded implicitly, a category can have millions of listings.
+    # Use repository.job_reads or an explicit loader option instead.
     job_listings = relationship(
         "JobListing",
         back_populates="category",
-        lazy="selectin",
+        lazy="raise",
     )
 
     __table_args__ = (
         UniqueConstraint(
             "source",
+            "country",
             "tag",
             "label",
-            name="uq_job_category_source_source_category_id",
+            name="uq_job_category_source_country_tag_label",
+        ),
+    )
+
+
+class JobDescription(Base):
+    """Description texts stored once, keyed by the SHA-256 of the text.
+
+    Agencies post the same boilerplate under many job IDs, job_listing
+    references it by description_hash. Rows are never updated, a changed
+    description is a new row.
+    """
+
+    __tablename__ = "job_description"
+
+    hash = Column(String(64), primary_key=True)
+    description = Column(Text, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+    # Weighted below job_listing.search_vector, see repository.job_reads
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', description), 'B')",
+                persisted=True,
+            ),
+        )
+    )
+
+    __table_args__ = (
+        Index("ix_job_description_created_at", "created_at"),
+        Index(
+            "ix_job_description_search_vector",
+            "search_vector",
+            postgresql_using="gin",
         ),
     )
 
@@ -47,17 +96,27 @@ class JobCategory(Base):
 class JobListing(Base):
     __tablename__ = "job_listing"
 
-    id = Column(Integer, primary_key=True)
+    # Partitioned by month of job_created_at, so the partition key is part of
+    # the primary key and of the (source, job_id) unique key. JobListingKey
+    # keeps (source, job_id) unique on its own.
+    id = Column(Integer, primary_key=True, autoincrement=True)
     source = Column(String, nullable=False)
     job_id = Column(String, nullable=False)
+    # Adzuna ad IDs are global, so country is not part of the unique key
+    country = Column(String, nullable=False)
     minimum_salary = Column(Float, nullable=True)
     maximum_salary = Column(Float, nullable=True)
     job_post_url = Column(String, nullable=False)
-    location = Column(JSON, nullable=True)
+    location = Column(JSONB, nullable=True)
     job_title = Column(Text, nullable=False)
-    job_created_at = Column(DateTime(timezone=True), nullable=True)
-    job_description = Column(Text, nullable=True)
-    company = Column(JSON, nullable=True)
+    job_created_at = Column(DateTime(timezone=True), primary_key=True)
+    description_hash = Column(
+        String(64),
+        ForeignKey("job_description.hash"),
+        nullable=True,
+        index=True,
+    )
+    company = Column(JSONB, nullable=True)
     category_id = Column(
         Integer,
         ForeignKey(
@@ -72,17 +131,199 @@ class JobListing(Base):
         nullable=False,
         server_default=func.now(),
     )
+    content_hash = Column(String(64), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Generated by Postgres from the JSONB payloads so lookups by employer
+    # or place hit an index instead of parsing every row. Never written.
+    company_name = Column(Text, Computed("company ->> 'display_name'", persisted=True))
+    location_name = Column(
+        Text, Computed("location ->> 'display_name'", persisted=True)
+    )
+    location_area = Column(JSONB, Computed("location -> 'area'", persisted=True))
+    # Titles only, descriptions have their own in job_description. Deferred,
+    # it is only ever used inside queries.
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(job_title, '')), 'A')",
+                persisted=True,
+            ),
+        )
+    )
 
     category = relationship(
         "JobCategory",
         back_populates="job_listings",
-        lazy="joined",
+        lazy="raise",
     )
 
     __table_args__ = (
         UniqueConstraint(
             "source",
             "job_id",
-            name="uq_job_listing_source_job_id",
+            "job_created_at",
+            name="uq_job_listing_source_job_id_job_created_at",
+        ),
+        Index("ix_job_listing_created_at_id", "created_at", "id"),
+        Index("ix_job_listing_updated_at", "updated_at"),
+        Index("ix_job_listing_company_name", "company_name"),
+        Index("ix_job_listing_location_name", "location_name"),
+        Index(
+            "ix_job_listing_location_area",
+            "location_area",
+            postgresql_using="gin",
+            postgresql_ops={"location_area": "jsonb_path_ops"},
+        ),
+        Index(
+            "ix_job_listing_search_vector",
+            "search_vector",
+            postgresql_using="gin",
         ),
+        {"postgresql_partition_by": "RANGE (job_created_at)"},
     )
+
+
+class JobListingWeeklyStats(Base):
+    """Listing counts and salaries per category, area and week.
+
+    Maintained by repository.rollups from the listings each run inserts or
+    updates. `area` is the region level of location.area, "" when unknown.
+    """
+
+    __tablename__ = "job_listing_weekly_stats"
+
+    source = Column(String, primary_key=True)
+    category_id = Column(Integer, primary_key=True)
+    area = Column(String, primary_key=True)
+    week = Column(Date, primary_key=True)
+    listings = Column(Integer, nullable=False)
+    salaried_listings = Column(Integer, nullable=False)
+    avg_minimum_salary = Column(Float, nullable=True)
+    avg_maximum_salary = Column(Float, nullable=True)
+    salary_p25 = Column(Float, nullable=True)
+    salary_p50 = Column(Float, nullable=True)
+    salary_p75 = Column(Float, nullable=True)
+    refreshed_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (
+        Index("ix_job_listing_weekly_stats_week", "week"),
+        Index("ix_job_listing_weekly_stats_refreshed_at", "refreshed_at"),
+    )
+
+
+class IngestionState(Base):
+    __tablename__ = "ingestion_state"
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String, nullable=False)
+    country = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    latest_job_created_at = Column(DateTime(timezone=True), nullable=True)
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
+    # The last walk stopped on a failed page or its page limit, before the
+    # watermark. Listings between the two are still to be fetched.
+    walk_incomplete = Column(Boolean, nullable=False, server_default="false")
+    # Where the catch-up continues: the deepest page it got to, and the
+    # oldest created date on that page to check the results didn't shift
+    resume_page = Column(Integer, nullable=True)
+    resume_before = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "source",
+            "country",
+            "category",
+            name="uq_ingestion_state_source_country_category",
+        ),
+    )
+
+
+class JobListingKey(Base):
+    """The created date each listing was first stored under.
+
+    job_listing's unique key has to include its partition key, so on its own
+    it can't stop a repost under a new created date from becoming a second
+    row. Writes pin their rows to the date held here first, see
+    repository.jobs.resolve_listing_keys.
+    """
+
+    __tablename__ = "job_listing_key"
+
+    source = Column(String, primary_key=True)
+    job_id = Column(String, primary_key=True)
+    job_created_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Retiring a job_listing partition removes the keys of its month
+    __table_args__ = (Index("ix_job_listing_key_job_created_at", "job_created_at"),)
+
+
+class ApiRequestLedger(Base):
+    """API calls spent and new listings gained per shard and page depth.
+
+    One row per day, incremented by every fetch. Read by
+    api.adzuna.budget_planner to split the next run's request budget.
+    """
+
+    __tablename__ = "api_request_ledger"
+
+    source = Column(String, primary_key=True)
+    country = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    page = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    calls = Column(Integer, nullable=False)
+    new_rows = Column(Integer, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (Index("ix_api_request_ledger_day", "day"),)
+
+
+class IngestionCheckpoint(Base):
+    """How far a shard got within one DAG run, one row per committed page.
+
+    api.adzuna.batch_writer writes a page's row in the same transaction as
+    its listings, so a retried fetch task resumes after the last page that
+    made it to the database.
+    """
+
+    __tablename__ = "ingestion_checkpoint"
+
+    dag_run_id = Column(String, primary_key=True)
+    source = Column(String, primary_key=True)
+    country = Column(String, primary_key=True)
+    category = Column(String, primary_key=True)
+    page = Column(Integer, primary_key=True)
+    new_rows = Column(Integer, nullable=False)
+    # Cumulative over every page of the shard committed in this run
+    total_new_rows = Column(Integer, nullable=False)
+    newest_job_created_at = Column(DateTime(timezone=True), nullable=True)
+    # Pagination reached the watermark on this page
+    stopped = Column(Boolean, nullable=False, server_default="false")
+    # Ledger and watermark are updated, nothing is left to do for the shard
+    finished = Column(Boolean, nullable=False, server_default="false")
+    updated_at = Column(
+        DateTime(timezone=True),
+        nullable=False,
+        server_default=func.now(),
+    )
+
+    __table_args__ = (Index("ix_ingestion_checkpoint_updated_at", "updated_at"),)
+
+
+class ExportState(Base):
+    __tablename__ = "export_state"
+
+    name = Column(String, primary_key=True)
+    # Every change at or before this time has been exported
+    exported_through = Column(DateTime(timezone=True), nullable=False)
+    last_run_at = Column(DateTime(timezone=True), nullable=True)
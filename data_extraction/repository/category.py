@@ -14,7 +14,7 @@ async def insert_categories_batch(
     stmt = (
         insert(JobCategory)
         .values(categories)
-        .on_conflict_do_nothing(index_elements=["source", "tag", "label"])
+        .on_conflict_do_nothing(index_elements=["source", "country", "tag", "label"])
     )
 
     await db.execute(stmt)
@@ -22,10 +22,12 @@ async def insert_categories_batch(
     logger.info("Categories batch inserted successfully.")
 
 
-async def get_category_id_by_tag(db: AsyncSession) -> dict[str, int]:
-    logger.info("Fetching category IDs by tag...")
-    stmt = select(JobCategory.tag, JobCategory.id)
+async def get_category_id_by_country_and_tag(
+    db: AsyncSession,
+) -> dict[tuple[str, str], int]:
+    logger.info("Fetching category IDs by country and tag...")
+    stmt = select(JobCategory.country, JobCategory.tag, JobCategory.id)
     rows = await db.execute(stmt)
-    category_map = {tag: id for tag, id in rows.all()}
+    category_map = {(country, tag): id for country, tag, id in rows.all()}
     logger.info("Category IDs fetched successfully.")
     return category_map
@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from config import logger
+from model.adzuna import IngestionCheckpoint
+from sqlalchemy.ext.asyncio import AsyncSession
+
+CHECKPOINT_KEY_COLUMNS = ["dag_run_id", "source", "country", "category", "page"]
+
+
+@dataclass
+class ShardProgress:
+    """Running totals of one shard in one DAG run, as of its last commit."""
+
+    dag_run_id: str
+    source: str
+    country: str
+    category: str
+    page: int = 0
+    total_new_rows: int = 0
+
+    def advance(
+        self,
+        page: int,
+        new_rows: int,
+        newest_job_created_at: datetime | None,
+        stopped: bool,
+    ) -> dict:
+        self.page = page
+        self.total_new_rows += new_rows
+        return {
+            "dag_run_id": self.dag_run_id,
+            "source": self.source,
+            "country": self.country,
+            "category": self.category,
+            "page": page,
+            "new_rows": new_rows,
+            "total_new_rows": self.total_new_rows,
+            "newest_job_created_at": newest_job_created_at,
+            "stopped": stopped,
+        }
+
+
+async def get_latest_checkpoint(
+    db: AsyncSession,
+    dag_run_id: str,
+    source: str,
+    country: str,
+    category: str,
+) -> IngestionCheckpoint | None:
+    stmt = (
+        select(IngestionCheckpoint)
+        .where(
+            IngestionCheckpoint.dag_run_id == dag_run_id,
+            IngestionCheckpoint.source == source,
+            IngestionCheckpoint.country == country,
+            IngestionCheckpoint.category == category,
+        )
+        .order_by(IngestionCheckpoint.page.desc())
+        .limit(1)
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def save_checkpoints(db: AsyncSession, checkpoints: list[dict]) -> None:
+    """Upserts page checkpoints without committing, see api.adzuna.batch_writer."""
+    if not checkpoints:
+        return
+    stmt = insert(IngestionCheckpoint).values(checkpoints)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=CHECKPOINT_KEY_COLUMNS,
+        set_={
+            "new_rows": stmt.excluded.new_rows,
+            "total_new_rows": stmt.excluded.total_new_rows,
+            "newest_job_created_at": stmt.excluded.newest_job_created_at,
+            "stopped": stmt.excluded.stopped,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+
+
+async def finish_checkpoint(
+    db: AsyncSession,
+    progress: ShardProgress,
+    newest_job_created_at: datetime | None,
+) -> None:
+    """Marks the shard done for the run on its last checkpoint, or page 0."""
+    stmt = insert(IngestionCheckpoint).values(
+        dag_run_id=progress.dag_run_id,
+        source=progress.source,
+        country=progress.country,
+        category=progress.category,
+        page=progress.page,
+        new_rows=0,
+        total_new_rows=progress.total_new_rows,
+        newest_job_created_at=newest_job_created_at,
+        finished=True,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=CHECKPOINT_KEY_COLUMNS,
+        set_={"finished": True, "updated_at": func.now()},
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+
+async def delete_checkpoints_before(db: AsyncSession, before: datetime) -> int:
+    stmt = delete(IngestionCheckpoint).where(IngestionCheckpoint.updated_at < before)
+    result = await db.execute(stmt)
+    await db.commit()
+    if result.rowcount:
+        logger.info(f"Deleted {result.rowcount} ingestion checkpoints before {before}.")
+    return result.rowcount
@@ -0,0 +1,123 @@
+from collections.abc import AsyncIterator
+from datetime import datetime
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from config import logger
+from model.adzuna import ExportState, JobCategory, JobDescription, JobListing
+from sqlalchemy.ext.asyncio import AsyncSession
+
+JOB_LISTING_EXPORT_COLUMNS = [
+    "id",
+    "source",
+    "job_id",
+    "country",
+    "minimum_salary",
+    "maximum_salary",
+    "job_post_url",
+    "location",
+    "job_title",
+    "job_created_at",
+    "description_hash",
+    "company",
+    "category_id",
+    "created_at",
+    "content_hash",
+    "updated_at",
+]
+JOB_CATEGORY_EXPORT_COLUMNS = ["id", "source", "country", "tag", "label", "created_at"]
+JOB_DESCRIPTION_EXPORT_COLUMNS = ["hash", "description", "created_at"]
+
+
+async def get_database_now(db: AsyncSession) -> datetime:
+    return (await db.execute(select(func.now()))).scalar_one()
+
+
+async def get_export_watermark(db: AsyncSession, name: str) -> datetime | None:
+    stmt = select(ExportState.exported_through).where(ExportState.name == name)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def update_export_watermark(
+    db: AsyncSession, name: str, exported_through: datetime
+) -> None:
+    logger.info(f"Updating export watermark for {name} to {exported_through}...")
+    stmt = insert(ExportState).values(
+        name=name,
+        exported_through=exported_through,
+        last_run_at=func.now(),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={
+            "exported_through": stmt.excluded.exported_through,
+            "last_run_at": stmt.excluded.last_run_at,
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+
+async def stream_changed_job_listings(
+    db: AsyncSession,
+    since: datetime | None,
+    until: datetime,
+    batch_size: int = 5000,
+) -> AsyncIterator[list]:
+    """Listings inserted or updated in (since, until], in server-side batches.
+
+    A listing updated again after `until` is left to the next export, which
+    sees it through updated_at. Each row carries `changed_at`.
+    """
+    changed_at = func.coalesce(JobListing.updated_at, JobListing.created_at)
+    stmt = select(
+        *(getattr(JobListing, column) for column in JOB_LISTING_EXPORT_COLUMNS),
+        changed_at.label("changed_at"),
+    ).where(changed_at <= until)
+    if since is not None:
+        # Two index scans, OR'd, instead of a scan over coalesce()
+        stmt = stmt.where(
+            or_(JobListing.created_at > since, JobListing.updated_at > since)
+        )
+    stmt = stmt.execution_options(yield_per=batch_size)
+    result = await db.stream(stmt)
+    async for batch in result.mappings().partitions(batch_size):
+        yield batch
+
+
+async def stream_changed_job_categories(
+    db: AsyncSession,
+    since: datetime | None,
+    until: datetime,
+    batch_size: int = 5000,
+) -> AsyncIterator[list]:
+    stmt = select(
+        *(getattr(JobCategory, column) for column in JOB_CATEGORY_EXPORT_COLUMNS),
+        JobCategory.created_at.label("changed_at"),
+    ).where(JobCategory.created_at <= until)
+    if since is not None:
+        stmt = stmt.where(JobCategory.created_at > since)
+    stmt = stmt.execution_options(yield_per=batch_size)
+    result = await db.stream(stmt)
+    async for batch in result.mappings().partitions(batch_size):
+        yield batch
+
+
+async def stream_changed_job_descriptions(
+    db: AsyncSession,
+    since: datetime | None,
+    until: datetime,
+    batch_size: int = 5000,
+) -> AsyncIterator[list]:
+    # Descriptions are insert-only, so created_at is their only change
+    stmt = select(
+        *(getattr(JobDescription, column) for column in JOB_DESCRIPTION_EXPORT_COLUMNS),
+        JobDescription.created_at.label("changed_at"),
+    ).where(JobDescription.created_at <= until)
+    if since is not None:
+        stmt = stmt.where(JobDescription.created_at > since)
+    stmt = stmt.execution_options(yield_per=batch_size)
+    result = await db.stream(stmt)
+    async for batch in result.mappings().partitions(batch_size):
+        yield batch
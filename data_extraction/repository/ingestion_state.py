@@ -0,0 +1,74 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from config import logger
+from model.adzuna import IngestionState
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def get_ingestion_state(
+    db: AsyncSession,
+    source: str,
+    country: str,
+    category: str,
+) -> IngestionState | None:
+    stmt = select(IngestionState).where(
+        IngestionState.source == source,
+        IngestionState.country == country,
+        IngestionState.category == category,
+    )
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def get_incomplete_walks(db: AsyncSession, source: str) -> list[tuple[str, str]]:
+    """(country, category) of every shard whose last walk stopped short."""
+    stmt = select(IngestionState.country, IngestionState.category).where(
+        IngestionState.source == source,
+        IngestionState.walk_incomplete,
+    )
+    result = await db.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+
+async def update_watermark(
+    db: AsyncSession,
+    source: str,
+    country: str,
+    category: str,
+    latest_job_created_at: datetime | None,
+    walk_incomplete: bool = False,
+    resume_page: int | None = None,
+    resume_before: datetime | None = None,
+) -> None:
+    logger.info(
+        f"Updating watermark for {source}/{country}/{category} to {latest_job_created_at}..."
+    )
+    stmt = insert(IngestionState).values(
+        source=source,
+        country=country,
+        category=category,
+        latest_job_created_at=latest_job_created_at,
+        last_run_at=func.now(),
+        walk_incomplete=walk_incomplete,
+        resume_page=resume_page,
+        resume_before=resume_before,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["source", "country", "category"],
+        set_={
+            # A run that saw nothing new, or stopped short of the old
+            # watermark and passes None, must not move it back
+            "latest_job_created_at": func.greatest(
+                IngestionState.latest_job_created_at,
+                stmt.excluded.latest_job_created_at,
+            ),
+            "last_run_at": stmt.excluded.last_run_at,
+            "walk_incomplete": stmt.excluded.walk_incomplete,
+            "resume_page": stmt.excluded.resume_page,
+            "resume_before": stmt.excluded.resume_before,
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
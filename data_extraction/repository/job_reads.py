@@ -0,0 +1,242 @@
+from collections.abc import AsyncIterator, Sequence
+from datetime import datetime
+
+from sqlalchemy import Select, and_, cast, func, literal, select, tuple_, union
+from sqlalchemy.dialects.postgresql import TSQUERY, TSVECTOR
+from sqlalchemy.orm import raiseload
+from config import logger
+from model.adzuna import SEARCH_CONFIG, JobDescription, JobListing
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# (created_at, id) of the last listing of a page, the next page starts after it
+KeysetCursor = tuple[datetime, int]
+
+
+def __listing_select(
+    columns: Sequence[str] | None,
+    category_id: int | None,
+    created_after: datetime | None,
+) -> Select:
+    if columns:
+        # Projections skip the ORM identity map and only fetch what is asked
+        stmt = select(*(getattr(JobListing, column) for column in columns))
+    else:
+        stmt = select(JobListing).options(raiseload("*"))
+    if category_id is not None:
+        stmt = stmt.where(JobListing.category_id == category_id)
+    if created_after is not None:
+        stmt = stmt.where(JobListing.created_at > created_after)
+    return stmt
+
+
+async def get_job_listings_page(
+    db: AsyncSession,
+    limit: int = 1000,
+    after: KeysetCursor | None = None,
+    category_id: int | None = None,
+    columns: Sequence[str] | None = None,
+) -> list:
+    """One page of listings ordered by (created_at, id).
+
+    Pass the `(created_at, id)` of the last row as `after` to get the next
+    page. Unlike OFFSET the cost of a page doesn't grow with its depth.
+    `columns` must include created_at and id to build the next cursor.
+    """
+    stmt = __listing_select(columns, category_id, None)
+    if after is not None:
+        created_at, listing_id = after
+        stmt = stmt.where(
+            tuple_(JobListing.created_at, JobListing.id)
+            > tuple_(
+                literal(created_at, JobListing.created_at.type),
+                literal(listing_id, JobListing.id.type),
+            )
+        )
+    stmt = stmt.order_by(JobListing.created_at, JobListing.id).limit(limit)
+    result = await db.execute(stmt)
+    return list(result.all() if columns else result.scalars().all())
+
+
+async def iter_job_listing_pages(
+    db: AsyncSession,
+    page_size: int = 1000,
+    category_id: int | None = None,
+    columns: Sequence[str] | None = None,
+) -> AsyncIterator[list]:
+    """Walks every listing page by page, each page in its own short query."""
+    if columns:
+        columns = list(dict.fromkeys([*columns, "created_at", "id"]))
+    after = None
+    while True:
+        page = await get_job_listings_page(db, page_size, after, category_id, columns)
+        if not page:
+            return
+        yield page
+        last = page[-1]
+        after = (last.created_at, last.id)
+
+
+async def stream_job_listings(
+    db: AsyncSession,
+    batch_size: int = 1000,
+    category_id: int | None = None,
+    created_after: datetime | None = None,
+    columns: Sequence[str] | None = None,
+) -> AsyncIterator[list]:
+    """Streams listings through a server-side cursor in fixed-size batches.
+
+    Memory stays at one batch however many rows match. The cursor holds a
+    transaction open for the whole read, prefer `iter_job_listing_pages`
+    for reads that take long between batches.
+    """
+    logger.info("Streaming job listings...")
+    stmt = __listing_select(columns, category_id, created_after).order_by(
+        JobListing.created_at, JobListing.id
+    )
+    stmt = stmt.execution_options(yield_per=batch_size)
+    if columns:
+        result = await db.stream(stmt)
+    else:
+        result = await db.stream_scalars(stmt)
+    async for batch in result.partitions(batch_size):
+        yield batch
+
+
+async def find_job_listings(
+    db: AsyncSession,
+    company: str | None = None,
+    location: str | None = None,
+    area: Sequence[str] | None = None,
+    category_id: int | None = None,
+    limit: int = 100,
+    columns: Sequence[str] | None = None,
+) -> list:
+    """Newest listings matching employer and place, e.g. London at company X.
+
+    Filters on the generated lookup columns so each one is an index scan:
+    `company` and `location` match the display names exactly, `area` is a
+    containment check against the area hierarchy, so `["UK", "London"]`
+    matches every listing with both levels in its area.
+    """
+    stmt = __listing_select(columns, category_id, None)
+    if company is not None:
+        stmt = stmt.where(JobListing.company_name == company)
+    if location is not None:
+        stmt = stmt.where(JobListing.location_name == location)
+    if area:
+        stmt = stmt.where(JobListing.location_area.contains(list(area)))
+    stmt = stmt.order_by(JobListing.job_created_at.desc()).limit(limit)
+    result = await db.execute(stmt)
+    return list(result.all() if columns else result.scalars().all())
+
+
+async def get_job_listing_counts_by_company(
+    db: AsyncSession,
+    area: Sequence[str] | None = None,
+    limit: int = 50,
+) -> list[tuple[str, int]]:
+    """Employers with the most listings, optionally within an area."""
+    stmt = select(JobListing.company_name, func.count()).where(
+        JobListing.company_name.is_not(None)
+    )
+    if area:
+        stmt = stmt.where(JobListing.location_area.contains(list(area)))
+    stmt = (
+        stmt.group_by(JobListing.company_name)
+        .order_by(func.count().desc())
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return [tuple(row) for row in result.all()]
+
+
+async def search_job_listings(
+    db: AsyncSession,
+    query: str,
+    page: int = 1,
+    page_size: int = 20,
+    category_id: int | None = None,
+) -> list:
+    """Listings matching a keyword search, best match first.
+
+    `query` uses web search syntax: `"data engineer" -junior OR analyst`.
+    Titles and descriptions are indexed apart, descriptions once per
+    distinct text, and a query can be met across the two, "python london"
+    with London only in the title. Candidates are listings whose title or
+    description has any of the query's terms, both index scans, and they
+    are then checked and ranked against title and description together.
+    A query of only exclusions has no term to look up and finds nothing.
+    Snippets are built by ts_headline, which re-parses the description, so
+    only the rows of the requested page get one.
+    """
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+    # querytree drops the exclusions, OR-ing what is left finds every listing
+    # the full query can match. With nothing left it returns 'T'.
+    any_term = cast(
+        func.replace(func.nullif(func.querytree(ts_query), "T"), " & ", " | "),
+        TSQUERY,
+    )
+    candidates = union(
+        select(JobListing.id, JobListing.job_created_at).where(
+            JobListing.search_vector.bool_op("@@")(any_term)
+        ),
+        select(JobListing.id, JobListing.job_created_at)
+        .join(JobDescription, JobDescription.hash == JobListing.description_hash)
+        .where(JobDescription.search_vector.bool_op("@@")(any_term)),
+    ).subquery()
+    # Listings without a description have no job_description row
+    search_vector = JobListing.search_vector.op("||")(
+        func.coalesce(JobDescription.search_vector, cast("", TSVECTOR))
+    )
+    rank = func.ts_rank_cd(search_vector, ts_query).label("rank")
+    matches = (
+        select(JobListing.id, JobListing.job_created_at, rank)
+        .join(
+            candidates,
+            and_(
+                JobListing.id == candidates.c.id,
+                JobListing.job_created_at == candidates.c.job_created_at,
+            ),
+        )
+        .outerjoin(JobDescription, JobDescription.hash == JobListing.description_hash)
+        .where(search_vector.bool_op("@@")(ts_query))
+    )
+    if category_id is not None:
+        matches = matches.where(JobListing.category_id == category_id)
+    matches = (
+        matches.order_by(rank.desc(), JobListing.id)
+        .limit(page_size)
+        .offset((page - 1) * page_size)
+        .subquery()
+    )
+
+    snippet = func.ts_headline(
+        SEARCH_CONFIG,
+        func.coalesce(JobDescription.description, ""),
+        ts_query,
+        "MaxFragments=2, MinWords=10, MaxWords=30",
+    ).label("snippet")
+    stmt = (
+        select(
+            JobListing.id,
+            JobListing.job_id,
+            JobListing.job_title,
+            JobListing.company_name,
+            JobListing.location_name,
+            JobListing.job_post_url,
+            JobListing.job_created_at,
+            matches.c.rank,
+            snippet,
+        )
+        .join(
+            matches,
+            and_(
+                JobListing.id == matches.c.id,
+                JobListing.job_created_at == matches.c.job_created_at,
+            ),
+        )
+        .outerjoin(JobDescription, JobDescription.hash == JobListing.description_hash)
+        .order_by(matches.c.rank.desc(), JobListing.id)
+    )
+    result = await db.execute(stmt)
+    return list(result.all())
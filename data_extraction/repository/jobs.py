@@ -1,8 +1,198 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+
+from datetime import datetime
+
+from sqlalchemy import func, literal_column, select, tuple_, union_all
 from sqlalchemy.dialects.postgresql import insert
 from config import logger
-from model.adzuna import JobListing
+from model.adzuna import JobDescription, JobListing, JobListingKey
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# job_listing is partitioned by job_created_at, which therefore has to be
+# part of its unique key and of every ON CONFLICT target.
+JOB_LISTING_CONFLICT_COLUMNS = ["source", "job_id", "job_created_at"]
+
+# Columns a listing can change on after it was first seen. category_id is left
+# out because the same job is returned under more than one category, and
+# job_created_at because a listing keeps the one it was first stored under.
+JOB_LISTING_CONTENT_COLUMNS = (
+    "minimum_salary",
+    "maximum_salary",
+    "job_post_url",
+    "location",
+    "job_title",
+    "job_description",
+    "company",
+)
+# What an upsert overwrites, the description through its hash
+JOB_LISTING_UPDATE_COLUMNS = tuple(
+    "description_hash" if column == "job_description" else column
+    for column in JOB_LISTING_CONTENT_COLUMNS
+)
+
+
+@dataclass
+class UpsertResult:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
+@dataclass
+class WriteResult:
+    # Conflict keys of the rows that were newly inserted
+    inserted_keys: set[tuple] = field(default_factory=set)
+    updated: int = 0
+
+
+def job_listing_key(job: dict) -> tuple:
+    return tuple(job[column] for column in JOB_LISTING_CONFLICT_COLUMNS)
+
+
+# Keys per statement, each binds three parameters in the INSERT and two in
+# the lookup, see api.adzuna.batch_writer.MAX_STATEMENT_ROWS
+LISTING_KEY_CHUNK_ROWS = 5000
+
+
+async def __pinned_created_at(
+    db: AsyncSession, incoming: dict[tuple, datetime]
+) -> dict[tuple, datetime]:
+    keys = list(incoming)
+    inserted = (
+        insert(JobListingKey)
+        .values(
+            [
+                {"source": source, "job_id": job_id, "job_created_at": created_at}
+                for (source, job_id), created_at in incoming.items()
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["source", "job_id"])
+        .returning(
+            JobListingKey.source, JobListingKey.job_id, JobListingKey.job_created_at
+        )
+        .cte("inserted")
+    )
+    stmt = union_all(
+        select(inserted.c.source, inserted.c.job_id, inserted.c.job_created_at),
+        select(
+            JobListingKey.source, JobListingKey.job_id, JobListingKey.job_created_at
+        ).where(tuple_(JobListingKey.source, JobListingKey.job_id).in_(keys)),
+    )
+    result = await db.execute(stmt)
+    pinned = {(source, job_id): created_at for source, job_id, created_at in result}
+    missing = [key for key in keys if key not in pinned]
+    if missing:
+        # Inserted by a concurrent transaction after this statement's snapshot
+        # was taken, a new statement sees them
+        result = await db.execute(
+            select(
+                JobListingKey.source, JobListingKey.job_id, JobListingKey.job_created_at
+            ).where(tuple_(JobListingKey.source, JobListingKey.job_id).in_(missing))
+        )
+        pinned.update(
+            {(source, job_id): created_at for source, job_id, created_at in result}
+        )
+    return pinned
+
+
+async def resolve_listing_keys(db: AsyncSession, jobs: list[dict]) -> None:
+    """Sets each job's job_created_at to the one its listing was first stored under.
+
+    Keys seen for the first time are registered in job_listing_key, without
+    committing. A repost then conflicts with the stored row and updates it,
+    instead of landing in another partition as a second listing. Keys are
+    inserted in sorted order, so concurrent writers lock them in the same
+    order.
+    """
+    incoming = {}
+    for job in jobs:
+        incoming.setdefault((job["source"], job["job_id"]), job["job_created_at"])
+    keys = sorted(incoming)
+    pinned = {}
+    for start in range(0, len(keys), LISTING_KEY_CHUNK_ROWS):
+        chunk = keys[start : start + LISTING_KEY_CHUNK_ROWS]
+        pinned.update(
+            await __pinned_created_at(db, {key: incoming[key] for key in chunk})
+        )
+    for job in jobs:
+        job["job_created_at"] = pinned[(job["source"], job["job_id"])]
+
+
+def job_content_hash(job: dict) -> str:
+    payload = json.dumps(
+        [job.get(column) for column in JOB_LISTING_CONTENT_COLUMNS],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def description_hash(description: str) -> str:
+    return hashlib.sha256(description.encode("utf-8")).hexdigest()
+
+
+# Descriptions per INSERT, each binds two parameters
+DESCRIPTION_CHUNK_ROWS = 10_000
+
+
+async def store_job_descriptions(db: AsyncSession, jobs: list[dict]) -> list[dict]:
+    """Stores each distinct description once, returns the job_listing rows.
+
+    Hashes are computed here, so resolving them takes no lookup. Rows
+    reference their description by description_hash. Call it once for
+    everything a transaction writes, before the listings: descriptions are
+    inserted sorted by hash, so concurrent writers that share boilerplate
+    lock it in the same order.
+    """
+    descriptions = {}
+    rows = []
+    for job in jobs:
+        row = dict(job)
+        description = row.pop("job_description", None)
+        row["description_hash"] = None
+        if description is not None:
+            row["description_hash"] = description_hash(description)
+            descriptions[row["description_hash"]] = description
+        rows.append(row)
+    hashes = sorted(descriptions)
+    for start in range(0, len(hashes), DESCRIPTION_CHUNK_ROWS):
+        stmt = (
+            insert(JobDescription)
+            .values(
+                [
+                    {"hash": hash_, "description": descriptions[hash_]}
+                    for hash_ in hashes[start : start + DESCRIPTION_CHUNK_ROWS]
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["hash"])
+        )
+        await db.execute(stmt)
+    return rows
+
+
+def __returned_key_columns():
+    return [getattr(JobListing, column) for column in JOB_LISTING_CONFLICT_COLUMNS]
+
+
+async def insert_job_listings(db: AsyncSession, rows: list[dict]) -> WriteResult:
+    """INSERT ... ON CONFLICT DO NOTHING without committing.
+
+    Takes the rows store_job_descriptions returns.
+    """
+    if not rows:
+        return WriteResult()
+    stmt = (
+        insert(JobListing)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=JOB_LISTING_CONFLICT_COLUMNS)
+        .returning(*__returned_key_columns())
+    )
+    result = await db.execute(stmt)
+    return WriteResult(inserted_keys={tuple(row) for row in result.all()})
+
 
 async def insert_job_listings_batch(
     db: AsyncSession,
@@ -12,16 +202,172 @@ async def insert_job_listings_batch(
     if not jobs:
         return 0
 
-    stmt = (
-        insert(JobListing)
-        .values(jobs)
-        .on_conflict_do_nothing(index_elements=["source", "job_id"])
-        .returning(JobListing.job_id)
+    await resolve_listing_keys(db, jobs)
+    rows = await store_job_descriptions(db, jobs)
+    write_result = await insert_job_listings(db, rows)
+    await db.commit()
+    inserted_count = len(write_result.inserted_keys)
+    logger.info("Job listings batch inserted successfully.")
+    return inserted_count
+
+
+async def upsert_job_listings(db: AsyncSession, rows: list[dict]) -> WriteResult:
+    """Inserts new and updates changed listings without committing.
+
+    Takes the rows store_job_descriptions returns.
+    """
+    if not rows:
+        return WriteResult()
+
+    # ON CONFLICT DO UPDATE can't touch the same row twice in one statement
+    unique_rows = list({job_listing_key(row): row for row in rows}.values())
+    stmt = insert(JobListing).values(unique_rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=JOB_LISTING_CONFLICT_COLUMNS,
+        set_={
+            **{column: stmt.excluded[column] for column in JOB_LISTING_UPDATE_COLUMNS},
+            "content_hash": stmt.excluded.content_hash,
+            "updated_at": func.now(),
+        },
+        # Rows whose content didn't change are neither written nor returned,
+        # so they cost no WAL and produce no CDC event.
+        where=JobListing.content_hash.is_distinct_from(stmt.excluded.content_hash),
+    ).returning(
+        *__returned_key_columns(),
+        # xmax is 0 only for freshly inserted row versions
+        literal_column("(xmax = 0)").label("inserted"),
     )
 
     result = await db.execute(stmt)
+    written = result.all()
+    inserted_keys = {tuple(row[:-1]) for row in written if row.inserted}
+    return WriteResult(
+        inserted_keys=inserted_keys, updated=len(written) - len(inserted_keys)
+    )
+
+
+async def upsert_job_listings_batch(
+    db: AsyncSession,
+    jobs: list[dict],
+) -> UpsertResult:
+    logger.info("Upserting job listings batch...")
+    if not jobs:
+        return UpsertResult()
+
+    await resolve_listing_keys(db, jobs)
+    rows = await store_job_descriptions(db, jobs)
+    write_result = await upsert_job_listings(db, rows)
     await db.commit()
-    inserted_ids = result.scalars().all()
-    inserted_count = len(inserted_ids)
-    logger.info("Job listings batch inserted successfully.")
+    inserted = len(write_result.inserted_keys)
+    upsert_result = UpsertResult(
+        inserted=inserted,
+        updated=write_result.updated,
+        unchanged=len({job_listing_key(job) for job in jobs})
+        - inserted
+        - write_result.updated,
+    )
+    logger.info(
+        f"Job listings batch upserted successfully: {upsert_result.inserted} inserted, "
+        f"{upsert_result.updated} updated, {upsert_result.unchanged} unchanged."
+    )
+    return upsert_result
+
+
+async def get_job_content_hashes(
+    db: AsyncSession,
+    source: str,
+    category_id: int,
+    created_since: datetime | None = None,
+) -> dict[str, str | None]:
+    logger.info(f"Fetching known job IDs for category {category_id}...")
+    stmt = select(JobListing.job_id, JobListing.content_hash).where(
+        JobListing.source == source,
+        JobListing.category_id == category_id,
+    )
+    if created_since is not None:
+        stmt = stmt.where(JobListing.job_created_at >= created_since)
+    result = await db.stream(stmt.execution_options(yield_per=10_000))
+    known_hashes = {job_id: content_hash async for job_id, content_hash in result}
+    logger.info(f"Fetched {len(known_hashes)} known job IDs.")
+    return known_hashes
+
+
+JOB_LISTING_COPY_COLUMNS = (
+    "source",
+    "job_id",
+    "country",
+    "minimum_salary",
+    "maximum_salary",
+    "job_post_url",
+    "location",
+    "job_title",
+    "job_created_at",
+    "description_hash",
+    "company",
+    "category_id",
+    "content_hash",
+)
+JSON_COLUMNS = {"location", "company"}
+STAGING_TABLE = "job_listing_staging"
+
+
+def __to_copy_record(job: dict) -> tuple:
+    # asyncpg's binary COPY encodes json columns from their text form
+    return tuple(
+        json.dumps(job.get(column))
+        if column in JSON_COLUMNS and job.get(column) is not None
+        else job.get(column)
+        for column in JOB_LISTING_COPY_COLUMNS
+    )
+
+
+async def copy_job_listings(db: AsyncSession, rows: list[dict]) -> WriteResult:
+    """COPY into the staging table, then INSERT ... SELECT, without committing.
+
+    Takes the rows store_job_descriptions returns. At most once per
+    transaction, the staging table is only emptied on commit.
+    """
+    if not rows:
+        return WriteResult()
+
+    columns = ", ".join(JOB_LISTING_COPY_COLUMNS)
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    asyncpg_connection = raw_connection.driver_connection
+
+    # The staging table lives for the pooled connection and is emptied by
+    # every commit, so it is created once and reused by later batches.
+    await asyncpg_connection.execute(
+        f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} "
+        f"(LIKE {JobListing.__tablename__} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    )
+    await asyncpg_connection.copy_records_to_table(
+        STAGING_TABLE,
+        records=[__to_copy_record(row) for row in rows],
+        columns=JOB_LISTING_COPY_COLUMNS,
+    )
+    conflict_columns = ", ".join(JOB_LISTING_CONFLICT_COLUMNS)
+    rows = await asyncpg_connection.fetch(
+        f"INSERT INTO {JobListing.__tablename__} ({columns}) "
+        f"SELECT {columns} FROM {STAGING_TABLE} "
+        f"ON CONFLICT ({conflict_columns}) DO NOTHING "
+        f"RETURNING {conflict_columns}"
+    )
+    return WriteResult(inserted_keys={tuple(row) for row in rows})
+
+
+async def bulk_load_job_listings(
+    db: AsyncSession,
+    jobs: list[dict],
+) -> int:
+    logger.info(f"Bulk loading {len(jobs)} job listings...")
+    if not jobs:
+        return 0
+
+    await resolve_listing_keys(db, jobs)
+    rows = await store_job_descriptions(db, jobs)
+    write_result = await copy_job_listings(db, rows)
+    await db.commit()
+    inserted_count = len(write_result.inserted_keys)
+    logger.info(f"Job listings bulk loaded successfully, {inserted_count} new.")
     return inserted_count
@@ -0,0 +1,105 @@
+import re
+from datetime import date
+
+from sqlalchemy import text
+from config import logger
+from model.adzuna import JobListing, JobListingKey
+from sqlalchemy.ext.asyncio import AsyncSession
+
+PARTITIONED_TABLE = JobListing.__tablename__
+DEFAULT_PARTITION = f"{PARTITIONED_TABLE}_default"
+KEY_TABLE = JobListingKey.__tablename__
+# Generated columns can't be written, they are computed again on insert
+MOVED_COLUMNS = ", ".join(
+    column.name for column in JobListing.__table__.columns if column.computed is None
+)
+PARTITION_NAME = re.compile(rf"^{PARTITIONED_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITIONED_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+async def get_job_listing_partitions(db: AsyncSession) -> dict[date, str]:
+    stmt = text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = CAST(:parent AS regclass)"
+    )
+    result = await db.execute(stmt, {"parent": PARTITIONED_TABLE})
+    partitions = {}
+    for (name,) in result.all():
+        if match := PARTITION_NAME.match(name):
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+async def create_job_listing_partition(db: AsyncSession, month: date) -> None:
+    name = partition_name(month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    logger.info(f"Creating partition {name}...")
+    stray_rows = await db.execute(
+        text(
+            f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE job_created_at >= :start AND job_created_at < :end)"
+        ),
+        bounds,
+    )
+    if not stray_rows.scalar_one():
+        await db.execute(
+            text(
+                f"CREATE TABLE {name} PARTITION OF {PARTITIONED_TABLE} "
+                f"FOR VALUES FROM ('{month}') TO ('{bounds['end']}')"
+            )
+        )
+        return
+
+    # Rows for this month already landed in the default partition. Postgres
+    # refuses a new partition overlapping them, so move them in before
+    # attaching it.
+    await db.execute(
+        text(f"CREATE TABLE {name} (LIKE {PARTITIONED_TABLE} INCLUDING ALL)")
+    )
+    await db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE job_created_at >= :start AND job_created_at < :end "
+            f"RETURNING {MOVED_COLUMNS}) "
+            f"INSERT INTO {name} ({MOVED_COLUMNS}) SELECT {MOVED_COLUMNS} FROM moved"
+        ),
+        bounds,
+    )
+    await db.execute(
+        text(
+            f"ALTER TABLE {PARTITIONED_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{month}') TO ('{bounds['end']}')"
+        )
+    )
+
+
+async def retire_job_listing_partition(
+    db: AsyncSession, month: date, name: str, drop: bool
+) -> None:
+    logger.info(f"Detaching partition {name}...")
+    await db.execute(text(f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}"))
+    # A listing of this month seen again is stored as new, not pinned to a
+    # partition that is gone
+    await db.execute(
+        text(
+            f"DELETE FROM {KEY_TABLE} "
+            "WHERE job_created_at >= :start AND job_created_at < :end"
+        ),
+        {"start": month, "end": add_months(month, 1)},
+    )
+    if drop:
+        await db.execute(text(f"DROP TABLE {name}"))
+    else:
+        archive_name = (
+            f"{PARTITIONED_TABLE}_archive_y{month.year:04d}m{month.month:02d}"
+        )
+        await db.execute(text(f"ALTER TABLE {name} RENAME TO {archive_name}"))
@@ -0,0 +1,71 @@
+from datetime import date, datetime, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from config import logger
+from model.adzuna import ApiRequestLedger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+async def record_page_requests(
+    db: AsyncSession,
+    source: str,
+    country: str,
+    category: str,
+    pages: dict[int, tuple[int, int]],
+) -> None:
+    """Adds (calls, new_rows) per page depth to today's ledger rows."""
+    if not pages:
+        return
+    day = datetime.now(timezone.utc).date()
+    stmt = insert(ApiRequestLedger).values(
+        [
+            {
+                "source": source,
+                "country": country,
+                "category": category,
+                "page": page,
+                "day": day,
+                "calls": calls,
+                "new_rows": new_rows,
+            }
+            for page, (calls, new_rows) in sorted(pages.items())
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["source", "country", "category", "page", "day"],
+        set_={
+            "calls": ApiRequestLedger.calls + stmt.excluded.calls,
+            "new_rows": ApiRequestLedger.new_rows + stmt.excluded.new_rows,
+            "updated_at": func.now(),
+        },
+    )
+    await db.execute(stmt)
+    await db.commit()
+
+
+async def get_page_yields(
+    db: AsyncSession,
+    source: str,
+    since: date,
+) -> list[tuple[str, str, int, int, int, date]]:
+    """(country, category, page, calls, new_rows, last_day) since a day."""
+    logger.info(f"Fetching request ledger since {since}...")
+    stmt = (
+        select(
+            ApiRequestLedger.country,
+            ApiRequestLedger.category,
+            ApiRequestLedger.page,
+            func.sum(ApiRequestLedger.calls),
+            func.sum(ApiRequestLedger.new_rows),
+            func.max(ApiRequestLedger.day),
+        )
+        .where(ApiRequestLedger.source == source, ApiRequestLedger.day >= since)
+        .group_by(
+            ApiRequestLedger.country,
+            ApiRequestLedger.category,
+            ApiRequestLedger.page,
+        )
+    )
+    result = await db.execute(stmt)
+    return [tuple(row) for row in result.all()]
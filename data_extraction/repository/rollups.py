@@ -0,0 +1,138 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, select, text
+from config import logger
+from model.adzuna import JobListing, JobListingWeeklyStats
+from sqlalchemy.ext.asyncio import AsyncSession
+
+STATS_TABLE = JobListingWeeklyStats.__tablename__
+
+# location.area is [country, region, city, ...], the rollup is by region
+AREA_EXPRESSION = "coalesce(location_area ->> 1, '')"
+WEEK_EXPRESSION = "date_trunc('week', job_created_at AT TIME ZONE 'UTC')::date"
+
+
+def __changed_weeks(since: datetime | None) -> str:
+    """(source, category, week) with a listing written since, in any area."""
+    changed_since = "AND (created_at > :since OR updated_at > :since)" if since else ""
+    return f"""
+        SELECT DISTINCT source, category_id, {WEEK_EXPRESSION} AS week
+        FROM {JobListing.__tablename__}
+        WHERE category_id IS NOT NULL {changed_since}
+    """
+
+
+async def get_rollup_refreshed_at(db: AsyncSession) -> datetime | None:
+    stmt = select(func.max(JobListingWeeklyStats.refreshed_at))
+    return (await db.execute(stmt)).scalar_one()
+
+
+async def refresh_job_listing_weekly_stats(
+    db: AsyncSession, since: datetime | None
+) -> int:
+    """Recomputes the weekly stats of every group touched since `since`.
+
+    Percentiles can't be merged from partial results, so touched groups
+    are recomputed from their listings rather than adjusted. New postings
+    land in recent weeks, so that only reads the newest partitions.
+    Without `since` every group is rebuilt. Returns the groups written.
+    """
+    logger.info(f"Refreshing {STATS_TABLE} for listings written since {since}...")
+    params = {"since": since} if since else {}
+    # Upserts never change a listing's category or created date, but a new
+    # location moves it to another area. Only the new area is visible, so
+    # every area of a touched week is rebuilt, and the one it left is
+    # deleted here if no listing remains in it.
+    await db.execute(
+        text(
+            f"DELETE FROM {STATS_TABLE} s USING ({__changed_weeks(since)}) c "
+            "WHERE s.source = c.source AND s.category_id = c.category_id "
+            "AND s.week = c.week"
+        ),
+        params,
+    )
+    # Hash join against the changed groups. The lower job_created_at bound
+    # lets Postgres skip partitions older than the oldest changed week.
+    result = await db.execute(
+        text(
+            f"""
+            WITH changed AS MATERIALIZED ({__changed_weeks(since)})
+            INSERT INTO {STATS_TABLE} (
+                source, category_id, area, week, listings, salaried_listings,
+                avg_minimum_salary, avg_maximum_salary,
+                salary_p25, salary_p50, salary_p75, refreshed_at
+            )
+            SELECT l.source, l.category_id, l.area, l.week,
+                   count(*),
+                   count(l.salary),
+                   avg(l.minimum_salary),
+                   avg(l.maximum_salary),
+                   percentile_cont(0.25) WITHIN GROUP (ORDER BY l.salary),
+                   percentile_cont(0.5) WITHIN GROUP (ORDER BY l.salary),
+                   percentile_cont(0.75) WITHIN GROUP (ORDER BY l.salary),
+                   now()
+            FROM (
+                SELECT source, category_id, minimum_salary, maximum_salary,
+                       {AREA_EXPRESSION} AS area, {WEEK_EXPRESSION} AS week,
+                       (coalesce(minimum_salary, maximum_salary)
+                        + coalesce(maximum_salary, minimum_salary)) / 2 AS salary
+                FROM {JobListing.__tablename__}
+                WHERE category_id IS NOT NULL
+                  AND job_created_at >= (
+                      SELECT min(week) FROM changed
+                  )::timestamp AT TIME ZONE 'UTC'
+            ) l
+            JOIN changed c
+              ON l.source = c.source
+             AND l.category_id = c.category_id
+             AND l.week = c.week
+            GROUP BY l.source, l.category_id, l.area, l.week
+            """
+        ),
+        params,
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def get_weekly_job_stats(
+    db: AsyncSession,
+    category_id: int | None = None,
+    area: str | None = None,
+    week_from: date | None = None,
+    week_to: date | None = None,
+) -> list[JobListingWeeklyStats]:
+    stmt = select(JobListingWeeklyStats)
+    if category_id is not None:
+        stmt = stmt.where(JobListingWeeklyStats.category_id == category_id)
+    if area is not None:
+        stmt = stmt.where(JobListingWeeklyStats.area == area)
+    if week_from is not None:
+        stmt = stmt.where(JobListingWeeklyStats.week >= week_from)
+    if week_to is not None:
+        stmt = stmt.where(JobListingWeeklyStats.week <= week_to)
+    stmt = stmt.order_by(
+        JobListingWeeklyStats.week,
+        JobListingWeeklyStats.category_id,
+        JobListingWeeklyStats.area,
+    )
+    return list((await db.execute(stmt)).scalars().all())
+
+
+async def get_job_demand_by_area(
+    db: AsyncSession,
+    week_from: date,
+    week_to: date | None = None,
+    category_id: int | None = None,
+) -> list[tuple[str, int]]:
+    """Listings per area over a range of weeks, busiest area first."""
+    week_to = week_to or week_from + timedelta(days=6)
+    listings = func.sum(JobListingWeeklyStats.listings)
+    stmt = select(JobListingWeeklyStats.area, listings).where(
+        JobListingWeeklyStats.week >= week_from,
+        JobListingWeeklyStats.week <= week_to,
+    )
+    if category_id is not None:
+        stmt = stmt.where(JobListingWeeklyStats.category_id == category_id)
+    stmt = stmt.group_by(JobListingWeeklyStats.area).order_by(listings.desc())
+    return [tuple(row) for row in (await db.execute(stmt)).all()]
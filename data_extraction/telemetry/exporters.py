@@ -0,0 +1,173 @@
+"""Writes the process's metrics out when a task finishes.
+
+- Prometheus textfile, for node_exporter's textfile collector
+- StatsD over UDP, sent as observations happen, in batched packets
+- A JSON summary per run, with stage latency quantiles and row counts
+"""
+
+import json
+import math
+import os
+import socket
+from datetime import datetime, timezone
+from pathlib import Path
+
+from config import config, logger
+from telemetry.metrics import Labels, registry
+
+# Keeps each StatsD datagram under a typical MTU
+STATSD_MAX_PACKET_BYTES = 1400
+
+
+class StatsdSink:
+    def __init__(self, host: str, port: int, prefix: str):
+        self.address = (host, port)
+        self.prefix = prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.buffer: list[bytes] = []
+        self.buffered_bytes = 0
+
+    def __metric_name(self, name: str, labels: Labels) -> str:
+        # Plain StatsD has no tags, label values become name segments
+        return ".".join([self.prefix, name, *(value for _, value in labels)])
+
+    def __send(self, line: str) -> None:
+        encoded = line.encode("utf-8")
+        if self.buffered_bytes + len(encoded) + 1 > STATSD_MAX_PACKET_BYTES:
+            self.flush()
+        self.buffer.append(encoded)
+        self.buffered_bytes += len(encoded) + 1
+
+    def count(self, name: str, amount: float, labels: Labels) -> None:
+        self.__send(f"{self.__metric_name(name, labels)}:{amount:g}|c")
+
+    def timing(self, name: str, seconds: float, labels: Labels) -> None:
+        self.__send(f"{self.__metric_name(name, labels)}:{seconds * 1000:.3f}|ms")
+
+    def flush(self) -> None:
+        if not self.buffer:
+            return
+        try:
+            self.socket.sendto(b"\n".join(self.buffer), self.address)
+        except OSError as e:
+            # Metrics must never fail the task they measure
+            logger.warning(f"Dropped StatsD packet: {e!r}")
+        self.buffer.clear()
+        self.buffered_bytes = 0
+
+
+def configure_statsd() -> None:
+    if config.METRICS_STATSD_HOST and registry.sink is None:
+        registry.sink = StatsdSink(
+            config.METRICS_STATSD_HOST,
+            config.METRICS_STATSD_PORT,
+            config.METRICS_STATSD_PREFIX,
+        )
+
+
+def __escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def __prometheus_labels(labels: Labels, extra: dict[str, str]) -> str:
+    items = [*extra.items(), *labels]
+    if not items:
+        return ""
+    pairs = (f'{key}="{__escape_label_value(value)}"' for key, value in items)
+    return "{" + ",".join(pairs) + "}"
+
+
+def prometheus_text(extra_labels: dict[str, str]) -> str:
+    lines = []
+    for name in sorted({counter.name for counter in registry.counters.values()}):
+        lines.append(f"# TYPE {name} counter")
+        for counter in registry.counters.values():
+            if counter.name == name:
+                labels = __prometheus_labels(counter.labels, extra_labels)
+                lines.append(f"{name}{labels} {counter.value:g}")
+    for name in sorted({histogram.name for histogram in registry.histograms.values()}):
+        lines.append(f"# TYPE {name} histogram")
+        for histogram in registry.histograms.values():
+            if histogram.name != name:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(
+                [*histogram.buckets, math.inf], histogram.bucket_counts
+            ):
+                cumulative += bucket_count
+                le = "+Inf" if bound == math.inf else f"{bound:g}"
+                labels = __prometheus_labels(
+                    histogram.labels, {**extra_labels, "le": le}
+                )
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = __prometheus_labels(histogram.labels, extra_labels)
+            lines.append(f"{name}_sum{labels} {histogram.sum:g}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+def __write_atomic(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.parent / f".{path.name}.tmp"
+    tmp_path.write_text(content, encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def run_summary(run_label: str) -> dict:
+    finished_at = datetime.now(timezone.utc)
+    started_at = datetime.fromtimestamp(registry.started_at, timezone.utc)
+
+    def key(name: str, labels: Labels) -> str:
+        return name + "".join(f"[{k}={v}]" for k, v in labels)
+
+    return {
+        "run": run_label,
+        "started_at": started_at.isoformat(),
+        "finished_at": finished_at.isoformat(),
+        "seconds": round((finished_at - started_at).total_seconds(), 3),
+        "counters": {
+            key(counter.name, counter.labels): counter.value
+            for counter in registry.counters.values()
+        },
+        "stages": {
+            key(histogram.name, histogram.labels): {
+                "count": histogram.count,
+                "total_seconds": round(histogram.sum, 4),
+                "mean_seconds": round(histogram.sum / histogram.count, 6),
+                "p50_seconds": histogram.quantile(0.5),
+                "p95_seconds": histogram.quantile(0.95),
+                "p99_seconds": histogram.quantile(0.99),
+            }
+            for histogram in registry.histograms.values()
+            if histogram.count
+        },
+    }
+
+
+def export_metrics(run_label: str) -> dict | None:
+    """Flushes every configured exporter, returns the run summary."""
+    if not config.METRICS_ENABLED:
+        return None
+    if registry.sink is not None:
+        registry.sink.flush()
+
+    summary = run_summary(run_label)
+    stage_seconds = ", ".join(
+        f"{name} {stage['total_seconds']}s" for name, stage in summary["stages"].items()
+    )
+    logger.info(f"Run {run_label} took {summary['seconds']}s: {stage_seconds}")
+
+    if config.METRICS_SUMMARY_DIR:
+        file_name = f"{run_label}-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.json"
+        __write_atomic(
+            Path(config.METRICS_SUMMARY_DIR) / file_name,
+            json.dumps(summary, indent=2),
+        )
+    if config.METRICS_TEXTFILE_DIR:
+        # One file per task, the textfile collector merges them
+        __write_atomic(
+            Path(config.METRICS_TEXTFILE_DIR) / f"{run_label}.prom",
+            prometheus_text({"task": run_label}),
+        )
+    return summary
@@ -0,0 +1,149 @@
+"""In-process counters and latency histograms for the ingestion hot path.
+
+Everything is plain Python arithmetic on objects looked up in a dict, a
+few hundred nanoseconds per call, so it stays on in production. Metrics
+live for the process and telemetry.exporters writes them out when a task
+finishes.
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import wraps
+
+from config import config
+
+# Seconds, from a fast DB round trip to a throttled HTTP request
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Counter:
+    __slots__ = ("name", "labels", "value")
+
+    def __init__(self, name: str, labels: Labels):
+        self.name = name
+        self.labels = labels
+        self.value = 0.0
+
+
+class Histogram:
+    __slots__ = ("name", "labels", "buckets", "bucket_counts", "count", "sum")
+
+    def __init__(self, name: str, labels: Labels, buckets: tuple[float, ...]):
+        self.name = name
+        self.labels = labels
+        self.buckets = buckets
+        # The last slot counts observations above the largest bucket
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.counters: dict[tuple[str, Labels], Counter] = {}
+        self.histograms: dict[tuple[str, Labels], Histogram] = {}
+        self.started_at = time.time()
+        # Set by telemetry.exporters when StatsD is configured
+        self.sink = None
+
+    def counter(self, name: str, labels: Labels = ()) -> Counter:
+        key = (name, labels)
+        counter = self.counters.get(key)
+        if counter is None:
+            counter = self.counters[key] = Counter(name, labels)
+        return counter
+
+    def histogram(self, name: str, labels: Labels = ()) -> Histogram:
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(name, labels, LATENCY_BUCKETS)
+        return histogram
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.histograms.clear()
+        self.started_at = time.time()
+
+
+registry = MetricsRegistry()
+
+
+def inc(name: str, amount: float = 1, **labels: str) -> None:
+    if not config.METRICS_ENABLED:
+        return
+    label_items = tuple(sorted(labels.items()))
+    registry.counter(name, label_items).value += amount
+    if registry.sink is not None:
+        registry.sink.count(name, amount, label_items)
+
+
+def observe(name: str, seconds: float, **labels: str) -> None:
+    if not config.METRICS_ENABLED:
+        return
+    label_items = tuple(sorted(labels.items()))
+    registry.histogram(name, label_items).observe(seconds)
+    if registry.sink is not None:
+        registry.sink.timing(name, seconds, label_items)
+
+
+@contextmanager
+def timed(name: str, **labels: str) -> Iterator[None]:
+    """Observes how long the block takes, failures included."""
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - started_at, **labels)
+
+
+def timed_coroutine(name: str, **labels: str):
+    """Decorator form of `timed` for async functions."""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with timed(name, **labels):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
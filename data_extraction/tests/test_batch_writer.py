@@ -0,0 +1,217 @@
+import asyncio
+import contextlib
+from datetime import datetime, timezone
+
+import pytest
+
+from api.adzuna import batch_writer
+from api.adzuna.batch_writer import BatchWriter, PageCheckpoint, PendingPage
+from config import config
+from repository.checkpoints import ShardProgress
+from repository.jobs import WriteResult, job_listing_key
+
+CREATED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def job(job_id: str) -> dict:
+    return {
+        "source": "adzuna",
+        "job_id": job_id,
+        "job_created_at": CREATED_AT,
+        "job_title": "Data Engineer",
+        "job_description": "Pipelines",
+    }
+
+
+class FakeSession:
+    def __init__(self):
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def groups(monkeypatch):
+    """Every group the writer writes, as lists of page job IDs."""
+    groups = []
+
+    @contextlib.asynccontextmanager
+    async def session():
+        yield FakeSession()
+
+    async def write_job_batch(db, pages):
+        groups.append([[job["job_id"] for job in page.jobs] for page in pages])
+        return [len(page.jobs) for page in pages]
+
+    monkeypatch.setattr(batch_writer, "get_db_session", session)
+    monkeypatch.setattr(batch_writer, "write_job_batch", write_job_batch)
+    monkeypatch.setattr(config, "JOB_WRITER_QUEUE_PAGES", 32)
+    monkeypatch.setattr(config, "JOB_WRITER_BATCH_ROWS", 1_000)
+    monkeypatch.setattr(config, "JOB_WRITER_BATCH_MB", 8)
+    monkeypatch.setattr(config, "JOB_WRITER_FLUSH_MS", 10_000)
+    return groups
+
+
+async def submit_all(pages: list[list[dict]]) -> list[int]:
+    async with BatchWriter() as writer:
+        futures = [await writer.submit(jobs) for jobs in pages]
+        # Well before JOB_WRITER_FLUSH_MS unless a limit flushed them
+        return await asyncio.wait_for(asyncio.gather(*futures), 1)
+
+
+def test_group_is_flushed_once_it_reaches_the_row_limit(groups, monkeypatch):
+    monkeypatch.setattr(config, "JOB_WRITER_BATCH_ROWS", 3)
+
+    inserted = asyncio.run(
+        submit_all([[job("1"), job("2")], [job("3")], [job("4"), job("5"), job("6")]])
+    )
+
+    assert inserted == [2, 1, 3]
+    assert groups == [[["1", "2"], ["3"]], [["4", "5", "6"]]]
+
+
+def test_group_is_flushed_once_it_reaches_the_size_limit(groups, monkeypatch):
+    # Less than two listings
+    monkeypatch.setattr(config, "JOB_WRITER_BATCH_MB", 300 / 2**20)
+
+    asyncio.run(submit_all([[job("1"), job("2")], [job("3"), job("4")]]))
+
+    assert groups == [[["1", "2"]], [["3", "4"]]]
+
+
+def test_group_is_flushed_after_the_flush_interval(groups, monkeypatch):
+    monkeypatch.setattr(config, "JOB_WRITER_FLUSH_MS", 20)
+
+    async def submit_and_wait():
+        async with BatchWriter() as writer:
+            first = await writer.submit([job("1")])
+            second = await writer.submit([job("2")])
+            inserted = await asyncio.wait_for(asyncio.gather(first, second), 1)
+            third = await writer.submit([job("3")])
+            return inserted + [await asyncio.wait_for(third, 1)]
+
+    inserted = asyncio.run(submit_and_wait())
+
+    assert inserted == [1, 1, 1]
+    # Pages that arrive within the interval share a commit
+    assert groups == [[["1"], ["2"]], [["3"]]]
+
+
+def test_failed_group_fails_every_queued_page(groups, monkeypatch):
+    monkeypatch.setattr(config, "JOB_WRITER_BATCH_ROWS", 1)
+
+    async def run():
+        failing = asyncio.Event()
+
+        async def write_job_batch(db, pages):
+            await failing.wait()
+            raise RuntimeError("connection lost")
+
+        monkeypatch.setattr(batch_writer, "write_job_batch", write_job_batch)
+        futures = []
+        with pytest.raises(RuntimeError):
+            async with BatchWriter() as writer:
+                for job_id in ("1", "2", "3"):
+                    futures.append(await writer.submit([job(job_id)]))
+                failing.set()
+        return futures
+
+    futures = asyncio.run(run())
+
+    assert all(isinstance(future.exception(), RuntimeError) for future in futures)
+
+
+def test_empty_page_resolves_without_a_write(groups):
+    inserted = asyncio.run(submit_all([[]]))
+
+    assert inserted == [0]
+    assert groups == []
+
+
+def test_empty_page_with_a_checkpoint_is_still_written(groups):
+    progress = ShardProgress("run-1", "adzuna", "gb", "it-jobs")
+
+    async def submit():
+        async with BatchWriter() as writer:
+            inserted = await writer.submit(
+                [], PageCheckpoint(progress, 3, CREATED_AT, True)
+            )
+        return await inserted
+
+    assert asyncio.run(submit()) == 0
+    assert groups == [[[]]]
+
+
+def test_group_of_only_checkpoints_writes_no_listings(monkeypatch):
+    checkpoints = []
+
+    async def fail(db, jobs):
+        raise AssertionError("no listings to write")
+
+    async def save_checkpoints(db, rows):
+        checkpoints.extend(rows)
+
+    monkeypatch.setattr(batch_writer, "resolve_listing_keys", fail)
+    monkeypatch.setattr(batch_writer, "store_job_descriptions", fail)
+    monkeypatch.setattr(batch_writer, "save_checkpoints", save_checkpoints)
+    progress = ShardProgress("run-1", "adzuna", "gb", "it-jobs", 2, 80)
+    page = PendingPage([], 0, None, PageCheckpoint(progress, 3, CREATED_AT, True))
+    db = FakeSession()
+
+    inserted = asyncio.run(batch_writer.write_job_batch(db, [page]))
+
+    assert inserted == [0]
+    assert [
+        (row["page"], row["total_new_rows"], row["stopped"]) for row in checkpoints
+    ] == [(3, 80, True)]
+    assert db.commits == 1
+
+
+def test_listing_on_two_pages_of_a_group_counts_once(monkeypatch):
+    written = []
+    checkpoints = []
+
+    async def resolve_listing_keys(db, jobs):
+        pass
+
+    async def store_job_descriptions(db, jobs):
+        return jobs
+
+    async def insert_job_listings(db, rows):
+        written.append(len(rows))
+        return WriteResult(inserted_keys={job_listing_key(row) for row in rows})
+
+    async def save_checkpoints(db, rows):
+        checkpoints.extend(rows)
+
+    monkeypatch.setattr(batch_writer, "resolve_listing_keys", resolve_listing_keys)
+    monkeypatch.setattr(batch_writer, "store_job_descriptions", store_job_descriptions)
+    monkeypatch.setattr(batch_writer, "insert_job_listings", insert_job_listings)
+    monkeypatch.setattr(batch_writer, "save_checkpoints", save_checkpoints)
+    monkeypatch.setattr(config, "JOB_LISTING_LOAD_METHOD", "insert")
+    progress = ShardProgress("run-1", "adzuna", "gb", "it-jobs")
+    pages = [
+        PendingPage(
+            jobs,
+            batch_writer.estimated_size(jobs),
+            None,
+            PageCheckpoint(progress, page, CREATED_AT, False),
+        )
+        for page, jobs in enumerate(
+            [[job("1"), job("2")], [job("2"), job("3")]], start=1
+        )
+    ]
+    db = FakeSession()
+
+    inserted = asyncio.run(batch_writer.write_job_batch(db, pages))
+
+    # Both pages carry listing 2, the first one claims it
+    assert inserted == [2, 1]
+    assert written == [4]
+    assert [row["total_new_rows"] for row in checkpoints] == [2, 3]
+    assert db.commits == 1
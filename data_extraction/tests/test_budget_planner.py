@@ -0,0 +1,94 @@
+from datetime import date
+
+import pytest
+
+from api.adzuna.budget_planner import ShardHistory, allocate_pages, expected_yields
+from api.adzuna.shards import Shard
+from config import config
+
+A = Shard("gb", "a-jobs")
+B = Shard("gb", "b-jobs")
+C = Shard("gb", "c-jobs")
+
+
+@pytest.fixture(autouse=True)
+def planner_config(monkeypatch):
+    monkeypatch.setattr(config, "ADZUNA_RESULTS_PER_PAGE", 50)
+    monkeypatch.setattr(config, "ADZUNA_PLANNER_MIN_PAGES", 1)
+    monkeypatch.setattr(config, "ADZUNA_PLANNER_MAX_PAGES", 5)
+    monkeypatch.setattr(config, "ADZUNA_PLANNER_MIN_YIELD", 1)
+    monkeypatch.setattr(config, "ADZUNA_PLANNER_PRIOR_CALLS", 2)
+
+
+def test_expected_yields_start_at_a_full_page_without_history():
+    assert expected_yields(ShardHistory(), {}, 3) == [50.0, 50.0, 50.0]
+
+
+def test_expected_yields_blend_history_with_the_prior():
+    history = ShardHistory(pages={1: (1, 5)})
+
+    yields = expected_yields(history, {1: 20.0}, 1)
+
+    # (5 new rows + 2 prior calls * 20) / (1 call + 2 prior calls)
+    assert yields == [pytest.approx(15.0)]
+
+
+def test_expected_yields_never_grow_with_depth():
+    history = ShardHistory(pages={1: (4, 40), 2: (4, 0), 3: (4, 160)})
+    priors = {1: 10.0, 2: 0.0, 3: 40.0}
+
+    yields = expected_yields(history, priors, 4)
+
+    assert yields == sorted(yields, reverse=True)
+    assert yields[2] == yields[1]
+
+
+def test_probes_least_recently_called_shards_when_budget_is_short():
+    histories = {
+        A.key: ShardHistory(pages={1: (1, 50)}, last_called_on=date(2026, 4, 2)),
+        B.key: ShardHistory(pages={1: (1, 50)}, last_called_on=date(2026, 4, 1)),
+    }
+
+    plan = allocate_pages([A, B, C], histories, 2)
+
+    # C was never called, B longer ago than A
+    assert plan == {A.key: 0, B.key: 1, C.key: 1}
+
+
+def test_min_pages_zero_only_spends_on_expected_yield(monkeypatch):
+    monkeypatch.setattr(config, "ADZUNA_PLANNER_MIN_PAGES", 0)
+    histories = {
+        A.key: ShardHistory(pages={1: (20, 1000)}),
+        B.key: ShardHistory(pages={1: (20, 0)}),
+    }
+
+    plan = allocate_pages([A, B], histories, 3)
+
+    assert plan == {A.key: 3, B.key: 0}
+
+
+def test_pages_are_capped_at_max_pages():
+    plan = allocate_pages([A], {}, 100)
+
+    assert plan == {A.key: 5}
+
+
+def test_pages_below_the_yield_floor_are_not_planned(monkeypatch):
+    monkeypatch.setattr(config, "ADZUNA_PLANNER_MIN_YIELD", 10)
+    histories = {A.key: ShardHistory(pages={page: (20, 0) for page in range(1, 6)})}
+
+    plan = allocate_pages([A], histories, 100)
+
+    # The probe is still spent, nothing after it
+    assert plan == {A.key: 1}
+
+
+def test_catching_up_shards_get_max_pages_first():
+    histories = {
+        A.key: ShardHistory(pages={1: (20, 1000)}),
+        B.key: ShardHistory(pages={1: (20, 0)}, catching_up=True),
+    }
+
+    plan = allocate_pages([A, B], histories, 6)
+
+    assert plan == {A.key: 1, B.key: 5}
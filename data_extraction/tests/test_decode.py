@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+
+import msgspec
+import pytest
+
+from api.adzuna.decode import decode_job, decode_job_page, job_listing_row
+
+PAGE = b"""{
+    "count": 2,
+    "results": [
+        {
+            "id": "4321",
+            "title": "Data Engineer",
+            "description": "Pipelines and warehouses",
+            "redirect_url": "https://www.adzuna.co.uk/jobs/land/ad/4321",
+            "created": "2026-01-01T10:00:00Z",
+            "salary_min": 40000,
+            "salary_max": 52500.5,
+            "location": {"area": ["UK", "London"], "display_name": "London"},
+            "company": {"display_name": "Company 001"},
+            "category": {"tag": "it-jobs"}
+        },
+        {"title": "No id"}
+    ]
+}"""
+
+
+def test_page_is_decoded_without_its_jobs():
+    page = decode_job_page(PAGE)
+
+    assert page.count == 2
+    assert all(isinstance(job, msgspec.Raw) for job in page.results)
+
+
+def test_job_fields_are_decoded_and_salaries_kept_as_sent():
+    job = decode_job(decode_job_page(PAGE).results[0])
+
+    assert job.id == "4321"
+    assert job.created == datetime(2026, 1, 1, 10, tzinfo=timezone.utc)
+    # An int stays an int, so content hashes match listings from plain JSON
+    assert job.salary_min == 40000 and isinstance(job.salary_min, int)
+    assert job.salary_max == 52500.5
+    assert job.location == {"area": ["UK", "London"], "display_name": "London"}
+
+
+def test_salaries_sent_as_strings_are_accepted():
+    job = decode_job(msgspec.Raw(b'{"id": "1", "salary_min": "25000"}'))
+
+    assert job.salary_min == 25000
+
+
+def test_invalid_job_fails_on_its_own():
+    page = decode_job_page(PAGE)
+
+    with pytest.raises(msgspec.ValidationError):
+        decode_job(page.results[1])
+    assert decode_job(page.results[0]).id == "4321"
+
+
+def test_job_listing_row_maps_the_stored_columns():
+    job = decode_job(decode_job_page(PAGE).results[0])
+
+    row = job_listing_row(job, "adzuna", "gb", 7)
+
+    assert row == {
+        "source": "adzuna",
+        "job_id": "4321",
+        "country": "gb",
+        "minimum_salary": 40000,
+        "maximum_salary": 52500.5,
+        "job_post_url": "https://www.adzuna.co.uk/jobs/land/ad/4321",
+        "location": {"area": ["UK", "London"], "display_name": "London"},
+        "job_title": "Data Engineer",
+        "job_created_at": datetime(2026, 1, 1, 10, tzinfo=timezone.utc),
+        "job_description": "Pipelines and warehouses",
+        "company": {"display_name": "Company 001"},
+        "category_id": 7,
+    }
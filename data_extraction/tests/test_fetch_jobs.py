@@ -0,0 +1,221 @@
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+import pytest
+
+import api.http_client as http_client
+from api.adzuna import batch_writer, fetch_jobs
+from api.adzuna.known_ids import KnownJobIds
+from benchmarks.adzuna_simulator import SimulatorServer, SimulatorSettings
+from config import config
+from repository.jobs import job_listing_key
+
+SHARD_KEY = "gb/sim-00-jobs"
+
+
+class FakeDatabase:
+    """Stands in for the tables a shard walk reads and writes."""
+
+    def __init__(self):
+        self.keys = set()
+        self.state = None
+        self.ledger = {}
+        # Pages whose checkpoint was written, per run
+        self.checkpoints = []
+
+    @contextlib.asynccontextmanager
+    async def session(self):
+        yield self
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+    async def write_job_batch(self, db, pages):
+        inserted = []
+        for page in pages:
+            if page.checkpoint is not None:
+                self.checkpoints[-1].append(page.checkpoint.page)
+            new_keys = {job_listing_key(job) for job in page.jobs} - self.keys
+            self.keys.update(new_keys)
+            inserted.append(len(new_keys))
+        return inserted
+
+    async def known_job_ids(self, db, category_id, created_since=None):
+        return KnownJobIds({job_id: None for _, job_id, _ in self.keys}, False)
+
+    async def category_ids(self, db):
+        return {("gb", "sim-00-jobs"): 1}
+
+    async def get_ingestion_state(self, db, source, country, category):
+        return self.state
+
+    async def update_watermark(
+        self,
+        db,
+        source,
+        country,
+        category,
+        latest_job_created_at,
+        walk_incomplete=False,
+        resume_page=None,
+        resume_before=None,
+    ):
+        watermarks = [
+            created_at
+            for created_at in (
+                self.state and self.state.latest_job_created_at,
+                latest_job_created_at,
+            )
+            if created_at is not None
+        ]
+        self.state = SimpleNamespace(
+            latest_job_created_at=max(watermarks, default=None),
+            walk_incomplete=walk_incomplete,
+            resume_page=resume_page,
+            resume_before=resume_before,
+        )
+
+    async def get_latest_checkpoint(self, db, dag_run_id, source, country, category):
+        self.checkpoints.append([])
+        return None
+
+    async def finish_checkpoint(self, db, progress, newest_job_created_at):
+        pass
+
+    async def delete_checkpoints_before(self, db, before):
+        return 0
+
+    async def record_page_requests(self, db, source, country, category, pages):
+        self.ledger = pages
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    for module in (fetch_jobs, batch_writer):
+        monkeypatch.setattr(module, "get_db_session", database.session)
+    monkeypatch.setattr(batch_writer, "write_job_batch", database.write_job_batch)
+    monkeypatch.setattr(
+        fetch_jobs, "get_category_id_by_country_and_tag", database.category_ids
+    )
+    monkeypatch.setattr(fetch_jobs, "load_known_job_ids", database.known_job_ids)
+    for name in (
+        "get_ingestion_state",
+        "update_watermark",
+        "record_page_requests",
+        "get_latest_checkpoint",
+        "finish_checkpoint",
+        "delete_checkpoints_before",
+    ):
+        monkeypatch.setattr(fetch_jobs, name, getattr(database, name))
+
+    monkeypatch.setattr(config, "ENVIRONMENT", "test")
+    monkeypatch.setattr(config, "ADZUNA_INCREMENTAL", True)
+    monkeypatch.setattr(config, "ADZUNA_INITIAL_MAX_DAYS_OLD", 0)
+    monkeypatch.setattr(config, "ADZUNA_RESULTS_PER_PAGE", 50)
+    monkeypatch.setattr(config, "ADZUNA_PAGE_WINDOW", 2)
+    monkeypatch.setattr(config, "ADZUNA_RESUME_OVERLAP_PAGES", 1)
+    monkeypatch.setattr(config, "ADZUNA_REQUESTS_PER_MINUTE", 60_000)
+    monkeypatch.setattr(config, "ADZUNA_REQUEST_BURST", 1_000)
+    monkeypatch.setattr(config, "HTTP_CACHE_ENABLED", False)
+    monkeypatch.setattr(config, "KNOWN_JOB_ID_FILTER", False)
+    monkeypatch.setattr(config, "LANDING_ZONE_ENABLED", False)
+    monkeypatch.setattr(config, "INGESTION_CHECKPOINTS_ENABLED", False)
+    return database
+
+
+def test_catch_up_deeper_than_the_page_limit_resumes_where_it_stopped(
+    database, monkeypatch
+):
+    # 20 pages of 50, walked 6 calls a run
+    settings = SimulatorSettings(
+        categories=1, jobs_per_category=1_000, latency_ms=0, latency_jitter_ms=0
+    )
+    runs = []
+
+    async def run_until_caught_up():
+        for _ in range(6):
+            await fetch_jobs.fetch_jobs_by_shard(
+                [SHARD_KEY], page_limits={SHARD_KEY: 6}
+            )
+            runs.append((dict(database.ledger), database.state))
+            if not database.state.walk_incomplete:
+                break
+        await http_client.close_http_client()
+
+    with SimulatorServer(settings) as server:
+        monkeypatch.setattr(config, "ADZUNA_BASE_URL", server.base_url)
+        asyncio.run(run_until_caught_up())
+
+    assert len(database.keys) == 1_000
+    assert [sorted(ledger) for ledger, _ in runs] == [
+        [1, 2, 3, 4, 5, 6],
+        [6, 7, 8, 9, 10, 11],
+        [11, 12, 13, 14, 15, 16],
+        [16, 17, 18, 19, 20, 21],
+    ]
+    assert [state.resume_page for _, state in runs] == [6, 11, 16, None]
+    assert all(sum(calls for calls, _ in ledger.values()) <= 6 for ledger, _ in runs)
+    final_state = runs[-1][1]
+    assert not final_state.walk_incomplete
+    assert final_state.latest_job_created_at is not None
+
+
+@pytest.mark.parametrize(
+    ("window", "expected_ledger"),
+    [
+        # Stops on the known page before requesting another
+        (1, {1: (1, 0)}),
+        # Page 2 was already requested alongside page 1 and still counts
+        (2, {1: (1, 0), 2: (1, 0)}),
+    ],
+)
+def test_page_of_only_known_jobs_ends_the_walk_without_another_call(
+    database, monkeypatch, window, expected_ledger
+):
+    settings = SimulatorSettings(
+        categories=1, jobs_per_category=150, latency_ms=0, latency_jitter_ms=0
+    )
+    monkeypatch.setattr(config, "KNOWN_JOB_ID_FILTER", True)
+    monkeypatch.setattr(config, "JOB_LISTING_LOAD_METHOD", "insert")
+    monkeypatch.setattr(config, "ADZUNA_PAGE_WINDOW", window)
+
+    async def run_twice():
+        await fetch_jobs.fetch_jobs_by_shard([SHARD_KEY])
+        await fetch_jobs.fetch_jobs_by_shard([SHARD_KEY])
+        await http_client.close_http_client()
+
+    with SimulatorServer(settings) as server:
+        monkeypatch.setattr(config, "ADZUNA_BASE_URL", server.base_url)
+        asyncio.run(run_twice())
+
+    assert len(database.keys) == 150
+    assert database.ledger == expected_ledger
+    assert not database.state.walk_incomplete
+
+
+def test_page_of_only_known_jobs_still_saves_its_checkpoint(database, monkeypatch):
+    settings = SimulatorSettings(
+        categories=1, jobs_per_category=150, latency_ms=0, latency_jitter_ms=0
+    )
+    monkeypatch.setattr(config, "KNOWN_JOB_ID_FILTER", True)
+    monkeypatch.setattr(config, "JOB_LISTING_LOAD_METHOD", "insert")
+    monkeypatch.setattr(config, "INGESTION_CHECKPOINTS_ENABLED", True)
+    monkeypatch.setattr(config, "ADZUNA_PAGE_WINDOW", 1)
+
+    async def run_twice():
+        await fetch_jobs.fetch_jobs_by_shard([SHARD_KEY], dag_run_id="run-1")
+        await fetch_jobs.fetch_jobs_by_shard([SHARD_KEY], dag_run_id="run-2")
+        await http_client.close_http_client()
+
+    with SimulatorServer(settings) as server:
+        monkeypatch.setattr(config, "ADZUNA_BASE_URL", server.base_url)
+        asyncio.run(run_twice())
+
+    # Page 4 is past the end of the results, nothing to checkpoint
+    assert database.checkpoints == [[1, 2, 3], [1]]
+    assert database.ledger == {1: (1, 0)}
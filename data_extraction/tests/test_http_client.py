@@ -0,0 +1,131 @@
+import asyncio
+
+import httpx
+import pytest
+
+from api import http_cache, http_client
+from config import config
+
+URL = "https://api.example.com/v1/api/jobs/gb/search/1"
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Serves the queued responses in order and records every request."""
+    responses = []
+    requests = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handle))
+    monkeypatch.setattr(http_client, "get_http_client", lambda: client)
+    monkeypatch.setattr(config, "HTTP_MAX_RETRIES", 3)
+    monkeypatch.setattr(config, "HTTP_BACKOFF_BASE_SECONDS", 0)
+    monkeypatch.setattr(config, "ADZUNA_REQUESTS_PER_MINUTE", 60_000)
+    monkeypatch.setattr(config, "ADZUNA_MIN_REQUESTS_PER_MINUTE", 600)
+    monkeypatch.setattr(config, "ADZUNA_REQUEST_BURST", 1_000)
+    monkeypatch.setattr(config, "ADZUNA_MAX_ACTIVE_FETCH_TASKS", 1)
+    monkeypatch.setattr(config, "HTTP_CACHE_ENABLED", False)
+    return responses, requests
+
+
+def test_server_errors_are_retried(server):
+    responses, requests = server
+    responses.extend(
+        [httpx.Response(503), httpx.Response(502), httpx.Response(200, json={})]
+    )
+
+    response = asyncio.run(http_client.get_with_retry(URL))
+
+    assert response.status_code == 200
+    assert len(requests) == 3
+
+
+def test_client_errors_are_not_retried(server):
+    responses, requests = server
+    responses.append(httpx.Response(404))
+
+    response = asyncio.run(http_client.get_with_retry(URL))
+
+    assert response.status_code == 404
+    assert len(requests) == 1
+
+
+def test_throttling_halves_the_rate_and_success_grows_it_back(server):
+    responses, _ = server
+    responses.extend(
+        [
+            httpx.Response(429, headers={"retry-after": "0"}),
+            httpx.Response(200, json={}),
+        ]
+    )
+
+    async def get():
+        await http_client.get_with_retry(URL)
+        return http_client.get_rate_limiter()
+
+    limiter = asyncio.run(get())
+
+    # Halved to 30000/min, then a twentieth of 60000/min added back
+    assert limiter.rate * 60 == pytest.approx(33_000)
+
+
+def test_throttling_that_outlasts_the_retries_fails(server):
+    responses, requests = server
+    responses.append(httpx.Response(429, headers={"retry-after": "0"}))
+
+    with pytest.raises(http_client.RateLimitError):
+        asyncio.run(http_client.get_with_retry(URL))
+    assert len(requests) == config.HTTP_MAX_RETRIES + 1
+
+
+def test_cached_response_is_revalidated_with_its_etag(server, monkeypatch, tmp_path):
+    responses, requests = server
+    monkeypatch.setattr(config, "HTTP_CACHE_ENABLED", True)
+    monkeypatch.setattr(config, "HTTP_CACHE_PATH", str(tmp_path))
+    responses.extend(
+        [
+            httpx.Response(200, headers={"etag": '"v1"'}, content=b'{"results": []}'),
+            httpx.Response(304),
+        ]
+    )
+    params = {"app_id": "id", "app_key": "secret-app-key", "category": "it-jobs"}
+
+    async def get_twice():
+        # A TTL of 0 is never fresh, the second call has to revalidate
+        first = await http_client.get_with_retry(URL, params, cache_ttl=0)
+        second = await http_client.get_with_retry(URL, params, cache_ttl=0)
+        return first, second
+
+    first, second = asyncio.run(get_twice())
+
+    assert first.extensions[http_cache.CACHE_STATUS] == "stored"
+    assert "if-none-match" not in requests[0].headers
+    assert requests[1].headers["if-none-match"] == '"v1"'
+    assert second.status_code == 200
+    assert second.content == b'{"results": []}'
+    assert http_cache.is_unchanged(second)
+    # Credentials are left out of the cache key and never written to disk
+    entries = list(tmp_path.rglob("*.entry"))
+    assert len(entries) == 1
+    assert b"secret-app-key" not in entries[0].read_bytes()
+
+
+def test_fresh_cached_response_is_served_without_a_request(
+    server, monkeypatch, tmp_path
+):
+    responses, requests = server
+    monkeypatch.setattr(config, "HTTP_CACHE_ENABLED", True)
+    monkeypatch.setattr(config, "HTTP_CACHE_PATH", str(tmp_path))
+    responses.append(httpx.Response(200, content=b"{}"))
+
+    async def get_twice():
+        await http_client.get_with_retry(URL, cache_ttl=60)
+        return await http_client.get_with_retry(URL, cache_ttl=60)
+
+    response = asyncio.run(get_twice())
+
+    assert len(requests) == 1
+    assert response.extensions[http_cache.CACHE_STATUS] == "fresh"
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+from api.rate_limiter import TokenBucket, per_minute_bucket
+
+
+def test_decrease_halves_the_rate_down_to_the_floor():
+    bucket = TokenBucket(rate=10, capacity=5, min_rate=3)
+
+    bucket.decrease()
+    assert bucket.rate == 5
+    bucket.decrease()
+    assert bucket.rate == 3
+
+
+def test_increase_adds_back_a_twentieth_up_to_the_starting_rate():
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.decrease()
+
+    bucket.increase()
+    assert bucket.rate == pytest.approx(5.5)
+    for _ in range(20):
+        bucket.increase()
+    assert bucket.rate == 10
+
+
+def test_min_rate_defaults_to_a_tenth():
+    bucket = TokenBucket(rate=10, capacity=5)
+
+    for _ in range(10):
+        bucket.decrease()
+
+    assert bucket.rate == 1
+
+
+def test_per_minute_bucket_converts_to_seconds():
+    bucket = per_minute_bucket(600, 10, 60)
+
+    assert bucket.rate == 10
+    assert bucket.min_rate == 1
+    assert bucket.capacity == 10
+
+
+def test_burst_is_spent_at_once_then_tokens_come_at_the_rate():
+    bucket = TokenBucket(rate=50, capacity=2)
+
+    async def acquire(count):
+        started_at = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.monotonic() - started_at
+
+    assert asyncio.run(acquire(2)) < 0.01
+    # Two more at 50 a second
+    assert asyncio.run(acquire(2)) == pytest.approx(0.04, abs=0.03)
+
+
+def test_pause_holds_back_every_waiter():
+    bucket = TokenBucket(rate=1000, capacity=10)
+
+    async def acquire_after_pause():
+        bucket.pause(0.05)
+        started_at = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - started_at
+
+    assert asyncio.run(acquire_after_pause()) >= 0.04
+
+
+def test_rate_and_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0, capacity=1)
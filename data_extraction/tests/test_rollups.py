@@ -0,0 +1,59 @@
+import asyncio
+import re
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from repository.rollups import refresh_job_listing_weekly_stats
+
+SINCE = datetime(2026, 1, 5, tzinfo=timezone.utc)
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, statement, params=None):
+        self.statements.append((" ".join(str(statement).split()), params))
+        return SimpleNamespace(rowcount=12)
+
+    async def commit(self):
+        self.commits += 1
+
+
+def refresh(since):
+    db = RecordingSession()
+    written = asyncio.run(refresh_job_listing_weekly_stats(db, since))
+    return db, written
+
+
+def test_touched_weeks_are_deleted_in_every_area():
+    db, _ = refresh(SINCE)
+
+    delete, params = db.statements[0]
+    assert delete.startswith("DELETE FROM job_listing_weekly_stats")
+    # A listing that moved area leaves the old one to be rebuilt or emptied
+    condition = delete.split(" WHERE s.", 1)[1]
+    assert "area" not in condition
+    assert {"s.source", "s.category_id", "s.week"} <= set(re.findall(r"s\.\w+", delete))
+    assert params == {"since": SINCE}
+
+
+def test_touched_weeks_are_rebuilt_per_area_in_one_commit():
+    db, written = refresh(SINCE)
+
+    insert, params = db.statements[1]
+    assert insert.startswith("WITH changed AS MATERIALIZED")
+    assert "GROUP BY l.source, l.category_id, l.area, l.week" in insert
+    assert "created_at > :since OR updated_at > :since" in insert
+    assert params == {"since": SINCE}
+    assert db.commits == 1
+    assert written == 12
+
+
+def test_without_since_every_week_is_rebuilt():
+    db, _ = refresh(None)
+
+    for statement, params in db.statements:
+        assert ":since" not in statement
+        assert params == {}